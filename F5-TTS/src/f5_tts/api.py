@@ -9,11 +9,14 @@ from hydra.utils import get_class
 from omegaconf import OmegaConf
 
 from f5_tts.infer.utils_infer import (
+    SpeakerProfile,
+    get_speaker_profile,
+    infer_multi_prompt_batch,
     infer_process,
     load_model,
     load_vocoder,
     preprocess_ref_audio_text,
-    remove_silence_for_generated_wav,
+    remove_silence_array,
     save_spectrogram,
     transcribe,
 )
@@ -87,14 +90,19 @@ class F5TTS:
         return transcribe(ref_audio, language)
 
     def export_wav(self, wav, file_wave, remove_silence=False):
-        sf.write(file_wave, wav, self.target_sample_rate)
-
         if remove_silence:
-            remove_silence_for_generated_wav(file_wave)
+            wav = remove_silence_array(wav, self.target_sample_rate)
+
+        sf.write(file_wave, wav, self.target_sample_rate)
 
     def export_spectrogram(self, spec, file_spec):
         save_spectrogram(spec, file_spec)
 
+    def get_speaker_profile(self, ref_file, ref_text="", show_info=print, target_rms=0.1):
+        """Preprocess a reference clip once; the returned SpeakerProfile can be passed to infer() as ref_file."""
+        ref_file, ref_text = preprocess_ref_audio_text(ref_file, ref_text, show_info=show_info)
+        return get_speaker_profile(ref_file, ref_text, self.ema_model, target_rms=target_rms, device=self.device)
+
     def infer(
         self,
         ref_file,
@@ -119,11 +127,14 @@ class F5TTS:
         seed_everything(seed)
         self.seed = seed
 
-        ref_file, ref_text = preprocess_ref_audio_text(ref_file, ref_text)
+        if isinstance(ref_file, SpeakerProfile):
+            profile = ref_file
+        else:
+            profile = self.get_speaker_profile(ref_file, ref_text, show_info=show_info, target_rms=target_rms)
 
         wav, sr, spec = infer_process(
-            ref_file,
-            ref_text,
+            profile,
+            profile.ref_text,
             gen_text,
             self.ema_model,
             self.vocoder,
@@ -140,14 +151,61 @@ class F5TTS:
             device=self.device,
         )
 
+        if remove_silence:
+            wav = remove_silence_array(wav, sr)
+
         if file_wave is not None:
-            self.export_wav(wav, file_wave, remove_silence)
+            self.export_wav(wav, file_wave)
 
         if file_spec is not None:
             self.export_spectrogram(spec, file_spec)
 
         return wav, sr, spec
 
+    def infer_batch(
+        self,
+        prompts,
+        show_info=print,
+        progress=tqdm,
+        target_rms=0.1,
+        cross_fade_duration=0.15,
+        sway_sampling_coef=-1,
+        cfg_strength=2,
+        nfe_step=32,
+        max_batch_frames=16384,
+        seed=None,
+    ):
+        """prompts: list of dicts with ref_file (path or SpeakerProfile), ref_text, gen_text and optional speed;
+        returns [(wav, sr), ...]"""
+        if seed is None:
+            seed = random.randint(0, sys.maxsize)
+        seed_everything(seed)
+        self.seed = seed
+
+        batch_prompts = []
+        for prompt in prompts:
+            profile = prompt["ref_file"]
+            if not isinstance(profile, SpeakerProfile):
+                profile = self.get_speaker_profile(
+                    profile, prompt.get("ref_text", ""), show_info=show_info, target_rms=target_rms
+                )
+            batch_prompts.append((profile, profile.ref_text, prompt["gen_text"], prompt.get("speed", 1.0)))
+
+        return infer_multi_prompt_batch(
+            batch_prompts,
+            self.ema_model,
+            self.vocoder,
+            mel_spec_type=self.mel_spec_type,
+            progress=progress,
+            target_rms=target_rms,
+            cross_fade_duration=cross_fade_duration,
+            nfe_step=nfe_step,
+            cfg_strength=cfg_strength,
+            sway_sampling_coef=sway_sampling_coef,
+            max_batch_frames=max_batch_frames,
+            device=self.device,
+        )
+
 
 if __name__ == "__main__":
     f5tts = F5TTS()
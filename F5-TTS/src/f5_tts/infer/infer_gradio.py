@@ -3,7 +3,6 @@
 
 import gc
 import json
-import os
 import re
 import tempfile
 from collections import OrderedDict
@@ -13,9 +12,7 @@ from importlib.resources import files
 import click
 import gradio as gr
 import numpy as np
-import soundfile as sf
 import torch
-import torchaudio
 from cached_path import cached_path
 from transformers import AutoModelForCausalLM, AutoTokenizer
 
@@ -40,7 +37,7 @@ from f5_tts.infer.utils_infer import (
     load_model,
     load_vocoder,
     preprocess_ref_audio_text,
-    remove_silence_for_generated_wav,
+    remove_silence_array,
     save_spectrogram,
     tempfile_kwargs,
 )
@@ -191,15 +188,7 @@ def infer(
 
     # Remove silence
     if remove_silence:
-        with tempfile.NamedTemporaryFile(suffix=".wav", **tempfile_kwargs) as f:
-            temp_path = f.name
-        try:
-            sf.write(temp_path, final_wave, final_sample_rate)
-            remove_silence_for_generated_wav(f.name)
-            final_wave, _ = torchaudio.load(f.name)
-        finally:
-            os.unlink(temp_path)
-        final_wave = final_wave.squeeze().cpu().numpy()
+        final_wave = remove_silence_array(final_wave, final_sample_rate)
 
     # Save the spectrogram
     with tempfile.NamedTemporaryFile(suffix=".png", **tempfile_kwargs) as tmp_spectrogram:
@@ -2,6 +2,7 @@
 # Make adjustments inside functions, and consider both gradio and cli scripts if need to change func output format
 import os
 import sys
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 
 
@@ -20,11 +21,13 @@ matplotlib.use("Agg")
 
 import matplotlib.pylab as plt
 import numpy as np
+import soundfile as sf
 import torch
 import torchaudio
 import tqdm
 from huggingface_hub import hf_hub_download
-from pydub import AudioSegment, silence
+from pydub import AudioSegment
+from torch.nn.utils.rnn import pad_sequence
 from transformers import pipeline
 from vocos import Vocos
 
@@ -32,9 +35,6 @@ from f5_tts.model import CFM
 from f5_tts.model.utils import convert_char_to_pinyin, get_tokenizer
 
 
-_ref_audio_cache = {}
-_ref_text_cache = {}
-
 device = (
     "cuda"
     if torch.cuda.is_available()
@@ -64,6 +64,13 @@ sway_sampling_coef = -1.0
 speed = 1.0
 fix_duration = None
 
+# persistent reference audio cache, shared by all processes on the host
+ref_cache_dir = os.environ.get(
+    "F5TTS_REF_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "f5_tts", "ref_audio"),
+)
+ref_cache_max_bytes = int(os.environ.get("F5TTS_REF_CACHE_MAX_MB", "512")) * 1024 * 1024
+
 # -----------------------------------------
 
 
@@ -274,20 +281,206 @@ def load_model(
     return model
 
 
+# silence detection on numpy waves, float in [-1, 1] shaped "n" or "n c"; parameters in ms as in pydub.silence
+
+
+def audiosegment_to_array(aseg):
+    samples = np.array(aseg.get_array_of_samples(), dtype=np.float32) / aseg.max_possible_amplitude
+    if aseg.channels > 1:
+        samples = samples.reshape(-1, aseg.channels)
+    return samples, aseg.frame_rate
+
+
+def _frame_power(wave, frame_len):
+    # mean square per frame of frame_len samples, the last frame may be shorter
+    power = np.square(wave, dtype=np.float64)
+    if power.ndim > 1:
+        power = power.mean(axis=1)
+    if len(power) == 0:
+        return power
+    starts = np.arange(0, len(power), frame_len)
+    return np.add.reduceat(power, starts) / np.diff(np.append(starts, len(power)))
+
+
+def silence_edges(wave, sample_rate, silence_threshold=-42):
+    """Returns (start, end) sample indices of wave without leading and trailing silence."""
+    threshold_power = 10 ** (silence_threshold / 10)
+
+    # leading: 10 ms chunks, like silence.detect_leading_silence
+    lead_frame = max(1, sample_rate // 100)
+    loud = np.flatnonzero(_frame_power(wave, lead_frame) >= threshold_power)
+    start = min(int(loud[0]) * lead_frame, len(wave)) if len(loud) else len(wave)
+
+    # trailing: 1 ms steps
+    tail_frame = max(1, sample_rate // 1000)
+    loud = np.flatnonzero(_frame_power(wave[start:], tail_frame) > threshold_power)
+    end = min(start + (int(loud[-1]) + 1) * tail_frame, len(wave)) if len(loud) else start
+
+    return start, end
+
+
+def trim_silence_edges(wave, sample_rate, silence_threshold=-42):
+    start, end = silence_edges(wave, sample_rate, silence_threshold)
+    return wave[start:end]
+
+
 def remove_silence_edges(audio, silence_threshold=-42):
-    # Remove silence from the start
-    non_silent_start_idx = silence.detect_leading_silence(audio, silence_threshold=silence_threshold)
-    audio = audio[non_silent_start_idx:]
+    start, end = silence_edges(*audiosegment_to_array(audio), silence_threshold=silence_threshold)
+    return audio[start * 1000 / audio.frame_rate : end * 1000 / audio.frame_rate]
+
+
+def split_on_silence_array(wave, sample_rate, min_silence_len=1000, silence_thresh=-16, keep_silence=100, seek_step=1):
+    """numpy equivalent of pydub silence.split_on_silence, returns a list of wave slices."""
+    ms = sample_rate / 1000
+    min_len, keep, step = int(min_silence_len * ms), int(keep_silence * ms), max(1, int(seek_step * ms))
+    n = len(wave)
+
+    power = np.square(wave, dtype=np.float64)
+    if power.ndim > 1:
+        power = power.mean(axis=1)
+    cumsum = np.concatenate([[0.0], np.cumsum(power)])
+
+    # silent windows of min_len samples, checked every step samples
+    silent_ranges = []
+    if n >= min_len and min_len > 0:
+        last_start = n - min_len
+        starts = np.arange(0, last_start + 1, step)
+        if last_start % step:
+            starts = np.append(starts, last_start)
+        window_power = (cumsum[starts + min_len] - cumsum[starts]) / min_len
+        silent = starts[window_power <= 10 ** (silence_thresh / 10)]
+        if len(silent):
+            gaps = np.diff(silent)
+            breaks = np.flatnonzero((gaps != step) & (gaps > min_len))
+            range_starts = np.concatenate([silent[:1], silent[breaks + 1]])
+            range_ends = np.concatenate([silent[breaks], silent[-1:]]) + min_len
+            silent_ranges = list(zip(range_starts.tolist(), range_ends.tolist()))
+
+    if not silent_ranges:
+        nonsilent_ranges = [[0, n]]
+    elif silent_ranges[0] == (0, n):
+        return []
+    else:
+        nonsilent_ranges, prev_end = [], 0
+        for start, end in silent_ranges:
+            nonsilent_ranges.append([prev_end, start])
+            prev_end = end
+        if prev_end != n:
+            nonsilent_ranges.append([prev_end, n])
+        if nonsilent_ranges[0] == [0, 0]:
+            nonsilent_ranges.pop(0)
+
+    # pad with kept silence, splitting the difference where neighbours overlap
+    output_ranges = [[start - keep, end + keep] for start, end in nonsilent_ranges]
+    for range_i, range_ii in zip(output_ranges, output_ranges[1:]):
+        if range_ii[0] < range_i[1]:
+            range_i[1] = (range_i[1] + range_ii[0]) // 2
+            range_ii[0] = range_i[1]
+
+    return [wave[max(start, 0) : min(end, n)] for start, end in output_ranges]
+
+
+def remove_silence_array(wave, sample_rate, min_silence_len=1000, silence_thresh=-50, keep_silence=500, seek_step=10):
+    """Shortens long silences in generated audio, in memory."""
+    segments = split_on_silence_array(wave, sample_rate, min_silence_len, silence_thresh, keep_silence, seek_step)
+    return np.concatenate(segments) if segments else wave[:0]
+
+
+# disk-backed cache of preprocessed reference audio and asr transcripts, keyed by audio hash
+
+
+class RefAudioCache:
+    """
+    Stores the clipped reference wav as <hash>.wav and its transcription as <hash>.txt.
+
+    Files are published with an atomic rename, so several worker processes can share the directory,
+    and the least recently used entries are evicted once the directory grows over max_bytes.
+    """
+
+    def __init__(self, cache_dir=ref_cache_dir, max_bytes=ref_cache_max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, audio_hash, ext):
+        return os.path.join(self.cache_dir, f"{audio_hash}.{ext}")
+
+    @staticmethod
+    def _touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def get_audio(self, audio_hash):
+        path = self._path(audio_hash, "wav")
+        if not os.path.exists(path):
+            return None
+        self._touch(path)
+        return path
+
+    def get_text(self, audio_hash):
+        path = self._path(audio_hash, "txt")
+        try:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return None
+        self._touch(path)
+        return text
+
+    def _publish(self, audio_hash, ext, write_fn):
+        fd, temp_path = tempfile.mkstemp(suffix=f".{ext}.part", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            write_fn(temp_path)
+            os.replace(temp_path, self._path(audio_hash, ext))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        self.evict()
+        return self._path(audio_hash, ext)
+
+    def put_audio(self, audio_hash, wave, sample_rate):
+        return self._publish(audio_hash, "wav", lambda path: sf.write(path, wave, sample_rate, format="WAV"))
+
+    def put_text(self, audio_hash, text):
+        def write_text(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+        return self._publish(audio_hash, "txt", write_text)
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".part"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # removed by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+
 
-    # Remove silence from the end
-    non_silent_end_duration = audio.duration_seconds
-    for ms in reversed(audio):
-        if ms.dBFS > silence_threshold:
-            break
-        non_silent_end_duration -= 0.001
-    trimmed_audio = audio[: int(non_silent_end_duration * 1000)]
+_ref_cache = None
 
-    return trimmed_audio
+
+def get_ref_audio_cache():
+    global _ref_cache
+    if _ref_cache is None:
+        _ref_cache = RefAudioCache()
+    return _ref_cache
 
 
 # preprocess reference audio and text
@@ -301,66 +494,62 @@ def preprocess_ref_audio_text(ref_audio_orig, ref_text, show_info=print):
         audio_data = audio_file.read()
         audio_hash = hashlib.md5(audio_data).hexdigest()
 
-    global _ref_audio_cache
+    ref_cache = get_ref_audio_cache()
+    ref_audio = ref_cache.get_audio(audio_hash)
 
-    if audio_hash in _ref_audio_cache:
+    if ref_audio is not None:
         show_info("Using cached preprocessed reference audio...")
-        ref_audio = _ref_audio_cache[audio_hash]
 
     else:  # first pass, do preprocess
-        with tempfile.NamedTemporaryFile(suffix=".wav", **tempfile_kwargs) as f:
-            temp_path = f.name
+        wave, sr = audiosegment_to_array(AudioSegment.from_file(ref_audio_orig))
 
-        aseg = AudioSegment.from_file(ref_audio_orig)
+        def clip_segments(segments, attempt):
+            kept, kept_len = [], 0
+            for segment in segments:
+                if kept_len > 6 * sr and kept_len + len(segment) > 12 * sr:
+                    show_info(f"Audio is over 12s, clipping short. ({attempt})")
+                    break
+                kept.append(segment)
+                kept_len += len(segment)
+            return np.concatenate(kept) if kept else wave[:0]
 
         # 1. try to find long silence for clipping
-        non_silent_segs = silence.split_on_silence(
-            aseg, min_silence_len=1000, silence_thresh=-50, keep_silence=1000, seek_step=10
+        non_silent_segs = split_on_silence_array(
+            wave, sr, min_silence_len=1000, silence_thresh=-50, keep_silence=1000, seek_step=10
         )
-        non_silent_wave = AudioSegment.silent(duration=0)
-        for non_silent_seg in non_silent_segs:
-            if len(non_silent_wave) > 6000 and len(non_silent_wave + non_silent_seg) > 12000:
-                show_info("Audio is over 12s, clipping short. (1)")
-                break
-            non_silent_wave += non_silent_seg
+        non_silent_wave = clip_segments(non_silent_segs, 1)
 
         # 2. try to find short silence for clipping if 1. failed
-        if len(non_silent_wave) > 12000:
-            non_silent_segs = silence.split_on_silence(
-                aseg, min_silence_len=100, silence_thresh=-40, keep_silence=1000, seek_step=10
+        if len(non_silent_wave) > 12 * sr:
+            non_silent_segs = split_on_silence_array(
+                wave, sr, min_silence_len=100, silence_thresh=-40, keep_silence=1000, seek_step=10
             )
-            non_silent_wave = AudioSegment.silent(duration=0)
-            for non_silent_seg in non_silent_segs:
-                if len(non_silent_wave) > 6000 and len(non_silent_wave + non_silent_seg) > 12000:
-                    show_info("Audio is over 12s, clipping short. (2)")
-                    break
-                non_silent_wave += non_silent_seg
+            non_silent_wave = clip_segments(non_silent_segs, 2)
 
-        aseg = non_silent_wave
+        wave = non_silent_wave
 
         # 3. if no proper silence found for clipping
-        if len(aseg) > 12000:
-            aseg = aseg[:12000]
+        if len(wave) > 12 * sr:
+            wave = wave[: 12 * sr]
             show_info("Audio is over 12s, clipping short. (3)")
 
-        aseg = remove_silence_edges(aseg) + AudioSegment.silent(duration=50)
-        aseg.export(temp_path, format="wav")
-        ref_audio = temp_path
+        wave = trim_silence_edges(wave, sr)
+        wave = np.concatenate([wave, np.zeros((sr // 20,) + wave.shape[1:], dtype=wave.dtype)])
 
         # Cache the processed reference audio
-        _ref_audio_cache[audio_hash] = ref_audio
+        ref_audio = ref_cache.put_audio(audio_hash, wave, sr)
 
     if not ref_text.strip():
-        global _ref_text_cache
-        if audio_hash in _ref_text_cache:
+        cached_text = ref_cache.get_text(audio_hash)
+        if cached_text is not None:
             # Use cached asr transcription
             show_info("Using cached reference text...")
-            ref_text = _ref_text_cache[audio_hash]
+            ref_text = cached_text
         else:
             show_info("No reference text provided, transcribing reference audio...")
             ref_text = transcribe(ref_audio)
             # Cache the transcribed text (not caching custom ref_text, enabling users to do manual tweak)
-            _ref_text_cache[audio_hash] = ref_text
+            ref_cache.put_text(audio_hash, ref_text)
     else:
         show_info("Using custom reference text...")
 
@@ -376,6 +565,75 @@ def preprocess_ref_audio_text(ref_audio_orig, ref_text, show_info=print):
     return ref_audio, ref_text
 
 
+# speaker profile: reference conditioning computed once per speaker and kept on device
+
+
+class SpeakerProfile:
+    """
+    Holds everything infer_batch_process derives from a reference clip, so repeated generations
+    for the same speaker skip rms normalization, resampling, mel extraction and pinyin conversion.
+
+    Attributes:
+        audio (Tensor): (1, nw) mono, rms-normalized wave at target_sample_rate, on device.
+        rms (Tensor): rms of the original reference, used to rescale generated waves.
+        ref_text (str): reference text with the trailing space expected by the tokenizer.
+        ref_text_tokens (List[str]): pinyin / char tokens of ref_text.
+        ref_mel (Tensor): (1, n, d) reference mel spectrogram, on device.
+        ref_audio_len (int): reference length in mel frames (hop_length units).
+    """
+
+    def __init__(self, ref_audio, ref_text, model_obj, target_rms=target_rms, device=device):
+        audio, sr = ref_audio
+        if audio.shape[0] > 1:
+            audio = torch.mean(audio, dim=0, keepdim=True)
+
+        self.rms = torch.sqrt(torch.mean(torch.square(audio)))
+        self.target_rms = target_rms
+        if self.rms < target_rms:
+            audio = audio * target_rms / self.rms
+        if sr != target_sample_rate:
+            resampler = torchaudio.transforms.Resample(sr, target_sample_rate)
+            audio = resampler(audio)
+        self.audio = audio.to(device)
+
+        if len(ref_text[-1].encode("utf-8")) == 1:
+            ref_text = ref_text + " "
+        self.ref_text = ref_text
+        self.ref_text_tokens = convert_char_to_pinyin([ref_text])[0]
+
+        self.ref_audio_len = self.audio.shape[-1] // hop_length
+        with torch.inference_mode():
+            self.ref_mel = model_obj.mel_spec(self.audio).permute(0, 2, 1)
+
+    @property
+    def duration(self):
+        return self.audio.shape[-1] / target_sample_rate
+
+    def text_tokens(self, gen_text):
+        return self.ref_text_tokens + convert_char_to_pinyin([gen_text])[0]
+
+
+_speaker_profile_cache = OrderedDict()
+speaker_profile_cache_size = 32
+
+
+def get_speaker_profile(ref_audio, ref_text, model_obj, target_rms=target_rms, device=device):
+    """Return the cached SpeakerProfile for a preprocessed reference file, building it on first use."""
+    # keyed on content rather than mtime, which RefAudioCache bumps on every hit to track recency
+    with open(ref_audio, "rb") as audio_file:
+        audio_hash = hashlib.md5(audio_file.read()).hexdigest()
+    key = (audio_hash, ref_text, target_rms, str(device), id(model_obj))
+    if key in _speaker_profile_cache:
+        _speaker_profile_cache.move_to_end(key)
+        return _speaker_profile_cache[key]
+
+    profile = SpeakerProfile(torchaudio.load(ref_audio), ref_text, model_obj, target_rms=target_rms, device=device)
+    _speaker_profile_cache[key] = profile
+    while len(_speaker_profile_cache) > speaker_profile_cache_size:
+        _speaker_profile_cache.popitem(last=False)
+    return profile
+
+
 # infer process: chunk text -> infer batches [i.e. infer_batch_process()]
 
 
@@ -398,8 +656,13 @@ def infer_process(
     device=device,
 ):
     # Split the input text into batches
-    audio, sr = torchaudio.load(ref_audio)
-    max_chars = int(len(ref_text.encode("utf-8")) / (audio.shape[-1] / sr) * (22 - audio.shape[-1] / sr) * speed)
+    if isinstance(ref_audio, SpeakerProfile):
+        ref_secs = ref_audio.duration
+    else:
+        audio, sr = torchaudio.load(ref_audio)
+        ref_secs = audio.shape[-1] / sr
+        ref_audio = (audio, sr)
+    max_chars = int(len(ref_text.encode("utf-8")) / ref_secs * (22 - ref_secs) * speed)
     gen_text_batches = chunk_text(gen_text, max_chars=max_chars)
     for i, gen_text in enumerate(gen_text_batches):
         print(f"gen_text {i}", gen_text)
@@ -408,7 +671,7 @@ def infer_process(
     show_info(f"Generating audio in {len(gen_text_batches)} batches...")
     return next(
         infer_batch_process(
-            (audio, sr),
+            ref_audio,
             ref_text,
             gen_text_batches,
             model_obj,
@@ -449,34 +712,26 @@ def infer_batch_process(
     streaming=False,
     chunk_size=2048,
 ):
-    audio, sr = ref_audio
-    if audio.shape[0] > 1:
-        audio = torch.mean(audio, dim=0, keepdim=True)
-
-    rms = torch.sqrt(torch.mean(torch.square(audio)))
-    if rms < target_rms:
-        audio = audio * target_rms / rms
-    if sr != target_sample_rate:
-        resampler = torchaudio.transforms.Resample(sr, target_sample_rate)
-        audio = resampler(audio)
-    audio = audio.to(device)
+    # ref_audio is a SpeakerProfile, or a (waveform, sample_rate) tuple profiled for this call only
+    if isinstance(ref_audio, SpeakerProfile):
+        profile = ref_audio
+    else:
+        profile = SpeakerProfile(ref_audio, ref_text, model_obj, target_rms=target_rms, device=device)
+    rms = profile.rms
+    ref_text = profile.ref_text
+    ref_audio_len = profile.ref_audio_len
 
     generated_waves = []
     spectrograms = []
 
-    if len(ref_text[-1].encode("utf-8")) == 1:
-        ref_text = ref_text + " "
-
     def process_batch(gen_text):
         local_speed = speed
         if len(gen_text.encode("utf-8")) < 10:
             local_speed = 0.3
 
         # Prepare the text
-        text_list = [ref_text + gen_text]
-        final_text_list = convert_char_to_pinyin(text_list)
+        final_text_list = [profile.text_tokens(gen_text)]
 
-        ref_audio_len = audio.shape[-1] // hop_length
         if fix_duration is not None:
             duration = int(fix_duration * target_sample_rate / hop_length)
         else:
@@ -488,7 +743,7 @@ def infer_batch_process(
         # inference
         with torch.inference_mode():
             generated, _ = model_obj.sample(
-                cond=audio,
+                cond=profile.ref_mel,
                 text=final_text_list,
                 duration=duration,
                 steps=nfe_step,
@@ -504,8 +759,8 @@ def infer_batch_process(
                 generated_wave = vocoder.decode(generated)
             elif mel_spec_type == "bigvgan":
                 generated_wave = vocoder(generated)
-            if rms < target_rms:
-                generated_wave = generated_wave * rms / target_rms
+            if rms < profile.target_rms:
+                generated_wave = generated_wave * rms / profile.target_rms
 
             # wav -> numpy
             generated_wave = generated_wave.squeeze().cpu().numpy()
@@ -533,65 +788,171 @@ def infer_batch_process(
                     spectrograms.append(generated_mel_spec)
 
         if generated_waves:
-            if cross_fade_duration <= 0:
-                # Simply concatenate
-                final_wave = np.concatenate(generated_waves)
-            else:
-                # Combine all generated waves with cross-fading
-                final_wave = generated_waves[0]
-                for i in range(1, len(generated_waves)):
-                    prev_wave = final_wave
-                    next_wave = generated_waves[i]
+            final_wave = cross_fade_waves(generated_waves, cross_fade_duration)
+
+            # Create a combined spectrogram
+            combined_spectrogram = np.concatenate(spectrograms, axis=1)
 
-                    # Calculate cross-fade samples, ensuring it does not exceed wave lengths
-                    cross_fade_samples = int(cross_fade_duration * target_sample_rate)
-                    cross_fade_samples = min(cross_fade_samples, len(prev_wave), len(next_wave))
+            yield final_wave, target_sample_rate, combined_spectrogram
 
-                    if cross_fade_samples <= 0:
-                        # No overlap possible, concatenate
-                        final_wave = np.concatenate([prev_wave, next_wave])
-                        continue
+        else:
+            yield None, target_sample_rate, None
 
-                    # Overlapping parts
-                    prev_overlap = prev_wave[-cross_fade_samples:]
-                    next_overlap = next_wave[:cross_fade_samples]
 
-                    # Fade out and fade in
-                    fade_out = np.linspace(1, 0, cross_fade_samples)
-                    fade_in = np.linspace(0, 1, cross_fade_samples)
+# cross-fade consecutive generated waves into one
 
-                    # Cross-faded overlap
-                    cross_faded_overlap = prev_overlap * fade_out + next_overlap * fade_in
 
-                    # Combine
-                    new_wave = np.concatenate(
-                        [prev_wave[:-cross_fade_samples], cross_faded_overlap, next_wave[cross_fade_samples:]]
-                    )
+def cross_fade_waves(generated_waves, cross_fade_duration=cross_fade_duration):
+    if cross_fade_duration <= 0:
+        # Simply concatenate
+        return np.concatenate(generated_waves)
 
-                    final_wave = new_wave
+    # Combine all generated waves with cross-fading
+    final_wave = generated_waves[0]
+    for i in range(1, len(generated_waves)):
+        prev_wave = final_wave
+        next_wave = generated_waves[i]
 
-            # Create a combined spectrogram
-            combined_spectrogram = np.concatenate(spectrograms, axis=1)
+        # Calculate cross-fade samples, ensuring it does not exceed wave lengths
+        cross_fade_samples = int(cross_fade_duration * target_sample_rate)
+        cross_fade_samples = min(cross_fade_samples, len(prev_wave), len(next_wave))
 
-            yield final_wave, target_sample_rate, combined_spectrogram
+        if cross_fade_samples <= 0:
+            # No overlap possible, concatenate
+            final_wave = np.concatenate([prev_wave, next_wave])
+            continue
+
+        # Overlapping parts
+        prev_overlap = prev_wave[-cross_fade_samples:]
+        next_overlap = next_wave[:cross_fade_samples]
+
+        # Fade out and fade in
+        fade_out = np.linspace(1, 0, cross_fade_samples)
+        fade_in = np.linspace(0, 1, cross_fade_samples)
+
+        # Cross-faded overlap
+        cross_faded_overlap = prev_overlap * fade_out + next_overlap * fade_in
+
+        # Combine
+        final_wave = np.concatenate(
+            [prev_wave[:-cross_fade_samples], cross_faded_overlap, next_wave[cross_fade_samples:]]
+        )
+
+    return final_wave
+
+
+# infer many (ref_audio, ref_text, gen_text) prompts, packing different speakers into shared sampling passes
+
+
+def infer_multi_prompt_batch(
+    prompts,
+    model_obj,
+    vocoder,
+    mel_spec_type=mel_spec_type,
+    progress=tqdm,
+    target_rms=target_rms,
+    cross_fade_duration=cross_fade_duration,
+    nfe_step=nfe_step,
+    cfg_strength=cfg_strength,
+    sway_sampling_coef=sway_sampling_coef,
+    max_batch_frames=16384,
+    device=device,
+):
+    """
+    Synthesizes several prompts with as few CFM.sample calls as possible.
+
+    Args:
+        prompts (List[Tuple]): (ref_audio, ref_text, gen_text, speed) per prompt, where ref_audio is a
+            SpeakerProfile or a (waveform, sample_rate) tuple and ref_text is already preprocessed.
+        max_batch_frames (int): Upper bound of summed mel frames (reference + generated) per sampling pass.
 
+    Returns:
+        List[Tuple[np.ndarray, int]]: (wave, sample_rate) per prompt, in input order.
+    """
+    items = []  # one entry per text chunk: (prompt_idx, profile, total_mel_len, text)
+    for prompt_idx, (ref_audio, ref_text, gen_text, local_speed) in enumerate(prompts):
+        if isinstance(ref_audio, SpeakerProfile):
+            profile = ref_audio
         else:
-            yield None, target_sample_rate, None
+            profile = SpeakerProfile(ref_audio, ref_text, model_obj, target_rms=target_rms, device=device)
+        ref_mel_len = profile.ref_audio_len
+        ref_text_len = len(profile.ref_text.encode("utf-8"))
+
+        # same chunking as infer_process, so long lines stay within the model's context
+        max_chars = int(ref_text_len / profile.duration * (22 - profile.duration) * local_speed)
+        for gen_chunk in chunk_text(gen_text, max_chars=max_chars):
+            chunk_speed = 0.3 if len(gen_chunk.encode("utf-8")) < 10 else local_speed
+            gen_text_len = len(gen_chunk.encode("utf-8"))
+            total_mel_len = ref_mel_len + int(ref_mel_len / ref_text_len * gen_text_len / chunk_speed)
+            text_tokens = profile.text_tokens(gen_chunk)
+            # CFM.sample raises a duration shorter than the text (or reference), use the same effective
+            # duration here so the output is sliced (and the batch budgeted) to what it generates
+            total_mel_len = max(total_mel_len, max(len(text_tokens), ref_mel_len) + 1)
+            items.append((prompt_idx, profile, total_mel_len, text_tokens))
+
+    # length bucketing as in eval get_inference_prompt: similar lengths share a pass to keep padding low
+    order = sorted(range(len(items)), key=lambda i: items[i][2])
+    batches, batch, batch_frames = [], [], 0
+    for i in order:
+        if batch and batch_frames + items[i][2] > max_batch_frames:
+            batches.append(batch)
+            batch, batch_frames = [], 0
+        batch.append(i)
+        batch_frames += items[i][2]
+    if batch:
+        batches.append(batch)
+
+    chunk_waves = [None] * len(items)
+    for batch in progress.tqdm(batches) if progress is not None else batches:
+        profiles = [items[i][1] for i in batch]
+        ref_mels = pad_sequence([profile.ref_mel[0] for profile in profiles], batch_first=True)
+        ref_mel_lens = torch.tensor([profile.ref_audio_len for profile in profiles], dtype=torch.long, device=device)
+        total_mel_lens = torch.tensor([items[i][2] for i in batch], dtype=torch.long, device=device)
+        final_text_list = [items[i][3] for i in batch]
+
+        with torch.inference_mode():
+            generated, _ = model_obj.sample(
+                cond=ref_mels,
+                text=final_text_list,
+                duration=total_mel_lens,
+                lens=ref_mel_lens,
+                steps=nfe_step,
+                cfg_strength=cfg_strength,
+                sway_sampling_coef=sway_sampling_coef,
+            )
+            del _
+
+            for j, gen in enumerate(generated):
+                gen = gen[ref_mel_lens[j] : total_mel_lens[j], :].unsqueeze(0)
+                gen_mel_spec = gen.permute(0, 2, 1).to(torch.float32)
+                if mel_spec_type == "vocos":
+                    generated_wave = vocoder.decode(gen_mel_spec)
+                elif mel_spec_type == "bigvgan":
+                    generated_wave = vocoder(gen_mel_spec)
+                if profiles[j].rms < profiles[j].target_rms:
+                    generated_wave = generated_wave * profiles[j].rms / profiles[j].target_rms
+                chunk_waves[batch[j]] = generated_wave.squeeze().cpu().numpy()
+
+    prompt_waves = [[] for _ in prompts]
+    for i, item in enumerate(items):
+        prompt_waves[item[0]].append(chunk_waves[i])
+
+    results = []
+    for waves in prompt_waves:
+        if waves:
+            results.append((cross_fade_waves(waves, cross_fade_duration), target_sample_rate))
+        else:
+            results.append((None, target_sample_rate))
+
+    return results
 
 
 # remove silence from generated wav
 
 
 def remove_silence_for_generated_wav(filename):
-    aseg = AudioSegment.from_file(filename)
-    non_silent_segs = silence.split_on_silence(
-        aseg, min_silence_len=1000, silence_thresh=-50, keep_silence=500, seek_step=10
-    )
-    non_silent_wave = AudioSegment.silent(duration=0)
-    for non_silent_seg in non_silent_segs:
-        non_silent_wave += non_silent_seg
-    aseg = non_silent_wave
-    aseg.export(filename, format="wav")
+    wave, sr = sf.read(filename, dtype="float32")
+    sf.write(filename, remove_silence_array(wave, sr), sr)
 
 
 # save spectrogram
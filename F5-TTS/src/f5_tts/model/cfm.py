@@ -96,6 +96,7 @@ class CFM(nn.Module):
         duplicate_test=False,
         t_inter=0.1,
         edit_mask=None,
+        cfg_single_pass=True,
     ):
         self.eval()
         # raw wave
@@ -161,6 +162,13 @@ class CFM(nn.Module):
             # step_cond = torch.where(cond_mask, cond, torch.zeros_like(cond))
 
             # predict flow
+            if cfg_single_pass and cfg_strength >= 1e-5:  # cond and uncond packed in one 2b forward
+                pred_cfg = self.transformer(
+                    x=x, cond=step_cond, text=text, time=t, mask=mask, cfg_infer=True, cache=True
+                )
+                pred, null_pred = torch.chunk(pred_cfg, 2, dim=0)
+                return pred + (pred - null_pred) * cfg_strength
+
             pred = self.transformer(
                 x=x, cond=step_cond, text=text, time=t, mask=mask, drop_audio_cond=False, drop_text=False, cache=True
             )
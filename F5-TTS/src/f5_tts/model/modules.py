@@ -25,6 +25,7 @@ from x_transformers.x_transformers import apply_rotary_pos_emb
 
 mel_basis_cache = {}
 hann_window_cache = {}
+mel_stft_cache = {}
 
 
 def get_bigvgan_mel_spectrogram(
@@ -80,17 +81,23 @@ def get_vocos_mel_spectrogram(
     hop_length=256,
     win_length=1024,
 ):
-    mel_stft = torchaudio.transforms.MelSpectrogram(
-        sample_rate=target_sample_rate,
-        n_fft=n_fft,
-        win_length=win_length,
-        hop_length=hop_length,
-        n_mels=n_mel_channels,
-        power=1,
-        center=True,
-        normalized=False,
-        norm=None,
-    ).to(waveform.device)
+    device = waveform.device
+    key = f"{n_fft}_{n_mel_channels}_{target_sample_rate}_{hop_length}_{win_length}_{device}"
+
+    if key not in mel_stft_cache:
+        mel_stft_cache[key] = torchaudio.transforms.MelSpectrogram(
+            sample_rate=target_sample_rate,
+            n_fft=n_fft,
+            win_length=win_length,
+            hop_length=hop_length,
+            n_mels=n_mel_channels,
+            power=1,
+            center=True,
+            normalized=False,
+            norm=None,
+        ).to(device)
+
+    mel_stft = mel_stft_cache[key]
     if len(waveform.shape) == 3:
         waveform = waveform.squeeze(1)  # 'b 1 nw -> b nw'
 
@@ -120,6 +127,7 @@ class MelSpec(nn.Module):
         self.n_mel_channels = n_mel_channels
         self.target_sample_rate = target_sample_rate
 
+        self.mel_spec_type = mel_spec_type
         if mel_spec_type == "vocos":
             self.extractor = get_vocos_mel_spectrogram
         elif mel_spec_type == "bigvgan":
@@ -142,6 +150,50 @@ class MelSpec(nn.Module):
 
         return mel
 
+    def forward_batch(self, wavs):
+        return get_mel_spectrogram_batch(
+            wavs,
+            mel_spec_type=self.mel_spec_type,
+            n_fft=self.n_fft,
+            n_mel_channels=self.n_mel_channels,
+            target_sample_rate=self.target_sample_rate,
+            hop_length=self.hop_length,
+            win_length=self.win_length,
+        )
+
+
+# batched mel extraction for a list of waveforms of different lengths
+
+
+def get_mel_spectrogram_batch(
+    waveforms,
+    mel_spec_type="vocos",
+    n_fft=1024,
+    n_mel_channels=100,
+    target_sample_rate=24000,
+    hop_length=256,
+    win_length=1024,
+):
+    """
+    Extracts mels for 1-D waveforms ("nw") in a single stft call on a zero-padded batch.
+
+    Returns a list of "d n" mels cut back to each waveform's own frame count. Frames at the very end of
+    shorter waveforms see zero padding instead of reflection, so they can differ slightly from a
+    per-waveform extraction.
+    """
+    lengths = [wav.shape[-1] for wav in waveforms]
+    batch = torch.nn.utils.rnn.pad_sequence([wav.reshape(-1) for wav in waveforms], batch_first=True)
+
+    if mel_spec_type == "vocos":
+        mels = get_vocos_mel_spectrogram(batch, n_fft, n_mel_channels, target_sample_rate, hop_length, win_length)
+        frame_counts = [length // hop_length + 1 for length in lengths]
+    elif mel_spec_type == "bigvgan":
+        mels = get_bigvgan_mel_spectrogram(batch, n_fft, n_mel_channels, target_sample_rate, hop_length, win_length)
+        padding = (n_fft - hop_length) // 2
+        frame_counts = [(length + 2 * padding - n_fft) // hop_length + 1 for length in lengths]
+
+    return [mel[:, :frames] for mel, frames in zip(mels, frame_counts)]
+
 
 # sinusoidal position embedding
 
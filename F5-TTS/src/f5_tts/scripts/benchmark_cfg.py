@@ -0,0 +1,86 @@
+"""
+Benchmark classifier-free guidance in CFM.sample: two forwards per NFE step (cond, uncond)
+versus one packed 2b forward (cfg_single_pass). Weights are random, only timing matters.
+
+python src/f5_tts/scripts/benchmark_cfg.py --model F5TTS_v1_Base --device cpu --batch 1 --seconds 10
+"""
+
+import argparse
+import time
+from importlib.resources import files
+
+import torch
+from hydra.utils import get_class
+from omegaconf import OmegaConf
+
+from f5_tts.model import CFM
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--model", default="F5TTS_v1_Base", help="config name under f5_tts/configs")
+parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+parser.add_argument("--batch", type=int, default=1)
+parser.add_argument("--seconds", type=float, default=10, help="total (ref + gen) duration to sample")
+parser.add_argument("--text_length", type=int, default=150)
+parser.add_argument("--nfe_step", type=int, default=32)
+parser.add_argument("--cfg_strength", type=float, default=2.0)
+parser.add_argument("--runs", type=int, default=3)
+parser.add_argument("--threads", type=int, default=0, help="torch.set_num_threads, 0 keeps default")
+args = parser.parse_args()
+
+if args.threads > 0:
+    torch.set_num_threads(args.threads)
+
+model_cfg = OmegaConf.load(str(files("f5_tts").joinpath(f"configs/{args.model}.yaml")))
+model_cls = get_class(f"f5_tts.model.{model_cfg.model.backbone}")
+mel_spec_kwargs = model_cfg.model.mel_spec
+n_mel_channels = mel_spec_kwargs.n_mel_channels
+
+model = CFM(
+    transformer=model_cls(**model_cfg.model.arch, text_num_embeds=2545, mel_dim=n_mel_channels),
+    mel_spec_kwargs=mel_spec_kwargs,
+).to(args.device)
+model.eval()
+
+frames = int(args.seconds * mel_spec_kwargs.target_sample_rate / mel_spec_kwargs.hop_length)
+cond = torch.randn(args.batch, frames // 2, n_mel_channels, device=args.device)
+text = torch.randint(0, 2545, (args.batch, args.text_length), device=args.device)
+duration = torch.full((args.batch,), frames, dtype=torch.long, device=args.device)
+
+
+def sync():
+    if "cuda" in args.device:
+        torch.cuda.synchronize()
+
+
+def run(cfg_single_pass):
+    with torch.inference_mode():
+        model.sample(
+            cond=cond,
+            text=text,
+            duration=duration,
+            steps=args.nfe_step,
+            cfg_strength=args.cfg_strength,
+            sway_sampling_coef=-1.0,
+            seed=0,
+            cfg_single_pass=cfg_single_pass,
+        )
+
+
+print(f"{args.model} on {args.device}: batch {args.batch}, {frames} frames, {args.nfe_step} NFE steps")
+results = {}
+for cfg_single_pass in (False, True):
+    run(cfg_single_pass)  # warm-up
+    sync()
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        run(cfg_single_pass)
+        sync()
+        timings.append(time.perf_counter() - start)
+    results[cfg_single_pass] = min(timings)
+    mode = "single pass (2b)" if cfg_single_pass else "two passes (b+b)"
+    best = results[cfg_single_pass]
+    print(f"  {mode:<18} best {best:.3f}s  ({best / args.nfe_step * 1000:.1f} ms/step)")
+
+print(f"  speedup: {results[False] / results[True]:.2f}x")
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark of vocos mel extraction overhead: building a MelSpectrogram per call (previous behavior)
+versus the cached transform in get_vocos_mel_spectrogram, and one batched call for a list of waveforms.
+
+python src/f5_tts/scripts/benchmark_mel.py --device cpu --seconds 10 --count 16
+"""
+
+import argparse
+import time
+
+import torch
+import torchaudio
+
+from f5_tts.model.modules import get_mel_spectrogram_batch, get_vocos_mel_spectrogram
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+parser.add_argument("--seconds", type=float, default=10, help="length of the longest waveform")
+parser.add_argument("--count", type=int, default=16, help="waveforms per round")
+parser.add_argument("--rounds", type=int, default=20)
+args = parser.parse_args()
+
+target_sample_rate = 24000
+max_samples = int(args.seconds * target_sample_rate)
+waveforms = [torch.randn(1, max_samples * (i + 1) // args.count, device=args.device) * 0.1 for i in range(args.count)]
+
+
+def uncached(waveform):
+    mel_stft = torchaudio.transforms.MelSpectrogram(
+        sample_rate=target_sample_rate,
+        n_fft=1024,
+        win_length=1024,
+        hop_length=256,
+        n_mels=100,
+        power=1,
+        center=True,
+        normalized=False,
+        norm=None,
+    ).to(waveform.device)
+    return mel_stft(waveform).clamp(min=1e-5).log()
+
+
+def sync():
+    if "cuda" in args.device:
+        torch.cuda.synchronize()
+
+
+def bench(name, fn):
+    fn()  # warm-up, fills the transform cache
+    sync()
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        fn()
+    sync()
+    per_call = (time.perf_counter() - start) / (args.rounds * args.count)
+    print(f"  {name:<28} {per_call * 1000:.3f} ms per waveform")
+    return per_call
+
+
+print(f"{args.count} waveforms up to {args.seconds}s on {args.device}, {args.rounds} rounds")
+with torch.inference_mode():
+    before = bench("new transform per call", lambda: [uncached(wav) for wav in waveforms])
+    after = bench("cached transform", lambda: [get_vocos_mel_spectrogram(wav) for wav in waveforms])
+    batched = bench("cached transform, batched", lambda: get_mel_spectrogram_batch(waveforms))
+
+print(f"  per-call overhead removed: {(before - after) * 1000:.3f} ms ({before / after:.2f}x)")
+print(f"  batched vs cached single: {after / batched:.2f}x")
@@ -17,6 +17,7 @@ from hydra.utils import get_class
 from omegaconf import OmegaConf
 
 from f5_tts.infer.utils_infer import (
+    SpeakerProfile,
     chunk_text,
     infer_batch_process,
     load_model,
@@ -112,6 +113,7 @@ class TTSStreamingProcessor:
     def update_reference(self, ref_audio, ref_text):
         self.ref_audio, self.ref_text = preprocess_ref_audio_text(ref_audio, ref_text)
         self.audio, self.sr = torchaudio.load(self.ref_audio)
+        self.speaker_profile = SpeakerProfile((self.audio, self.sr), self.ref_text, self.model, device=self.device)
 
         ref_audio_duration = self.audio.shape[-1] / self.sr
         ref_text_byte_len = len(self.ref_text.encode("utf-8"))
@@ -123,7 +125,7 @@ class TTSStreamingProcessor:
         logger.info("Warming up the model...")
         gen_text = "Warm-up text for the model."
         for _ in infer_batch_process(
-            (self.audio, self.sr),
+            self.speaker_profile,
             self.ref_text,
             [gen_text],
             self.model,
@@ -143,7 +145,7 @@ class TTSStreamingProcessor:
             self.first_package = False
 
         audio_stream = infer_batch_process(
-            (self.audio, self.sr),
+            self.speaker_profile,
             self.ref_text,
             text_batches,
             self.model,
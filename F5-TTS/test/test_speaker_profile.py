@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+
+utils_infer = pytest.importorskip("f5_tts.infer.utils_infer")
+
+
+class FakeProfile:
+    def __init__(self, audio, ref_text, model_obj, target_rms, device):
+        self.ref_text = ref_text
+
+
+@pytest.fixture
+def fake_profile(monkeypatch):
+    monkeypatch.setattr(utils_infer, "SpeakerProfile", FakeProfile)
+    monkeypatch.setattr(utils_infer.torchaudio, "load", lambda path: (None, 24000))
+    monkeypatch.setattr(utils_infer, "_speaker_profile_cache", utils_infer.OrderedDict())
+
+
+def test_second_call_returns_cached_profile(tmp_path, fake_profile):
+    ref_audio = tmp_path / "ref.wav"
+    ref_audio.write_bytes(b"reference audio")
+    model_obj = object()
+
+    first = utils_infer.get_speaker_profile(str(ref_audio), "hello. ", model_obj)
+    # RefAudioCache touches the file on every hit, which must not change the key
+    os.utime(ref_audio, (1, 1))
+    second = utils_infer.get_speaker_profile(str(ref_audio), "hello. ", model_obj)
+
+    assert second is first
+
+
+def test_touching_cached_reference_keeps_profile(tmp_path, fake_profile):
+    ref_cache = utils_infer.RefAudioCache(cache_dir=str(tmp_path))
+    ref_audio = ref_cache._publish("abc", "wav", lambda path: open(path, "wb").write(b"reference audio"))
+    model_obj = object()
+
+    first = utils_infer.get_speaker_profile(ref_audio, "hello. ", model_obj)
+    second = utils_infer.get_speaker_profile(ref_cache.get_audio("abc"), "hello. ", model_obj)
+
+    assert second is first
+
+
+def test_changed_reference_builds_new_profile(tmp_path, fake_profile):
+    ref_audio = tmp_path / "ref.wav"
+    ref_audio.write_bytes(b"reference audio")
+    model_obj = object()
+
+    first = utils_infer.get_speaker_profile(str(ref_audio), "hello. ", model_obj)
+    ref_audio.write_bytes(b"other reference audio")
+    second = utils_infer.get_speaker_profile(str(ref_audio), "hello. ", model_obj)
+
+    assert second is not first
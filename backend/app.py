@@ -10,7 +10,7 @@ import random
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Union
 import logging
 from openai import OpenAI
 from dotenv import load_dotenv
@@ -20,7 +20,7 @@ import warnings
 import re
 from PIL import Image
 import io
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request, Depends, Header
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request, Depends, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
@@ -32,13 +32,13 @@ import uvicorn
 # Import Pydantic Models
 from models import (
     CharacterConfig, CharacterUpdate, CharacterResponse, SystemStatus,
-    ScriptRequest, DialogueLine, ScriptResponse, ScriptUpdate,
+    ScriptRequest, DialogueLine, ScriptResponse, ScriptSummary, ScriptUpdate,
     AudioGenerationStatus, AudioGenerationResponse,
     VideoGenerationStatus, VideoGenerationResponse,
     VideoGenerationJob, VideoGenerationJobResponse,
     SignupRequest, LoginRequest, UserResponse, AuthResponse,
     StarResponse, UserActivity, UserActivityResponse, ActivityStats,
-    MyScriptsResponse, UserFeedbackRequest, UserFeedbackResponse, UserFeedback,
+    MyScriptsResponse, ScriptsPageResponse, UserFeedbackRequest, UserFeedbackResponse, UserFeedback,
     AdminStats, RecentUser, SystemAlert
 )
 
@@ -48,11 +48,12 @@ from utils import (
     validateAudioFile, validateImageFile, trimImageTransparency, loadScripts, saveScripts, generateScriptId
 )
 from audio_service import (
-    checkF5ttsConnection, generateAudioFilename, generateAudioForScript, F5TTSClient
+    checkF5ttsConnection, generateAudioFilename, generateAudioForScript, F5TTSClient, getTTSOutputCache
 )
-from video_service import VideoGenerator
+from video_service import VideoGenerator, clearRenderCache, resolveEncoderProfile
+from background_library import prepareBackgroundLibraryAsync
 from openai_service import getOpenaiClient, generateScriptWithOpenai
-from firebase_service import initializeFirebaseService, getFirebaseService
+from firebase_service import initializeFirebaseService, getFirebaseService, InvalidCursorError, SCRIPT_SUMMARY_FIELDS
 from jwt_service import getJwtService
 from background_video_service import get_background_video_service, initialize_background_video_service
 from google.cloud import firestore
@@ -96,6 +97,18 @@ try:
 except Exception as e:
     print(f"❌ Background video service initialization failed: {str(e)}")
 
+# Pre-transcode backgrounds into the render-ready library (in the background, renders fall back meanwhile)
+try:
+    prepareBackgroundLibraryAsync(BACKGROUND_DIR, DEFAULT_BACKGROUND_VIDEO)
+except Exception as e:
+    print(f"❌ Background library preparation failed: {str(e)}")
+
+# Probe video encoders once at startup so renders don't pay for it
+try:
+    print(f"🎞️ Video encoder profile: {resolveEncoderProfile()}")
+except Exception as e:
+    print(f"❌ Video encoder probe failed: {str(e)}")
+
 openai_key = os.getenv('OPENAI_API_KEY')
 if openai_key:
     print(f"🔑 OpenAI API Key: {openai_key[:10]}...{openai_key[-4:]}")
@@ -118,8 +131,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_origin_regex=".*",
+    expose_headers=["X-Next-Cursor"],
 )
 
+@app.on_event("shutdown")
+def stopBackgroundVideoService():
+    # Release leases of in-flight video jobs so the next instance resumes them immediately
+    get_background_video_service().stop_background_processor()
+
 # Mount static files for serving images
 app.mount("/api/static", StaticFiles(directory=API_DATA_DIR), name="static")
 # Mount video files for direct access
@@ -244,8 +263,24 @@ def convert_images_dict_to_urls(images_dict: Dict[str, str], request: Request =
     logger.debug(f"🖼️ Converted {len(images_dict)} image paths to URLs")
     return urls_dict
 
-def build_character_response(char_id: str, char_data: Dict[str, Any], request: Request, current_user: Dict[str, Any]) -> CharacterResponse:
-    """Build a complete CharacterResponse with ownership information"""
+def load_character_lookups(characters: List[Dict[str, Any]], current_user: Dict[str, Any],
+                           favorite_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Request-scoped data for build_character_response: every creator's name from one get_all
+    batch and the caller's stars read once, instead of two Firestore reads per character.
+    favorite_ids skips the stars read when the caller already loaded them"""
+    firebase_service = getFirebaseService()
+    if favorite_ids is None:
+        favorite_ids = firebase_service.getFavoriteCharacterIds(current_user['id']) if current_user else []
+    
+    return {
+        "creator_names": firebase_service.getUserNamesByIds([char_data.get("createdBy") for char_data in characters]),
+        "starred_ids": set(favorite_ids)
+    }
+
+def build_character_response(char_id: str, char_data: Dict[str, Any], request: Request, current_user: Dict[str, Any],
+                             lookups: Optional[Dict[str, Any]] = None) -> CharacterResponse:
+    """Build a complete CharacterResponse with ownership information; lookups (see
+    load_character_lookups) answers creator names and stars from memory"""
     try:
         # Basic character data
         audio_file = char_data.get("audioFile", "")
@@ -275,8 +310,10 @@ def build_character_response(char_id: str, char_data: Dict[str, Any], request: R
         
         if created_by:
             # Get creator's name
-            firebase_service = getFirebaseService()
-            created_by_name = firebase_service.getUserNameById(created_by)
+            if lookups is not None:
+                created_by_name = lookups["creator_names"].get(created_by)
+            else:
+                created_by_name = getFirebaseService().getUserNameById(created_by)
             
             # Check if current user is the owner
             is_owner = (current_user and current_user.get('id') == created_by)
@@ -285,8 +322,10 @@ def build_character_response(char_id: str, char_data: Dict[str, Any], request: R
         starred_count = char_data.get("starred", 0)
         is_starred = False
         if current_user:
-            firebase_service = getFirebaseService()
-            is_starred = firebase_service.isCharacterStarredByUser(char_id, current_user.get('id'))
+            if lookups is not None:
+                is_starred = char_id in lookups["starred_ids"]
+            else:
+                is_starred = getFirebaseService().isCharacterStarredByUser(char_id, current_user.get('id'))
         
         return CharacterResponse(
             id=char_id,
@@ -511,18 +550,32 @@ async def get_system_status():
         logger.error(f"💥 Error getting system status: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def load_character_page(response: Response, limit: Optional[int], cursor: Optional[str]) -> Dict[str, Any]:
+    """Characters to list: every profile (cached) without a limit, else one projected page
+    with the next page's cursor in the X-Next-Cursor header"""
+    if not limit:
+        return loadUserProfiles(USER_PROFILES_FILE).get("users", {})
+    
+    characters, next_cursor = getFirebaseService().getCharactersPage(limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return {char_data.pop('id'): char_data for char_data in characters}
+
 @app.get("/api/characters", response_model=List[CharacterResponse])
-async def list_characters(request: Request, current_user: dict = Depends(get_current_user)):
+async def list_characters(request: Request, response: Response, limit: Optional[int] = Query(None, ge=1, le=200),
+                          cursor: Optional[str] = None, current_user: dict = Depends(get_current_user)):
     try:
-        profiles = loadUserProfiles(USER_PROFILES_FILE)
-        users = profiles.get("users", {})
+        users = load_character_page(response, limit, cursor)
+        lookups = load_character_lookups(list(users.values()), current_user)
         
         characters = []
         for char_id, char_data in users.items():
-            character = build_character_response(char_id, char_data, request, current_user)
+            character = build_character_response(char_id, char_data, request, current_user, lookups)
             characters.append(character)
         
         return characters
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"💥 Error listing characters: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -812,6 +865,7 @@ async def delete_character(character_id: str, current_user: dict = Depends(get_c
                         'defaultUser': new_default,
                         'updatedAt': datetime.now()
                     })
+                    firebase_service.invalidateCache('user_profiles', '_metadata')
                     logger.info(f"🔄 Updated default user to: {new_default}")
                 except Exception as e:
                     logger.warning(f"⚠️ Could not update default user: {str(e)}")
@@ -1048,63 +1102,72 @@ async def generateScript(request: ScriptRequest, currentUser: dict = Depends(get
         logger.error(f"💥 Script generation failed for user {currentUser['email']}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate script: {str(e)}")
 
-@app.get("/api/scripts", response_model=List[ScriptResponse])
-async def listScripts(currentUser: dict = Depends(get_current_user)):
+def buildScriptResponse(scriptData: Dict[str, Any], summary: bool = False) -> Union[ScriptResponse, ScriptSummary]:
+    """Script list entry with the video job information embedded; summary skips the dialogue
+    (and the audio file checks that need it), for documents read with SCRIPT_SUMMARY_FIELDS"""
+    summaryFields = dict(
+        id=scriptData["id"],
+        selectedCharacters=scriptData["selectedCharacters"],
+        originalPrompt=scriptData["originalPrompt"],
+        createdAt=scriptData["createdAt"],
+        updatedAt=scriptData["updatedAt"],
+        finalVideoPath=scriptData.get("finalVideoPath"),
+        videoDuration=scriptData.get("videoDuration"),
+        videoSize=scriptData.get("videoSize"),
+        # Video job information embedded directly in script
+        videoJobId=scriptData.get("currentVideoJobId"),
+        videoJobStatus=scriptData.get("videoJobStatus"),
+        videoJobProgress=scriptData.get("videoJobProgress", 0.0),
+        videoJobCurrentStep=scriptData.get("videoJobCurrentStep"),
+        videoJobStartedAt=scriptData.get("videoJobStartedAt"),
+        videoJobCompletedAt=scriptData.get("videoJobCompletedAt"),
+        videoJobErrorMessage=scriptData.get("videoJobErrorMessage")
+    )
+    if summary:
+        return ScriptSummary(**summaryFields)
+    
+    dialogueLines = scriptData.get("dialogue", [])
+    
+    # Count audio files that exist
+    audioCount = 0
+    for dialogueLine in dialogueLines:
+        audioFile = dialogueLine.get("audioFile", "")
+        if audioFile and os.path.exists(audioFile):
+            audioCount += 1
+    
+    return ScriptResponse(
+        **summaryFields,
+        dialogue=dialogueLines,
+        hasAudio=audioCount > 0,
+        audioCount=audioCount
+    )
+
+@app.get("/api/scripts", response_model=Union[List[Union[ScriptResponse, ScriptSummary]], ScriptsPageResponse])
+async def listScripts(response: Response, limit: Optional[int] = Query(None, ge=1, le=200), cursor: Optional[str] = None,
+                      summary: bool = False, currentUser: dict = Depends(get_current_user)):
+    """Other users' scripts. Without limit, all of them as a list, as before pagination; with limit, one
+    page as ScriptsPageResponse whose nextCursor (also sent as X-Next-Cursor) is the cursor of the next page.
+    summary=true returns ScriptSummary entries read with a projection (no dialogue)"""
     try:
-        logger.info(f"📋 User {currentUser['email']} requesting all scripts")
+        logger.info(f"📋 User {currentUser['email']} requesting scripts (limit {limit})")
         
-        # Get all scripts from Firebase
+        # User's own scripts are excluded by the query - they can get them from /api/my-scripts
         firebaseService = getFirebaseService()
-        scriptsData = firebaseService.getAllScripts()
-        scripts = scriptsData.get("scripts", {})
-        
-        scriptResponses = []
-        userScriptCount = 0
-        otherScriptCount = 0
-        
-        for scriptData in scripts.values():
-            # Check if this script belongs to current user
-            isOwner = scriptData.get("createdBy") == currentUser['id']
-            if isOwner:
-                userScriptCount += 1
-                continue  # Skip user's own scripts - they can get them from /api/my-scripts
-            
-            dialogueLines = scriptData.get("dialogue", [])
-            
-            # Count audio files that exist
-            audioCount = 0
-            for dialogueLine in dialogueLines:
-                audioFile = dialogueLine.get("audioFile", "")
-                if audioFile and os.path.exists(audioFile):
-                    audioCount += 1
-            
-            scriptResponse = ScriptResponse(
-                id=scriptData["id"],
-                selectedCharacters=scriptData["selectedCharacters"],
-                originalPrompt=scriptData["originalPrompt"],
-                dialogue=dialogueLines,
-                createdAt=scriptData["createdAt"],
-                updatedAt=scriptData["updatedAt"],
-                hasAudio=audioCount > 0,
-                audioCount=audioCount,
-                finalVideoPath=scriptData.get("finalVideoPath"),
-                videoDuration=scriptData.get("videoDuration"),
-                videoSize=scriptData.get("videoSize"),
-                # Video job information embedded directly in script
-                videoJobId=scriptData.get("currentVideoJobId"),
-                videoJobStatus=scriptData.get("videoJobStatus"),
-                videoJobProgress=scriptData.get("videoJobProgress", 0.0),
-                videoJobCurrentStep=scriptData.get("videoJobCurrentStep"),
-                videoJobStartedAt=scriptData.get("videoJobStartedAt"),
-                videoJobCompletedAt=scriptData.get("videoJobCompletedAt"),
-                videoJobErrorMessage=scriptData.get("videoJobErrorMessage")
-            )
-            scriptResponses.append(scriptResponse)
-            otherScriptCount += 1
+        scripts, nextCursor = firebaseService.getOtherUsersScripts(
+            currentUser['id'], limit, cursor, SCRIPT_SUMMARY_FIELDS if summary else None
+        )
+        if nextCursor:
+            response.headers["X-Next-Cursor"] = nextCursor
         
-        logger.info(f"📊 Retrieved {otherScriptCount} other users' scripts (excluded {userScriptCount} owned by {currentUser['email']})")
+        scriptResponses = [buildScriptResponse(scriptData, summary) for scriptData in scripts]
+        
+        logger.info(f"📊 Retrieved {len(scriptResponses)} other users' scripts for {currentUser['email']}")
+        if limit:
+            return ScriptsPageResponse(scripts=scriptResponses, nextCursor=nextCursor)
         return scriptResponses
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"💥 Failed to list scripts for user {currentUser['email']}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to list scripts: {str(e)}")
@@ -1227,6 +1290,7 @@ async def updateScript(scriptId: str, updates: ScriptUpdate, currentUser: dict =
                     # Keep existing audio if line unchanged
                     if oldAudio and oldAudio.strip() and os.path.exists(oldAudio):
                         newDialogueLine["audioFile"] = oldAudio
+                        newDialogueLine["audioDuration"] = oldLine.get("audioDuration")
                         logger.info(f"✅ Line {i} unchanged - keeping existing audio")
                     else:
                         logger.info(f"📝 Line {i} unchanged - no existing audio")
@@ -1352,6 +1416,8 @@ async def deleteScript(scriptId: str, currentUser: dict = Depends(get_current_us
             except Exception as e:
                 logger.warning(f"⚠️ Could not delete video {finalVideoPath}: {str(e)}")
         
+        clearRenderCache(scriptId, finalVideoPath)
+        
         # Delete from Firebase with associations cleanup
         success = firebaseService.deleteScriptWithAssociations(scriptId)
         if not success:
@@ -1459,7 +1525,7 @@ async def generateScriptAudio(scriptId: str, currentUser: dict = Depends(get_cur
         logger.info(f"🎤 Starting audio generation for script {scriptId}{ownerInfo} with {len(dialogueLines)} dialogue lines")
         
         # Load required data for audio generation
-        scriptsData = firebaseService.getAllScripts()
+        scriptsData = firebaseService.getScriptData(scriptId)
         userProfiles = loadUserProfiles(USER_PROFILES_FILE)
         
         # Generate audio files
@@ -1487,6 +1553,7 @@ async def get_f5tts_status():
         return {
             "status": "connected" if is_connected else "disconnected",
             "url": F5TTS_URL,
+            "cache": getTTSOutputCache().getStats(),
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -1544,7 +1611,7 @@ async def generateScriptVideo(scriptId: str, currentUser: dict = Depends(get_cur
         current_queue_size = queue_status['queue_size']
         
         logger.info(f"🎥 Queuing video generation for script {scriptId}{ownerInfo} with {len(dialogueLines)} dialogue lines")
-        logger.info(f"📊 Current queue status: {current_queue_size} jobs waiting, Sequential processing mode")
+        logger.info(f"📊 Current queue status: {current_queue_size} jobs waiting, {queue_status['processing_jobs_count']} in the pipeline")
         
         # Queue video generation job
         jobId = await backgroundService.queue_video_generation(
@@ -1572,7 +1639,7 @@ async def generateScriptVideo(scriptId: str, currentUser: dict = Depends(get_cur
         
         return VideoGenerationJobResponse(
             job=job,
-            message=f"Video generation queued successfully! Job ID: {jobId}. {position_message} (Sequential processing mode - one video at a time)"
+            message=f"Video generation queued successfully! Job ID: {jobId}. {position_message}"
         )
         
     except HTTPException:
@@ -1716,11 +1783,12 @@ async def get_my_characters(request: Request, current_user: dict = Depends(get_c
     try:
         firebase_service = getFirebaseService()
         user_characters = firebase_service.getUserCharacters(current_user['id'])
+        lookups = load_character_lookups(user_characters, current_user)
         
         characters = []
         for char_data in user_characters:
             char_id = char_data['id']
-            character = build_character_response(char_id, char_data, request, current_user)
+            character = build_character_response(char_id, char_data, request, current_user, lookups)
             characters.append(character)
         
         logger.info(f"📄 Retrieved {len(characters)} characters for user {current_user['id']}")
@@ -1730,36 +1798,45 @@ async def get_my_characters(request: Request, current_user: dict = Depends(get_c
         raise HTTPException(status_code=500, detail=f"Failed to get user's characters: {str(e)}")
 
 @app.get("/api/characters-combined", response_model=Dict[str, List[CharacterResponse]])
-async def get_characters_combined(request: Request, current_user: dict = Depends(get_current_user)):
-    """Get all characters, user's characters, and favorites in one API call"""
+async def get_characters_combined(request: Request, response: Response, limit: Optional[int] = Query(None, ge=1, le=200),
+                                  cursor: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Get all characters, user's characters, and favorites in one API call; limit/cursor page the "all" list"""
     try:
         firebase_service = getFirebaseService()
         
         # Load user profiles once (will use cache if available)
-        profiles = loadUserProfiles(USER_PROFILES_FILE)
-        users = profiles.get("users", {})
-        
-        # Get all characters
-        all_characters = []
-        for char_id, char_data in users.items():
-            character = build_character_response(char_id, char_data, request, current_user)
-            all_characters.append(character)
+        users = load_character_page(response, limit, cursor)
         
         # Get user's characters
         user_characters = firebase_service.getUserCharacters(current_user['id'])
-        my_characters = []
-        for char_data in user_characters:
-            char_id = char_data['id']
-            character = build_character_response(char_id, char_data, request, current_user)
-            my_characters.append(character)
         
-        # Get user's favorites
-        favorite_characters = firebase_service.getUserFavoriteCharacters(current_user['id'])
-        my_favorites = []
-        for char_data in favorite_characters:
-            char_id = char_data['id']
-            character = build_character_response(char_id, char_data, request, current_user)
-            my_favorites.append(character)
+        # Get user's favorites, fetching only those that aren't already loaded
+        favorite_ids = firebase_service.getFavoriteCharacterIds(current_user['id'])
+        missing_favorites = {char_data['id']: char_data for char_data in firebase_service.getCharactersByIds(
+            [char_id for char_id in favorite_ids if char_id not in users]
+        )}
+        favorite_characters = [
+            {**users[char_id], 'id': char_id} if char_id in users else missing_favorites[char_id]
+            for char_id in favorite_ids if char_id in users or char_id in missing_favorites
+        ]
+        
+        # Creator names and stars of all three lists from memory
+        lookups = load_character_lookups(
+            list(users.values()) + user_characters + favorite_characters, current_user, favorite_ids
+        )
+        
+        all_characters = [
+            build_character_response(char_id, char_data, request, current_user, lookups)
+            for char_id, char_data in users.items()
+        ]
+        my_characters = [
+            build_character_response(char_data['id'], char_data, request, current_user, lookups)
+            for char_data in user_characters
+        ]
+        my_favorites = [
+            build_character_response(char_data['id'], char_data, request, current_user, lookups)
+            for char_data in favorite_characters
+        ]
         
         logger.info(f"📄 Combined response: {len(all_characters)} all, {len(my_characters)} owned, {len(my_favorites)} favorites")
         
@@ -1769,64 +1846,39 @@ async def get_characters_combined(request: Request, current_user: dict = Depends
             "my_favorites": my_favorites
         }
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"💥 Error getting combined characters: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get characters: {str(e)}")
 
 @app.get("/api/my-scripts", response_model=MyScriptsResponse)
-async def getMyScripts(currentUser: dict = Depends(get_current_user)):
-    """Get all scripts created by the current user with embedded video job information and current token count"""
+async def getMyScripts(limit: Optional[int] = Query(None, ge=1, le=200), cursor: Optional[str] = None,
+                       summary: bool = False, currentUser: dict = Depends(get_current_user)):
+    """Get the scripts created by the current user with embedded video job information and current token count.
+    With limit, newest first one page at a time (nextCursor); summary=true leaves out the dialogue"""
     try:
         logger.info(f"📝 User {currentUser['email']} requesting their own scripts")
         
         # Get user's scripts from Firebase
         firebaseService = getFirebaseService()
-        userScripts = firebaseService.getUserScripts(currentUser['id'])
-        
-        scriptResponses = []
+        userScripts, nextCursor = firebaseService.getUserScriptsPage(
+            currentUser['id'], limit, cursor, SCRIPT_SUMMARY_FIELDS if summary else None
+        )
         
-        for scriptData in userScripts:
-            dialogueLines = scriptData.get("dialogue", [])
-            
-            # Count audio files that exist
-            audioCount = 0
-            for dialogueLine in dialogueLines:
-                audioFile = dialogueLine.get("audioFile", "")
-                if audioFile and os.path.exists(audioFile):
-                    audioCount += 1
-            
-            # **NEW**: Add video job information to the script response
-            scriptResponse = ScriptResponse(
-                id=scriptData["id"],
-                selectedCharacters=scriptData["selectedCharacters"],
-                originalPrompt=scriptData["originalPrompt"],
-                dialogue=dialogueLines,
-                createdAt=scriptData["createdAt"],
-                updatedAt=scriptData["updatedAt"],
-                hasAudio=audioCount > 0,
-                audioCount=audioCount,
-                finalVideoPath=scriptData.get("finalVideoPath"),
-                videoDuration=scriptData.get("videoDuration"),
-                videoSize=scriptData.get("videoSize"),
-                # Video job information embedded directly in script
-                videoJobId=scriptData.get("currentVideoJobId"),
-                videoJobStatus=scriptData.get("videoJobStatus"),
-                videoJobProgress=scriptData.get("videoJobProgress", 0.0),
-                videoJobCurrentStep=scriptData.get("videoJobCurrentStep"),
-                videoJobStartedAt=scriptData.get("videoJobStartedAt"),
-                videoJobCompletedAt=scriptData.get("videoJobCompletedAt"),
-                videoJobErrorMessage=scriptData.get("videoJobErrorMessage")
-            )
-            scriptResponses.append(scriptResponse)
+        scriptResponses = [buildScriptResponse(scriptData, summary) for scriptData in userScripts]
         
         logger.info(f"📊 Retrieved {len(scriptResponses)} scripts for user {currentUser['email']}")
         
         # Return both scripts and current user token count
         return MyScriptsResponse(
             scripts=scriptResponses,
-            userTokens=currentUser.get('tokens', 0)
+            userTokens=currentUser.get('tokens', 0),
+            nextCursor=nextCursor
         )
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"💥 Failed to get user scripts for {currentUser['email']}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get user scripts: {str(e)}")
@@ -1934,14 +1986,16 @@ async def get_my_favorite_characters(request: Request, current_user: dict = Depe
         firebase_service = getFirebaseService()
         
         # Get favorite characters data
-        favorite_chars_data = firebase_service.getUserFavoriteCharacters(current_user['id'])
+        favorite_ids = firebase_service.getFavoriteCharacterIds(current_user['id'])
+        favorite_chars_data = firebase_service.getCharactersByIds(favorite_ids)
+        lookups = load_character_lookups(favorite_chars_data, current_user, favorite_ids)
         
         # Build response list
         response_list = []
         for char_data in favorite_chars_data:
             char_id = char_data.get('id')
             if char_id:
-                character_response = build_character_response(char_id, char_data, request, current_user)
+                character_response = build_character_response(char_id, char_data, request, current_user, lookups)
                 response_list.append(character_response)
         
         logger.info(f"✅ Retrieved {len(response_list)} favorite characters for user {current_user['id']}")
@@ -2101,8 +2155,8 @@ async def getMyVideoGenerationJobs(currentUser: dict = Depends(get_current_user)
         for job in jobs:
             if job.status == "queued":
                 # Estimate queue position (rough estimate)
-                job.message = f"Queued for processing (Sequential mode: {queue_status['queue_size']} jobs ahead)"
-            elif job.status == "in_progress" and job.jobId == queue_status.get("current_job_id"):
+                job.message = f"Queued for processing ({queue_status['queue_size']} jobs waiting)"
+            elif job.status == "in_progress" and job.jobId in queue_status.get("active_jobs", []):
                 job.message = f"Currently processing: {job.currentStep}"
         
         logger.info(f"✅ Retrieved {len(jobs)} video generation jobs for user {currentUser['email']}")
@@ -2274,7 +2328,7 @@ async def get_video_queue_status(current_user: dict = Depends(get_current_user))
         result = {
             **queue_status,
             "active_jobs_details": active_jobs_details,
-            "message": "Sequential video processing (one at a time)" if queue_status.get("is_processing") else "Queue processor not running"
+            "message": "Pipelined video processing (audio, timeline and render stages run concurrently)" if queue_status.get("is_processing") else "Queue processor not running"
         }
         
         logger.info(f"✅ Queue status for {current_user['email']}: {queue_status['queue_size']} queued, {len(active_jobs_details)} active")
@@ -2512,9 +2566,8 @@ async def clear_system_cache(admin_user: dict = Depends(get_admin_user)):
     try:
         logger.info(f"👨‍💼 Admin {admin_user['email']} clearing system cache")
         
-        # Clear user profiles cache
-        from utils import _clear_cache
-        _clear_cache()
+        # Clear the Firestore document cache (user profiles, users, scripts, jobs)
+        getFirebaseService().invalidateCache()
         
         logger.info("✅ System cache cleared successfully")
         return {"success": True, "message": "System cache cleared successfully"}
@@ -2523,6 +2576,16 @@ async def clear_system_cache(admin_user: dict = Depends(get_admin_user)):
         logger.error(f"💥 Error clearing cache: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to image.pnghe: {str(e)}")
 
+@app.get("/api/admin/cache-stats")
+async def get_cache_stats(admin_user: dict = Depends(get_admin_user)):
+    """Hit rates and sizes of the Firestore document cache"""
+    try:
+        return getFirebaseService().getCacheStats()
+        
+    except Exception as e:
+        logger.error(f"💥 Error getting cache stats: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get cache stats: {str(e)}")
+
 @app.post("/api/admin/send-alert")
 async def send_system_alert(
     request: dict,
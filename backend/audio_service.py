@@ -1,15 +1,31 @@
 import os
+import re
 import time
 import shutil
+import hashlib
 import logging
+import threading
+from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+import numpy as np
+import soundfile as sf
 from fastapi import HTTPException
 from gradio_client import Client, handle_file
-from models import AudioGenerationResponse
+from models import AudioGenerationResponse, CharacterConfig
+from media_probe import getAudioDuration
 
 logger = logging.getLogger(__name__)
 
+# Engine used by generateAudioForScript: "local" runs F5-TTS in-process, "gradio" talks to the F5-TTS web app
+TTS_ENGINE = os.getenv("TTS_ENGINE", "local").lower()
+F5TTS_MODEL = os.getenv("F5TTS_MODEL", "F5TTS_v1_Base")
+F5TTS_DEVICE = os.getenv("F5TTS_DEVICE") or None
+TTS_BATCHED = os.getenv("TTS_BATCHED", "true").lower() == "true"
+TTS_BATCH_LINES = int(os.getenv("TTS_BATCH_LINES", "8"))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "apiData/audio_files/tts_cache")
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "2048"))
+
 def checkF5ttsConnection(f5ttsUrl: str = "http://localhost:7860") -> bool:
     try:
         import requests
@@ -24,7 +40,183 @@ def generateAudioFilename(scriptId: str, lineIndex: int, speaker: str) -> str:
     safeSpeaker = speaker.lower().replace(' ', '_').replace('-', '_')
     return f"{scriptId}_line{lineIndex}_{safeSpeaker}_{timestamp}.wav"
 
-class F5TTSClient:
+def ttsCacheIdentity(engineName: str) -> str:
+    """The engine and model that produced a line, part of its TTS cache key"""
+    engineName = engineName.lower()
+    return f"{engineName}:{F5TTS_MODEL}" if engineName == "local" else engineName
+
+class TTSOutputCache:
+    """Content-addressed on-disk cache of synthesized lines with size-based LRU eviction
+    
+    Keys are derived from the engine and model, the reference audio content, the normalized text
+    and the character config, so identical lines are reused across scripts and re-renders.
+    Lines are copied in and out, never linked, so rewriting a line file leaves the cache intact.
+    """
+
+    def __init__(self, cacheDir: str = TTS_CACHE_DIR, maxBytes: int = TTS_CACHE_MAX_MB * 1024 * 1024):
+        self.cacheDir = cacheDir
+        self.maxBytes = maxBytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._audioHashes = {}  # (path, size, mtime) -> md5, avoids re-reading reference audio
+        self._entries = {}  # cache file -> (size, last access)
+        
+        os.makedirs(self.cacheDir, exist_ok=True)
+        for fileName in os.listdir(self.cacheDir):
+            if fileName.endswith(".wav"):
+                stat = os.stat(os.path.join(self.cacheDir, fileName))
+                self._entries[fileName] = (stat.st_size, stat.st_mtime)
+        self.totalBytes = sum(size for size, _ in self._entries.values())
+        logger.info(f"🗄️ TTS cache: {len(self._entries)} entries, {self.totalBytes / 1024 / 1024:.1f} MB in {self.cacheDir}")
+
+    def _hashAudioFile(self, audioFilePath: str) -> str:
+        stat = os.stat(audioFilePath)
+        statKey = (os.path.abspath(audioFilePath), stat.st_size, stat.st_mtime)
+        audioHash = self._audioHashes.get(statKey)
+        if audioHash is None:
+            md5 = hashlib.md5()
+            with open(audioFilePath, "rb") as audioFile:
+                for block in iter(lambda: audioFile.read(1024 * 1024), b""):
+                    md5.update(block)
+            audioHash = md5.hexdigest()
+            self._audioHashes[statKey] = audioHash
+        return audioHash
+
+    def makeKey(self, audioFilePath: str, text: str, config: Dict[str, Any], engineIdentity: str) -> str:
+        normalizedText = re.sub(r"\s+", " ", text).strip()
+        try:
+            configFields = CharacterConfig(**config).dict()
+        except Exception:
+            configFields = dict(config)
+        configPart = ",".join(f"{name}={configFields[name]}" for name in sorted(configFields))
+        keySource = f"{engineIdentity}|{self._hashAudioFile(audioFilePath)}|{normalizedText}|{configPart}"
+        return hashlib.md5(keySource.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cacheDir, f"{key}.wav")
+
+    @staticmethod
+    def _copy(sourcePath: str, targetPath: str):
+        # A private copy per file: touching or rewriting one never reaches the other
+        tempPath = f"{targetPath}.tmp"
+        shutil.copyfile(sourcePath, tempPath)
+        os.replace(tempPath, targetPath)
+
+    def fetch(self, key: str, outputPath: str) -> bool:
+        """Materialize a cached line at outputPath, returns False on a miss"""
+        fileName = f"{key}.wav"
+        with self.lock:
+            if fileName not in self._entries or not os.path.exists(self._path(key)):
+                self._entries.pop(fileName, None)
+                self.misses += 1
+                return False
+            
+            try:
+                self._copy(self._path(key), outputPath)
+                now = time.time()
+                os.utime(self._path(key), (now, now))
+                self._entries[fileName] = (self._entries[fileName][0], now)
+                self.hits += 1
+                return True
+            except Exception as e:
+                logger.warning(f"⚠️ TTS cache read failed for {key}: {str(e)}")
+                self.misses += 1
+                return False
+
+    def store(self, key: str, audioPath: str):
+        fileName = f"{key}.wav"
+        with self.lock:
+            try:
+                self._copy(audioPath, self._path(key))
+                size = os.path.getsize(self._path(key))
+                previousSize = self._entries.get(fileName, (0, 0))[0]
+                self._entries[fileName] = (size, time.time())
+                self.totalBytes += size - previousSize
+                self._evict()
+            except Exception as e:
+                logger.warning(f"⚠️ TTS cache write failed for {key}: {str(e)}")
+
+    def _evict(self):
+        if self.totalBytes <= self.maxBytes:
+            return
+        
+        for fileName, (size, _) in sorted(self._entries.items(), key=lambda entry: entry[1][1]):
+            if self.totalBytes <= self.maxBytes:
+                break
+            try:
+                os.remove(os.path.join(self.cacheDir, fileName))
+            except FileNotFoundError:
+                pass
+            del self._entries[fileName]
+            self.totalBytes -= size
+            self.evictions += 1
+
+    def getStats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "sizeBytes": self.totalBytes,
+                "maxBytes": self.maxBytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": self.hits / lookups if lookups else 0.0
+            }
+
+
+ttsOutputCache = None
+
+def getTTSOutputCache() -> TTSOutputCache:
+    global ttsOutputCache
+    if ttsOutputCache is None:
+        ttsOutputCache = TTSOutputCache()
+    return ttsOutputCache
+
+
+class TTSEngine(ABC):
+    """Base interface for speech synthesis backends used by generateAudioForScript"""
+    name = "base"
+
+    @abstractmethod
+    def connect(self) -> bool:
+        ...
+
+    @abstractmethod
+    def synthesize(self, audioFilePath: str, text: str, config: Dict[str, Any]) -> Optional[Tuple[np.ndarray, int]]:
+        """Return (waveform, sampleRate) for text spoken in the voice of audioFilePath"""
+
+    def generateSpeechToFile(self, audioFilePath: str, text: str, config: Dict[str, Any], outputPath: str) -> bool:
+        result = self.synthesize(audioFilePath, text, config)
+        if result is None:
+            return False
+
+        wave, sampleRate = result
+        try:
+            sf.write(outputPath, wave, sampleRate)
+        except Exception as e:
+            logger.error(f"❌ Failed to write audio file {outputPath}: {str(e)}")
+            return False
+
+        return os.path.exists(outputPath) and os.path.getsize(outputPath) > 0
+
+    def generateSpeechBatchToFiles(self, requests: List[Dict[str, Any]]) -> List[bool]:
+        """Synthesize several lines; each request has audioFilePath, text, config and outputPath"""
+        return [
+            self.generateSpeechToFile(r["audioFilePath"], r["text"], r["config"], r["outputPath"])
+            for r in requests
+        ]
+
+    def close(self):
+        pass
+
+
+class F5TTSClient(TTSEngine):
+    """Gradio HTTP client for a running F5-TTS web app - fallback when the local engine is unavailable"""
+    name = "gradio"
+
     def __init__(self, url: str = "http://localhost:7860"):
         self.url = url
         self.client = None
@@ -108,6 +300,32 @@ class F5TTSClient:
             logger.error(f"❌ Speech generation failed: {str(e)}")
             return None
     
+    def synthesize(self, audioFilePath: str, text: str, config: Dict[str, Any]) -> Optional[Tuple[np.ndarray, int]]:
+        audioPath = self.generateSpeech(audioFilePath, text, config)
+        if not audioPath:
+            return None
+        
+        try:
+            wave, sampleRate = sf.read(audioPath, dtype="float32")
+            return wave, sampleRate
+        except Exception as e:
+            logger.error(f"❌ Failed to read generated audio {audioPath}: {str(e)}")
+            return None
+    
+    def generateSpeechToFile(self, audioFilePath: str, text: str, config: Dict[str, Any], outputPath: str) -> bool:
+        # Gradio already wrote a WAV, copying it is cheaper than decoding and re-encoding
+        tempAudioPath = self.generateSpeech(audioFilePath, text, config)
+        if not tempAudioPath or not os.path.exists(tempAudioPath):
+            return False
+        
+        try:
+            shutil.copy2(tempAudioPath, outputPath)
+        except Exception as e:
+            logger.error(f"❌ Failed to copy generated audio to {outputPath}: {str(e)}")
+            return False
+        
+        return os.path.exists(outputPath) and os.path.getsize(outputPath) > 0
+    
     def close(self):
         if self.client:
             try:
@@ -123,10 +341,189 @@ class F5TTSClient:
         else:
             logger.debug("📤 F5-TTS connection already closed")
 
+# The F5-TTS model is loaded once per process and shared by every LocalF5TTSEngine
+_localModel = None
+_localModelLock = threading.Lock()
+_localInferenceLock = threading.Lock()
+
+def _getLocalF5ttsModel():
+    global _localModel
+    if _localModel is None:
+        with _localModelLock:
+            if _localModel is None:
+                from f5_tts.api import F5TTS
+                
+                startTime = time.time()
+                _localModel = F5TTS(model=F5TTS_MODEL, device=F5TTS_DEVICE)
+                logger.info(f"🧠 Loaded F5-TTS model {F5TTS_MODEL} on {_localModel.device} in {time.time() - startTime:.2f}s")
+    return _localModel
+
+
+class LocalF5TTSEngine(TTSEngine):
+    """In-process F5-TTS engine - returns numpy waveforms without HTTP, uploads or temp files"""
+    name = "local"
+
+    def __init__(self):
+        self.model = None
+        self.connected = False
+
+    def connect(self) -> bool:
+        try:
+            self.model = _getLocalF5ttsModel()
+            self.connected = True
+            return True
+        except Exception as e:
+            logger.error(f"💥 Failed to load local F5-TTS model: {str(e)}")
+            self.connected = False
+            return False
+
+    def _getSpeakerProfile(self, audioFilePath: str):
+        # Per-character conditioning stays on the model's device between scripts; utils_infer
+        # keeps the LRU of profiles and the preprocessed reference clips are cached on disk
+        return self.model.get_speaker_profile(audioFilePath, "", show_info=logger.debug)
+
+    def _infer(self, audioFilePath: str, text: str, config: Dict[str, Any], fileWave: Optional[str] = None):
+        if not self.connected or not self.model:
+            logger.error("❌ Local F5-TTS engine not loaded")
+            return None
+        
+        if not os.path.exists(audioFilePath):
+            logger.error(f"❌ Audio file not found: {audioFilePath}")
+            return None
+        
+        if not text or not text.strip():
+            logger.error("❌ Empty text provided")
+            return None
+        
+        text = text.strip()
+        logger.debug(f"🎤 Generating speech: {text[:50]}...")
+        
+        try:
+            startTime = time.time()
+            
+            # One inference at a time - the model and its caches are shared process-wide
+            with _localInferenceLock:
+                wave, sampleRate, _ = self.model.infer(
+                    ref_file=self._getSpeakerProfile(audioFilePath),
+                    ref_text="",
+                    gen_text=text,
+                    show_info=logger.debug,
+                    progress=None,
+                    cross_fade_duration=config.get("crossFadeDuration", 0.15),
+                    nfe_step=int(config.get("nfeSteps", 34)),
+                    speed=config.get("speed", 1.0),
+                    remove_silence=config.get("removeSilences", True),
+                    file_wave=fileWave,
+                )
+            
+            if wave is None or len(wave) == 0:
+                logger.error("❌ F5-TTS returned empty audio")
+                return None
+            
+            logger.info(f"✅ Speech generated in {time.time() - startTime:.2f}s ({len(wave) / sampleRate:.2f}s of audio)")
+            return wave, sampleRate
+            
+        except Exception as e:
+            logger.error(f"❌ Speech generation failed: {str(e)}")
+            return None
+
+    def synthesize(self, audioFilePath: str, text: str, config: Dict[str, Any]) -> Optional[Tuple[np.ndarray, int]]:
+        return self._infer(audioFilePath, text, config)
+
+    def generateSpeechToFile(self, audioFilePath: str, text: str, config: Dict[str, Any], outputPath: str) -> bool:
+        # Single lines (and every line with TTS_BATCHED=false); batches go through
+        # generateSpeechBatchToFiles. F5TTS.export_wav writes the output so silence removal
+        # happens on the final file
+        result = self._infer(audioFilePath, text, config, fileWave=outputPath)
+        if result is None:
+            return False
+        return os.path.exists(outputPath) and os.path.getsize(outputPath) > 0
+
+    def generateSpeechBatchToFiles(self, requests: List[Dict[str, Any]]) -> List[bool]:
+        if not self.connected or not self.model:
+            logger.error("❌ Local F5-TTS engine not loaded")
+            return [False] * len(requests)
+        
+        validRequests = [r for r in requests if os.path.exists(r["audioFilePath"]) and r["text"].strip()]
+        if len(validRequests) < len(requests):
+            logger.warning(f"⚠️ Skipping {len(requests) - len(validRequests)} invalid lines in batch")
+        if not validRequests:
+            return [False] * len(requests)
+        
+        # Callers group lines by sampler settings, so the first config speaks for the batch
+        config = validRequests[0]["config"]
+        try:
+            startTime = time.time()
+            with _localInferenceLock:
+                prompts = [
+                    {
+                        "ref_file": self._getSpeakerProfile(r["audioFilePath"]),
+                        "gen_text": r["text"].strip(),
+                        "speed": r["config"].get("speed", 1.0),
+                    }
+                    for r in validRequests
+                ]
+                results = self.model.infer_batch(
+                    prompts,
+                    show_info=logger.debug,
+                    progress=None,
+                    cross_fade_duration=config.get("crossFadeDuration", 0.15),
+                    nfe_step=int(config.get("nfeSteps", 34)),
+                )
+            logger.info(f"✅ Batch of {len(prompts)} lines generated in {time.time() - startTime:.2f}s")
+        except Exception as e:
+            logger.error(f"❌ Batch speech generation failed: {str(e)}")
+            return [False] * len(requests)
+        
+        written = {}
+        for r, (wave, sampleRate) in zip(validRequests, results):
+            if wave is None or len(wave) == 0:
+                written[id(r)] = False
+                continue
+            try:
+                self.model.export_wav(wave, r["outputPath"], r["config"].get("removeSilences", True))
+                written[id(r)] = os.path.exists(r["outputPath"]) and os.path.getsize(r["outputPath"]) > 0
+            except Exception as e:
+                logger.error(f"❌ Failed to write audio file {r['outputPath']}: {str(e)}")
+                written[id(r)] = False
+        
+        return [written.get(id(r), False) for r in requests]
+
+    def close(self):
+        # Keep the shared model loaded for the next script
+        self.connected = False
+
+
+def createTTSEngine(engineName: Optional[str] = None) -> TTSEngine:
+    """Create and connect the configured TTS engine, falling back to the Gradio client"""
+    engineName = (engineName or TTS_ENGINE).lower()
+    
+    if engineName == "local":
+        engine = LocalF5TTSEngine()
+        if engine.connect():
+            logger.info("🧠 Using in-process F5-TTS engine")
+            return engine
+        logger.warning("⚠️ Local F5-TTS engine unavailable, falling back to Gradio client")
+    
+    if not checkF5ttsConnection():
+        raise HTTPException(status_code=503, detail="F5-TTS service is not available")
+    
+    engine = F5TTSClient()
+    if not engine.connect():
+        raise HTTPException(status_code=503, detail="Failed to connect to F5-TTS service")
+    
+    logger.info("🔗 Using Gradio F5-TTS client")
+    return engine
+
 async def generateAudioForScript(scriptId: str, scriptsData: Dict, userProfiles: Dict, 
-                                generatedAudioDir: str, progress_callback=None) -> AudioGenerationResponse:
-    """Generate audio files for all dialogue lines in a script - SEQUENTIAL F5-TTS ACCESS"""
-    f5ttsClient = None
+                                generatedAudioDir: str, progress_callback=None,
+                                batched: Optional[bool] = None) -> AudioGenerationResponse:
+    """Generate audio files for all dialogue lines in a script - SEQUENTIAL F5-TTS ACCESS
+    
+    With batched=True (default from TTS_BATCHED) missing lines are sent to the engine together,
+    so the local engine can pack several speakers into one sampling pass.
+    """
+    ttsEngine = None
     try:
         scripts = scriptsData.get("scripts", {})
         
@@ -139,15 +536,9 @@ async def generateAudioForScript(scriptId: str, scriptsData: Dict, userProfiles:
         if not dialogueLines:
             raise HTTPException(status_code=400, detail="Script has no dialogue lines")
         
-        if not checkF5ttsConnection():
-            raise HTTPException(status_code=503, detail="F5-TTS service is not available")
-        
         users = userProfiles.get("users", {})
-        
-        # Connect to F5-TTS with exclusive access
-        f5ttsClient = F5TTSClient()
-        if not f5ttsClient.connect():
-            raise HTTPException(status_code=503, detail="Failed to connect to F5-TTS service")
+        ttsCache = getTTSOutputCache()
+        lookupIdentity = ttsCacheIdentity(TTS_ENGINE)
         
         logger.info(f"🎵 Starting audio generation for {len(dialogueLines)} lines")
         
@@ -158,6 +549,12 @@ async def generateAudioForScript(scriptId: str, scriptsData: Dict, userProfiles:
         processedLines = 0
         
         updatedDialogue = []
+        pendingLines = []  # (updatedLine, request) for lines that still need synthesis
+        
+        def reportProgress(message: str):
+            if progress_callback:
+                progress_percent = (processedLines / totalLines) * 100
+                progress_callback(progress_percent, message)
             
         for lineIndex, dialogueLine in enumerate(dialogueLines):
             try:
@@ -168,46 +565,33 @@ async def generateAudioForScript(scriptId: str, scriptsData: Dict, userProfiles:
                 updatedLine = {
                     "speaker": dialogueLine.get("speaker", ""),
                     "text": text,
-                    "audioFile": existingAudio if existingAudio else ""
+                    "audioFile": existingAudio if existingAudio else "",
+                    "audioDuration": dialogueLine.get("audioDuration") if existingAudio else None
                 }
+                updatedDialogue.append(updatedLine)
                 
                 if not speaker or not text:
                     failedLines += 1
                     processedLines += 1
-                    updatedDialogue.append(updatedLine)
-                    
-                    # Call progress callback if provided
-                    if progress_callback:
-                        progress_percent = (processedLines / totalLines) * 100
-                        progress_callback(progress_percent, f"Processed line {processedLines}/{totalLines} (invalid)")
-                    
+                    reportProgress(f"Processed line {processedLines}/{totalLines} (invalid)")
                     continue
                 
                 if existingAudio and existingAudio.strip() and os.path.exists(existingAudio):
+                    if not updatedLine["audioDuration"]:
+                        updatedLine["audioDuration"] = getAudioDuration(existingAudio)
                     completedLines += 1
                     processedLines += 1
-                    updatedDialogue.append(updatedLine)
-                    
-                    # Call progress callback if provided
-                    if progress_callback:
-                        progress_percent = (processedLines / totalLines) * 100
-                        progress_callback(progress_percent, f"Processed line {processedLines}/{totalLines} (existing audio)")
-                    
+                    reportProgress(f"Processed line {processedLines}/{totalLines} (existing audio)")
                     continue
                 
                 if existingAudio and existingAudio.strip() and not os.path.exists(existingAudio):
                     updatedLine["audioFile"] = ""
+                    updatedLine["audioDuration"] = None
                 
                 if speaker not in users:
                     failedLines += 1
                     processedLines += 1
-                    updatedDialogue.append(updatedLine)
-                    
-                    # Call progress callback if provided
-                    if progress_callback:
-                        progress_percent = (processedLines / totalLines) * 100
-                        progress_callback(progress_percent, f"Processed line {processedLines}/{totalLines} (character not found)")
-                    
+                    reportProgress(f"Processed line {processedLines}/{totalLines} (character not found)")
                     continue
                 
                 charData = users[speaker]
@@ -216,69 +600,102 @@ async def generateAudioForScript(scriptId: str, scriptsData: Dict, userProfiles:
                 if not charAudioFile or not os.path.exists(charAudioFile):
                     failedLines += 1
                     processedLines += 1
-                    updatedDialogue.append(updatedLine)
-                    
-                    # Call progress callback if provided
-                    if progress_callback:
-                        progress_percent = (processedLines / totalLines) * 100
-                        progress_callback(progress_percent, f"Processed line {processedLines}/{totalLines} (missing audio file)")
-                    
+                    reportProgress(f"Processed line {processedLines}/{totalLines} (missing audio file)")
                     continue
                 
                 charConfig = charData.get("config", {})
-                
                 outputFilename = generateAudioFilename(scriptId, lineIndex, speaker)
                 outputPath = os.path.join(generatedAudioDir, outputFilename)
                 
-                try:
-                    tempAudioPath = f5ttsClient.generateSpeech(charAudioFile, text, charConfig)
-                    
-                    if tempAudioPath and os.path.exists(tempAudioPath):
-                        try:
-                            shutil.copy2(tempAudioPath, outputPath)
-                            
-                            if os.path.exists(outputPath) and os.path.getsize(outputPath) > 0:
-                                updatedLine["audioFile"] = outputPath
-                                completedLines += 1
-                            else:
-                                if os.path.exists(outputPath):
-                                    try:
-                                        os.remove(outputPath)
-                                    except:
-                                        pass
-                                failedLines += 1
-                        except Exception:
-                            failedLines += 1
-                    else:
-                        failedLines += 1
-                        
-                except Exception:
-                    failedLines += 1
-                
-                processedLines += 1
-                updatedDialogue.append(updatedLine)
+                cacheKey = ttsCache.makeKey(charAudioFile, text, charConfig, lookupIdentity)
+                if ttsCache.fetch(cacheKey, outputPath):
+                    updatedLine["audioFile"] = outputPath
+                    updatedLine["audioDuration"] = getAudioDuration(outputPath)
+                    completedLines += 1
+                    processedLines += 1
+                    reportProgress(f"Processed line {processedLines}/{totalLines} (cached audio)")
+                    continue
                 
-                # Call progress callback if provided
-                if progress_callback:
-                    progress_percent = (processedLines / totalLines) * 100
-                    progress_callback(progress_percent, f"Generated audio for line {processedLines}/{totalLines}")
+                pendingLines.append((updatedLine, {
+                    "audioFilePath": charAudioFile,
+                    "text": text,
+                    "config": charConfig,
+                    "outputPath": outputPath,
+                    "cacheKey": cacheKey
+                }))
                 
             except Exception:
                 failedLines += 1
                 processedLines += 1
-                updatedDialogue.append({
+                updatedDialogue[lineIndex:] = [{
                     "speaker": dialogueLine.get("speaker", ""),
                     "text": dialogueLine.get("text", ""),
-                    "audioFile": ""
-                })
-                
-                # Call progress callback if provided
-                if progress_callback:
-                    progress_percent = (processedLines / totalLines) * 100
-                    progress_callback(progress_percent, f"Processed line {processedLines}/{totalLines} (failed)")
-                
+                    "audioFile": "",
+                    "audioDuration": None
+                }]
+                reportProgress(f"Processed line {processedLines}/{totalLines} (failed)")
                 continue
         
+        if pendingLines:
+            # Connect to F5-TTS with exclusive access, only when something is left to synthesize
+            ttsEngine = createTTSEngine()
+            engineIdentity = ttsCacheIdentity(ttsEngine.name)
+        
+        if batched is None:
+            batched = TTS_BATCHED
+        
+        if batched and len(pendingLines) > 1:
+            # Lines sharing sampler settings are synthesized together, TTS_BATCH_LINES at a time
+            groups = {}
+            for pendingLine in pendingLines:
+                config = pendingLine[1]["config"]
+                groupKey = (int(config.get("nfeSteps", 34)), config.get("crossFadeDuration", 0.15))
+                groups.setdefault(groupKey, []).append(pendingLine)
+            
+            workBatches = []
+            for groupLines in groups.values():
+                for i in range(0, len(groupLines), TTS_BATCH_LINES):
+                    workBatches.append(groupLines[i:i + TTS_BATCH_LINES])
+            logger.info(f"📦 Synthesizing {len(pendingLines)} lines in {len(workBatches)} batches")
+        else:
+            workBatches = [[pendingLine] for pendingLine in pendingLines]
+        
+        for workBatch in workBatches:
+            try:
+                if len(workBatch) == 1:
+                    request = workBatch[0][1]
+                    results = [ttsEngine.generateSpeechToFile(
+                        request["audioFilePath"], request["text"], request["config"], request["outputPath"]
+                    )]
+                else:
+                    results = ttsEngine.generateSpeechBatchToFiles([request for _, request in workBatch])
+            except Exception as e:
+                logger.error(f"❌ Speech batch failed: {str(e)}")
+                results = [False] * len(workBatch)
+            
+            for (updatedLine, request), success in zip(workBatch, results):
+                outputPath = request["outputPath"]
+                if success:
+                    updatedLine["audioFile"] = outputPath
+                    updatedLine["audioDuration"] = getAudioDuration(outputPath)
+                    completedLines += 1
+                    cacheKey = request["cacheKey"]
+                    if engineIdentity != lookupIdentity:
+                        # Fell back to another engine, cache under the one that produced the line
+                        cacheKey = ttsCache.makeKey(request["audioFilePath"], request["text"],
+                                                    request["config"], engineIdentity)
+                    ttsCache.store(cacheKey, outputPath)
+                else:
+                    if os.path.exists(outputPath):
+                        try:
+                            os.remove(outputPath)
+                        except:
+                            pass
+                    failedLines += 1
+                processedLines += 1
+            
+            reportProgress(f"Generated audio for line {processedLines}/{totalLines}")
+        
         script["dialogue"] = updatedDialogue
         script["updatedAt"] = datetime.now().isoformat()
         scripts[scriptId] = script
@@ -295,6 +712,9 @@ async def generateAudioForScript(scriptId: str, scriptsData: Dict, userProfiles:
         
         print(f"🎯 Audio generation completed: {message}")
         
+        cacheStats = ttsCache.getStats()
+        logger.info(f"🗄️ TTS cache: {cacheStats['hits']} hits, {cacheStats['misses']} misses, {cacheStats['hitRate']:.0%} hit rate")
+        
         return AudioGenerationResponse(
             scriptId=scriptId,
             status=status,
@@ -310,6 +730,6 @@ async def generateAudioForScript(scriptId: str, scriptsData: Dict, userProfiles:
         raise HTTPException(status_code=500, detail=f"Audio generation failed: {str(e)}")
     finally:
         # Always ensure F5-TTS connection is properly closed
-        if f5ttsClient:
-            f5ttsClient.close()
-            logger.info(f"🔌 F5-TTS connection properly closed for script {scriptId}") 
\ No newline at end of file
+        if ttsEngine:
+            ttsEngine.close()
+            logger.info(f"🔌 F5-TTS {ttsEngine.name} engine released for script {scriptId}") 
\ No newline at end of file
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import random
+import shutil
+import hashlib
+import logging
+import subprocess
+import threading
+from typing import Dict, Any, List, Optional
+
+from media_probe import getMediaDuration
+
+logger = logging.getLogger(__name__)
+
+# Backgrounds pre-transcoded to the render resolution in short-GOP chunks, so a render
+# seeks straight into the window it needs instead of looping and scaling the source
+BACKGROUND_LIBRARY_ENABLED = os.getenv("BACKGROUND_LIBRARY", "true").lower() == "true"
+BACKGROUND_LIBRARY_DIR = os.getenv("BACKGROUND_LIBRARY_DIR", "apiData/background_library")
+BACKGROUND_CHUNK_SECONDS = int(os.getenv("BACKGROUND_CHUNK_SECONDS", "60"))
+BACKGROUND_WIDTH = 1080
+BACKGROUND_HEIGHT = 1920
+BACKGROUND_FPS = 30
+
+class BackgroundLibrary:
+    def __init__(self, libraryDir: str = BACKGROUND_LIBRARY_DIR):
+        self.libraryDir = libraryDir
+        self.indexPath = os.path.join(libraryDir, "index.json")
+        self.lock = threading.Lock()
+        self.index = self._loadIndex()  # source path -> {"mtime", "size", "duration", "chunks": [{"path", "duration"}]}
+
+    def _loadIndex(self) -> Dict[str, Any]:
+        try:
+            with open(self.indexPath, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _saveIndex(self):
+        os.makedirs(self.libraryDir, exist_ok=True)
+        tempPath = f"{self.indexPath}.tmp"
+        with open(tempPath, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tempPath, self.indexPath)
+
+    def getEntry(self, sourcePath: str) -> Optional[Dict[str, Any]]:
+        """Index entry of a prepared source, None if missing or the source changed since"""
+        with self.lock:
+            entry = self.index.get(os.path.abspath(sourcePath))
+        if not entry or not os.path.exists(sourcePath):
+            return None
+
+        stat = os.stat(sourcePath)
+        if entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size:
+            return None
+        if not all(os.path.exists(chunk["path"]) for chunk in entry["chunks"]):
+            return None
+        return entry
+
+    def prepare(self, sourcePath: str) -> Optional[Dict[str, Any]]:
+        """Transcode a background into fixed-resolution, 1s-GOP chunks and index their durations"""
+        entry = self.getEntry(sourcePath)
+        if entry:
+            return entry
+
+        stat = os.stat(sourcePath)
+        sourceKey = os.path.abspath(sourcePath)
+        # One directory per source version, built aside and renamed into place, so renders still
+        # reading the previous version's chunks through a window list aren't cut off mid-read
+        sourceHash = hashlib.md5(sourceKey.encode()).hexdigest()
+        chunkDir = os.path.join(self.libraryDir, f"{sourceHash}_{stat.st_size}_{stat.st_mtime_ns}")
+        buildDir = f"{chunkDir}.building-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(buildDir, ignore_errors=True)
+        os.makedirs(buildDir)
+
+        print(f"📼 Preparing background library entry for {os.path.basename(sourcePath)}...")
+        cmd = [
+            'ffmpeg', '-y', '-v', 'error', '-i', sourcePath,
+            '-vf', f'scale={BACKGROUND_WIDTH}:{BACKGROUND_HEIGHT}:force_original_aspect_ratio=disable,setsar=1',
+            '-r', str(BACKGROUND_FPS), '-an',
+            '-c:v', 'libx264', '-preset', 'fast', '-crf', '20', '-pix_fmt', 'yuv420p',
+            # A keyframe every second keeps seeks into a chunk cheap and accurate
+            '-g', str(BACKGROUND_FPS), '-keyint_min', str(BACKGROUND_FPS), '-sc_threshold', '0',
+            '-f', 'segment', '-segment_time', str(BACKGROUND_CHUNK_SECONDS), '-reset_timestamps', '1',
+            os.path.join(buildDir, 'chunk_%04d.mp4')
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.error(f"❌ Could not prepare background {sourcePath}: {result.stderr}")
+            shutil.rmtree(buildDir, ignore_errors=True)
+            return None
+
+        shutil.rmtree(chunkDir, ignore_errors=True)  # Same version left incomplete, getEntry rejected it
+        os.replace(buildDir, chunkDir)
+        chunks = []
+        for name in sorted(os.listdir(chunkDir)):
+            chunkPath = os.path.join(chunkDir, name)
+            duration = getMediaDuration(chunkPath) or 0.0
+            if duration > 0:
+                chunks.append({"path": chunkPath, "duration": duration})
+        if not chunks:
+            return None
+
+        entry = {
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "duration": sum(chunk["duration"] for chunk in chunks),
+            "chunks": chunks
+        }
+        with self.lock:
+            previous = self.index.get(sourceKey)
+            self.index[sourceKey] = entry
+            self._saveIndex()
+
+        keep = {chunkDir}
+        if previous and previous.get("chunks"):
+            keep.add(os.path.dirname(previous["chunks"][0]["path"]))
+        self._removeOldVersions(sourceHash, keep)
+
+        print(f"✅ Background library: {os.path.basename(sourcePath)} -> {len(chunks)} chunks, {entry['duration']:.1f}s")
+        return entry
+
+    def _removeOldVersions(self, sourceHash: str, keep: set):
+        """Delete chunk directories of a source except the current and the previous version
+        (a render started before the swap may still be reading the latter)"""
+        keep = {os.path.abspath(path) for path in keep}
+        for name in os.listdir(self.libraryDir):
+            path = os.path.join(self.libraryDir, name)
+            if (name == sourceHash or name.startswith(f"{sourceHash}_")) and ".building-" not in name \
+                    and os.path.isdir(path) and os.path.abspath(path) not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def prepareAll(self, sourcePaths: List[str]) -> int:
+        prepared = 0
+        for sourcePath in sourcePaths:
+            try:
+                if os.path.exists(sourcePath) and self.prepare(sourcePath):
+                    prepared += 1
+            except Exception as e:
+                logger.error(f"💥 Error preparing background {sourcePath}: {str(e)}")
+        return prepared
+
+    def pickWindowStart(self, sourcePath: str, duration: float, rng: random.Random = random) -> Optional[float]:
+        """Random start of a window of exactly `duration` seconds, None if the source isn't prepared"""
+        entry = self.getEntry(sourcePath)
+        if not entry:
+            return None
+        return rng.uniform(0, max(entry["duration"] - duration, 0))
+
+    def writeWindow(self, sourcePath: str, start: float, duration: float, windowPath: str) -> Optional[str]:
+        """Write an ffconcat list covering [start, start + duration) of the prepared chunks,
+        wrapping around (like -stream_loop) when the background is shorter than the window"""
+        entry = self.getEntry(sourcePath)
+        if not entry or entry["duration"] <= 0:
+            return None
+
+        lines = ["ffconcat version 1.0"]
+        position = start % entry["duration"]
+        remaining = duration
+        while remaining > 1e-3:
+            for chunk in entry["chunks"]:
+                if position >= chunk["duration"]:
+                    position -= chunk["duration"]
+                    continue
+
+                take = min(chunk["duration"] - position, remaining)
+                lines.append(f"file '{os.path.abspath(chunk['path'])}'")
+                if position > 0:
+                    lines.append(f"inpoint {position:.3f}")
+                if position + take < chunk["duration"]:
+                    lines.append(f"outpoint {position + take:.3f}")
+                remaining -= take
+                position = 0
+                if remaining <= 1e-3:
+                    break
+
+        with open(windowPath, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return windowPath
+
+backgroundLibrary = None
+
+def getBackgroundLibrary() -> BackgroundLibrary:
+    global backgroundLibrary
+    if backgroundLibrary is None:
+        backgroundLibrary = BackgroundLibrary()
+    return backgroundLibrary
+
+def prepareBackgroundLibraryAsync(backgroundDir: str, defaultBackgroundVideo: str):
+    """Transcode new or changed backgrounds in a daemon thread; renders use the source until ready"""
+    if not BACKGROUND_LIBRARY_ENABLED:
+        return
+
+    sourcePaths = [defaultBackgroundVideo]
+    if os.path.exists(backgroundDir):
+        sourcePaths += [
+            os.path.join(backgroundDir, f) for f in sorted(os.listdir(backgroundDir))
+            if f.startswith('background') and f.endswith('.mp4')
+        ]
+
+    thread = threading.Thread(
+        target=getBackgroundLibrary().prepareAll, args=(sourcePaths,), name="background-library", daemon=True
+    )
+    thread.start()
@@ -2,122 +2,319 @@
 
 import asyncio
 import os
+import socket
+import time
 import uuid
 import traceback
 import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from concurrent.futures import ThreadPoolExecutor
 from threading import Thread, Lock
 import threading
 import queue
 
 from firebase_service import getFirebaseService
-from video_service import VideoGenerator
+from progress_reporter import JobProgressReporter
+from video_service import RENDER_SELECTION, VideoGenerator, computeSelectionSeed, selectionRng
 from audio_service import generateAudioForScript, F5TTSClient
 from utils import loadUserProfiles
 
 logger = logging.getLogger(__name__)
 
+# Pipeline stages run concurrently: job N+1's TTS can run while job N renders
+VIDEO_AUDIO_WORKERS = int(os.getenv("VIDEO_AUDIO_WORKERS", "1"))
+VIDEO_TIMELINE_WORKERS = int(os.getenv("VIDEO_TIMELINE_WORKERS", "1"))
+VIDEO_RENDER_WORKERS = int(os.getenv("VIDEO_RENDER_WORKERS", "1"))
+VIDEO_STAGE_QUEUE_SIZE = int(os.getenv("VIDEO_STAGE_QUEUE_SIZE", "2"))
+# Jobs are leased in Firestore; a job whose lease runs out (crash, deploy) is resumed by the next worker
+VIDEO_JOB_LEASE_SECONDS = int(os.getenv("VIDEO_JOB_LEASE_SECONDS", "120"))
+VIDEO_JOB_HEARTBEAT_SECONDS = int(os.getenv("VIDEO_JOB_HEARTBEAT_SECONDS", "30"))
+
+class JobLeaseLost(Exception):
+    """Another worker took over the job; this one stops without writing anything for it"""
+
 class BackgroundVideoService:
     def __init__(self):
-        # CHANGED: Use only 1 worker for sequential processing
-        self.executor = ThreadPoolExecutor(max_workers=1)  # Process videos one at a time
-        self.active_jobs = {}
-        self.job_queue = queue.Queue()  # Thread-safe queue
-        self.processing_jobs = set()  # Track jobs being processed
+        self.job_queue = queue.Queue()  # Intake queue, unbounded so queueing never blocks a request
+        # Staged pipeline: audio (validation + TTS) -> timeline (timeline + audio concat) -> render (FFmpeg)
+        # Every stage has its own workers; hand-off queues are bounded so finished audio can't pile up
+        self.stages = [
+            {'name': 'audio', 'workers': VIDEO_AUDIO_WORKERS, 'queue': self.job_queue,
+             'handler': self._run_audio_stage},
+            {'name': 'timeline', 'workers': VIDEO_TIMELINE_WORKERS, 'queue': queue.Queue(maxsize=VIDEO_STAGE_QUEUE_SIZE),
+             'handler': self._run_timeline_stage},
+            {'name': 'render', 'workers': VIDEO_RENDER_WORKERS, 'queue': queue.Queue(maxsize=VIDEO_STAGE_QUEUE_SIZE),
+             'handler': self._run_render_stage},
+        ]
+        self.worker_threads = []
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"  # Lease owner
+        self.queued_job_ids = set()  # Jobs waiting in job_queue or deferred, so recovery doesn't queue them twice
+        self.deferred_jobs = {}  # scriptId -> job ids waiting for the script's job in flight to finish
+        self.processing_jobs = {}  # jobId -> stage it is in (or waiting for), oldest first
+        self.processing_scripts = set()  # Scripts with a job in flight, their output paths are per script
+        self.progress_reporters = {}  # jobId -> JobProgressReporter coalescing its Firestore progress writes
+        self.lost_jobs = {}  # jobId -> scriptId of jobs in flight whose lease another worker took over
         self.stop_event = threading.Event()  # Stop event for graceful shutdown
         self.is_processing = False
-        self.current_job_id = None  # Track currently processing job
         self.queue_lock = Lock()  # Thread-safe queue operations
         
-    async def start_background_processor(self):
-        """Start processing video generation jobs in the background - ONE AT A TIME"""
-        logger.info("🚀 Starting background video processor (SEQUENTIAL MODE)...")
+    def start_background_processor(self):
+        """Start the stage worker threads"""
+        logger.info("🚀 Starting background video processor (PIPELINED MODE: " +
+                    ", ".join(f"{stage['name']} x{stage['workers']}" for stage in self.stages) + ")...")
         self.is_processing = True
         
-        while not self.stop_event.is_set():
-            job_id = None  # Initialize job_id to avoid UnboundLocalError
+        for stageIndex, stage in enumerate(self.stages):
+            for workerIndex in range(max(1, stage['workers'])):
+                thread = Thread(
+                    target=self._stage_worker, args=(stageIndex,),
+                    name=f"video-{stage['name']}-{workerIndex}", daemon=True
+                )
+                thread.start()
+                self.worker_threads.append(thread)
+        
+        heartbeat_thread = Thread(target=self._heartbeat_loop, name="video-heartbeat", daemon=True)
+        heartbeat_thread.start()
+        self.worker_threads.append(heartbeat_thread)
+    
+    def _heartbeat_loop(self):
+        """Renew leases of jobs in flight and pick up jobs whose lease ran out elsewhere"""
+        last_recovery = time.monotonic()
+        while not self.stop_event.wait(VIDEO_JOB_HEARTBEAT_SECONDS):
             try:
-                # Get job from queue (with timeout)
+                with self.queue_lock:
+                    job_ids = list(self.processing_jobs)
+                if job_ids:
+                    lost_job_ids = getFirebaseService().renewVideoGenerationJobLeases(
+                        job_ids, self.worker_id, VIDEO_JOB_LEASE_SECONDS
+                    )
+                    for job_id in lost_job_ids:
+                        self._mark_lease_lost(job_id)
+                
+                if time.monotonic() - last_recovery >= VIDEO_JOB_LEASE_SECONDS:
+                    last_recovery = time.monotonic()
+                    self.recover_jobs()
+            except Exception as e:
+                logger.error(f"💥 Video job heartbeat error: {str(e)}")
+    
+    def _mark_lease_lost(self, job_id: str):
+        """Stop writing for a job another worker now owns; its stages bail out at the next check"""
+        with self.queue_lock:
+            if job_id not in self.processing_jobs:
+                return
+            reporter = self.progress_reporters.pop(job_id, None)
+            self.lost_jobs[job_id] = reporter.scriptId if reporter else None
+        if reporter:
+            reporter.discard()
+        logger.warning(f"⚠️ Job {job_id}: lease taken over by another worker, abandoning it")
+    
+    def _check_lease(self, job_id: str):
+        """Raise JobLeaseLost before any further work or write for a job this worker lost"""
+        with self.queue_lock:
+            lost = job_id in self.lost_jobs
+        if lost:
+            raise JobLeaseLost(job_id)
+    
+    def recover_jobs(self) -> int:
+        """Queue unfinished jobs nobody holds a lease on, e.g. left behind by a restart"""
+        recovered = 0
+        for job in getFirebaseService().getResumableVideoGenerationJobs():
+            job_id = job.get('jobId')
+            with self.queue_lock:
+                if job_id in self.processing_jobs or job_id in self.queued_job_ids:
+                    continue
+            self._enqueue(job_id, job.get('scriptId'))
+            recovered += 1
+        
+        if recovered:
+            logger.info(f"♻️ Recovered {recovered} unfinished video jobs")
+        return recovered
+    
+    def _enqueue(self, job_id: str, script_id: str) -> int:
+        """Add a job to the intake queue, returns its position"""
+        with self.queue_lock:
+            self.queued_job_ids.add(job_id)
+            self.job_queue.put((job_id, script_id))
+            return self.job_queue.qsize()
+    
+    def _stage_worker(self, stageIndex: int):
+        """Take jobs from a stage queue, run the stage and hand them to the next one"""
+        stage = self.stages[stageIndex]
+        nextStage = self.stages[stageIndex + 1] if stageIndex + 1 < len(self.stages) else None
+        
+        # Each worker owns an event loop for the async step methods
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        
+        try:
+            while not self.stop_event.is_set():
                 try:
-                    job_id = self.job_queue.get(timeout=1.0)
+                    job = stage['queue'].get(timeout=1.0)
                 except queue.Empty:
                     continue  # Queue is empty, continue loop
                 
-                if job_id in self.processing_jobs:
-                    logger.warning(f"⚠️ Job {job_id} already being processed, skipping")
-                    continue  # Job already being processed
-                
-                # CRITICAL: Check if any job is currently being processed
-                with self.queue_lock:
-                    if self.current_job_id is not None:
-                        logger.warning(f"⚠️ Another job {self.current_job_id} is still processing, requeueing {job_id}")
-                        self.job_queue.put(job_id)  # Put job back in queue
-                        await asyncio.sleep(2)  # Wait before checking again
-                        continue
+                try:
+                    if stageIndex == 0:
+                        job = self._claim_job(job)
+                        if job is None:
+                            continue
+                    
+                    self._check_lease(job['jobId'])
+                    
+                    # Resumed jobs skip the stages they already completed
+                    if stageIndex >= job['resumeStage']:
+                        with self.queue_lock:
+                            self.processing_jobs[job['jobId']] = stage['name']
+                        logger.info(f"🎬 Job {job['jobId']}: {stage['name']} stage started "
+                                    f"(Queue: {self.job_queue.qsize()} waiting)")
                         
-                    # Add to processing set
-                    self.processing_jobs.add(job_id)
-                    self.current_job_id = job_id
-                
-                # Get queue status for logging
-                queue_size = self.job_queue.qsize()
-                logger.info(f"🎬 Processing job {job_id} (Queue: {queue_size} remaining)")
-                
-                # Get job data from Firebase
-                firebase_service = getFirebaseService()
-                job_data = firebase_service.getVideoGenerationJob(job_id)
-                
-                if not job_data:
-                    logger.error(f"❌ Job {job_id} not found in database")
-                    with self.queue_lock:
-                        self.processing_jobs.discard(job_id)
-                        self.current_job_id = None
-                    continue
-                
-                # Process the job (this will block until completion)
-                await self._process_video_generation_job(job_data)
-                
-                # Mark job as done in queue
-                self.job_queue.task_done()
-                logger.info(f"✅ Completed job {job_id}")
+                        loop.run_until_complete(stage['handler'](job))
+                    
+                    if nextStage:
+                        with self.queue_lock:
+                            self.processing_jobs[job['jobId']] = f"{nextStage['name']}_queued"
+                        if not self._hand_off(nextStage['queue'], job):
+                            # Shutting down, the job resumes from its completed steps on the next start
+                            self._release_job(job, releaseLease=True)
+                    else:
+                        self._release_job(job)
+                        logger.info(f"✅ Completed job {job['jobId']}")
                 
-            except Exception as e:
-                logger.error(f"💥 Background processor error: {str(e)}")
-                await asyncio.sleep(1)  # Wait before continuing
-            finally:
-                # Always clean up current job tracking
-                with self.queue_lock:
-                    if job_id:
-                        self.processing_jobs.discard(job_id)
-                    self.current_job_id = None
+                except JobLeaseLost:
+                    logger.warning(f"⏭️ Job {job['jobId']}: dropped the remaining stages, another worker owns it")
+                    self._release_job(job)
+                except Exception as e:
+                    try:
+                        self._fail_job(job, e)
+                    except Exception as fail_error:
+                        logger.error(f"💥 Could not mark job as failed: {str(fail_error)}")
+                    if isinstance(job, dict):
+                        self._release_job(job)
+                finally:
+                    stage['queue'].task_done()
+        finally:
+            loop.close()
+            logger.info(f"🛑 {threading.current_thread().name} stopped")
+    
+    def _claim_job(self, queued_job) -> Optional[Dict[str, Any]]:
+        """Lease a queued job and mark it in flight, returns None if it can't start now"""
+        job_id, script_id = queued_job
+        with self.queue_lock:
+            if job_id in self.processing_jobs:
+                self.queued_job_ids.discard(job_id)
+                logger.warning(f"⚠️ Job {job_id} already being processed, skipping")
+                return None
+            
+            # Checked before claiming: a deferred job costs no lease transaction, attempt or release
+            deferred = script_id in self.processing_scripts
+            if deferred:
+                self.deferred_jobs.setdefault(script_id, []).append(job_id)
+            else:
+                self.queued_job_ids.discard(job_id)
+                self.processing_scripts.add(script_id)
+                self.processing_jobs[job_id] = self.stages[0]['name']
+        
+        if deferred:
+            logger.info(f"⏳ Script {script_id} already has a job in flight, {job_id} starts after it")
+            return None
+        
+        firebase_service = getFirebaseService()
+        job_data = firebase_service.claimVideoGenerationJob(job_id, self.worker_id, VIDEO_JOB_LEASE_SECONDS)
+        if not job_data:
+            logger.info(f"⏭️ Job {job_id} is finished, missing or leased by another worker, skipping")
+            with self.queue_lock:
+                self.processing_jobs.pop(job_id, None)
+            self._release_script(script_id)
+            return None
+        
+        # Audio generation is the expensive part; once it completed, resume at timeline_creation
+        # (the timeline and combined audio are cheap to rebuild from the generated files)
+        with self.queue_lock:
+            self.progress_reporters[job_id] = JobProgressReporter(job_id, script_id, job_data)
         
-        logger.info("🛑 Background video processor stopped")
+        completed_steps = {step.get('stepName') for step in job_data.get('steps', []) if step.get('status') == 'completed'}
+        resume_stage = 1 if 'audio_generation' in completed_steps else 0
+        if resume_stage:
+            logger.info(f"♻️ Resuming job {job_id} at timeline_creation (attempt {job_data.get('attempts')})")
+        
+        return {
+            'jobId': job_id,
+            'scriptId': script_id,
+            'userId': job_data.get('userId'),
+            'backgroundVideo': None,  # Use default background
+            'resumeStage': resume_stage,
+        }
+    
+    def _hand_off(self, nextQueue: queue.Queue, job: Dict[str, Any]) -> bool:
+        """Put a job on the next stage queue, waiting while it is full; False if stopped meanwhile"""
+        while not self.stop_event.is_set():
+            try:
+                nextQueue.put(job, timeout=1.0)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _release_job(self, job: Dict[str, Any], releaseLease: bool = False):
+        with self.queue_lock:
+            self.processing_jobs.pop(job['jobId'], None)
+            self.lost_jobs.pop(job['jobId'], None)
+            reporter = self.progress_reporters.pop(job['jobId'], None)
+        if reporter:
+            reporter.close()
+        if releaseLease:
+            getFirebaseService().releaseVideoGenerationJobLease(job['jobId'], self.worker_id)
+        self._release_script(job['scriptId'])
+    
+    def _release_script(self, script_id: str):
+        """Free a script for its next job, queueing the oldest one deferred behind it"""
+        with self.queue_lock:
+            self.processing_scripts.discard(script_id)
+            deferred = self.deferred_jobs.get(script_id)
+            next_job_id = deferred.pop(0) if deferred else None
+            if not deferred:
+                self.deferred_jobs.pop(script_id, None)
+        if next_job_id and not self.stop_event.is_set():
+            self._enqueue(next_job_id, script_id)
     
     def stop_background_processor(self):
         """Stop the background job processor"""
         self.is_processing = False
-        self.stop_event.set()  # Signal the processor to stop
+        self.stop_event.set()  # Signal the workers to stop
+        
+        # Hand in-flight jobs back right away instead of waiting for their leases to expire
+        with self.queue_lock:
+            job_ids = list(self.processing_jobs)
+        for job_id in job_ids:
+            getFirebaseService().releaseVideoGenerationJobLease(job_id, self.worker_id)
         logger.info("🛑 Stopped background video processor")
     
     def get_queue_status(self) -> Dict[str, Any]:
         """Get current queue status"""
         with self.queue_lock:
+            active_jobs = list(self.processing_jobs)
             return {
                 "queue_size": self.job_queue.qsize(),
                 "is_processing": self.is_processing,
-                "current_job_id": self.current_job_id,
-                "processing_jobs_count": len(self.processing_jobs),
-                "active_jobs": list(self.processing_jobs)
+                "current_job_id": active_jobs[0] if active_jobs else None,  # Oldest job in flight
+                "processing_jobs_count": len(active_jobs),
+                "active_jobs": active_jobs,
+                "stages": {
+                    stage['name']: {
+                        "workers": stage['workers'],
+                        "queued": stage['queue'].qsize(),
+                        "active": [jobId for jobId, name in self.processing_jobs.items() if name == stage['name']]
+                    }
+                    for stage in self.stages
+                }
             }
     
     async def queue_video_generation(self, script_id: str, user_id: str, background_video: Optional[str] = None) -> str:
         """Queue a new video generation job"""
         firebase_service = getFirebaseService()
         
-        # Check if script exists
-        script = firebase_service.getScript(script_id)
+        # Check if script exists (uncached, the whole document is saved back below)
+        script = firebase_service.getScript(script_id, useCache=False)
         if not script:
             raise Exception(f"Script {script_id} not found")
         
@@ -151,127 +348,151 @@ class BackgroundVideoService:
         firebase_service.saveScript(script_id, {**script, **script_updates})
         
         # Add to active jobs queue
-        with self.queue_lock:
-            self.job_queue.put(job_id)
-            queue_position = self.job_queue.qsize()
+        queue_position = self._enqueue(job_id, script_id)
         
         logger.info(f"✅ Queued video generation job: {job_id} for script {script_id} (Position: {queue_position} in queue)")
         return job_id
     
-    async def _process_video_generation_job(self, job_data: Dict[str, Any]):
-        """Process a single video generation job"""
-        job_id = job_data.get('jobId')
-        script_id = job_data.get('scriptId')
-        user_id = job_data.get('userId')
+    async def _run_audio_stage(self, job: Dict[str, Any]):
+        """Stage 1: validate and generate the script's audio (0-70%)"""
+        await self._step_audio_validation(job['jobId'], job['scriptId'])
+        await self._step_audio_generation(job['jobId'], job['scriptId'])
+    
+    async def _run_timeline_stage(self, job: Dict[str, Any]):
+        """Stage 2: build the timeline and the combined audio track (70-90%)"""
+        job['timeline'], job['totalDuration'], job['selectionSeed'], job['scriptTitle'] = await self._step_timeline_creation(
+            job['jobId'], job['scriptId']
+        )
+        job['combinedAudioPath'] = await self._step_audio_concatenation(job['jobId'], job['scriptId'], job['timeline'])
+    
+    async def _run_render_stage(self, job: Dict[str, Any]):
+        """Stage 3: render the final video and complete the job (90-100%)"""
+        final_video_path, video_size = await self._step_video_generation(
+            job['jobId'], job['scriptId'], job['timeline'], job['totalDuration'],
+            job['combinedAudioPath'], job['backgroundVideo'], job['selectionSeed']
+        )
+        self._complete_job(job, final_video_path, video_size)
+    
+    def _complete_job(self, job: Dict[str, Any], final_video_path: str, video_size: int):
+        """Mark a rendered job completed, update its script and charge the user"""
+        job_id, script_id, user_id = job['jobId'], job['scriptId'], job['userId']
+        self._check_lease(job_id)
+        total_duration = job['totalDuration']
+        firebase_service = getFirebaseService()
+        self._flush_progress(job_id)
         
-        logger.info(f"🎬 Starting video generation job: {job_id}")
+        # Complete the job
+        firebase_service.completeVideoGenerationJob(
+            job_id, final_video_path, total_duration, video_size
+        )
+
+        # Update the script database with video information (False: the script was deleted meanwhile)
+        if firebase_service.updateScriptFields(script_id, {
+            'finalVideoPath': final_video_path,
+            'videoDuration': total_duration,
+            'videoSize': video_size,
+            'videoJobStatus': 'completed',
+            'videoJobProgress': 100.0,
+            'videoJobCompletedAt': datetime.now().isoformat()
+        }):
+            logger.info(f"✅ Updated script {script_id} with video information")
+        script_title = job.get('scriptTitle') or script_id
+
+        # Deduct tokens for successful video generation
+        if user_id:
+            success, message, remaining_tokens = firebase_service.deductTokens(user_id, 1)
+            if success:
+                logger.info(f"✅ Deducted 1 token from user {user_id} for video generation. Remaining: {remaining_tokens}")
+
+                # Log token deduction activity
+                firebase_service.addTokenActivity(
+                    user_id, 
+                    firebase_service.ActivityType.TOKEN_DEDUCTED, 
+                    1, 
+                    remaining_tokens,
+                    script_id,
+                    script_title
+                )
+            else:
+                logger.warning(f"⚠️ Failed to deduct tokens from user {user_id}: {message}")
+                # Still log the video completion even if token deduction fails
+                firebase_service.addVideoActivity(
+                    user_id, 
+                    firebase_service.ActivityType.VIDEO_GENERATION_COMPLETED, 
+                    script_id, 
+                    script_title,
+                    final_video_path
+                )
+
+        logger.info(f"✅ Successfully completed video generation job: {job_id}")
+    
+    def _fail_job(self, job: Any, e: Exception):
+        """Mark a job failed in whatever stage it broke and clean up its temporary files"""
+        if not isinstance(job, dict):
+            logger.error(f"💥 Could not start job {job}: {str(e)}")
+            return
         
+        job_id, script_id = job['jobId'], job['scriptId']
+        combined_audio_path = job.get('combinedAudioPath')
+        if isinstance(e, JobLeaseLost) or job_id in self.lost_jobs:
+            logger.warning(f"⏭️ Job {job_id} failed after its lease was lost, leaving its status to the new owner")
+            return
         firebase_service = getFirebaseService()
         
+        logger.error(f"💥 Job {job_id} failed: {str(e)}")
+        logger.error(f"💥 Traceback: {traceback.format_exc()}")
+        
+        # Mark job as failed
+        self._flush_progress(job_id)
+        firebase_service.failVideoGenerationJob(job_id, f"Video generation failed: {str(e)}")
+
+        # Update script with failure status
+        if firebase_service.updateScriptFields(script_id, {
+            'videoJobStatus': 'failed',
+            'videoJobErrorMessage': str(e),
+            'videoJobCompletedAt': datetime.now().isoformat()
+        }):
+            logger.info(f"✅ Updated script {script_id} with failure status")
+
+        # Clean up any temporary files
         try:
-            # Step 1: Audio validation (0-20%)
-            await self._step_audio_validation(job_id, script_id)
-            
-            # Step 2: Audio generation (20-40%)
-            await self._step_audio_generation(job_id, script_id)
-            
-            # Step 3: Timeline creation (40-60%)
-            timeline, total_duration = await self._step_timeline_creation(job_id, script_id)
-            
-            # Step 4: Audio concatenation (60-80%)
-            combined_audio_path = await self._step_audio_concatenation(job_id, script_id, timeline)
-            
-            # Step 5: Video generation (80-100%)
-            background_video = None  # Use default background
-            final_video_path, video_size = await self._step_video_generation(
-                job_id, script_id, timeline, total_duration, combined_audio_path, background_video
-            )
-            
-            # Complete the job
-            firebase_service.completeVideoGenerationJob(
-                job_id, final_video_path, total_duration, video_size
-            )
-            
-            # Update the script database with video information
-            script_data = firebase_service.getScript(script_id)
-            if script_data:
-                script_data['finalVideoPath'] = final_video_path
-                script_data['videoDuration'] = total_duration
-                script_data['videoSize'] = video_size
-                script_data['videoJobStatus'] = 'completed'
-                script_data['videoJobProgress'] = 100.0
-                script_data['videoJobCompletedAt'] = datetime.now().isoformat()
-                script_data['updatedAt'] = datetime.now().isoformat()
-                
-                # Save the updated script
-                firebase_service.saveScript(script_id, script_data)
-                logger.info(f"✅ Updated script {script_id} with video information")
-            
-            # Deduct tokens for successful video generation
-            if user_id:
-                success, message, remaining_tokens = firebase_service.deductTokens(user_id, 1)
-                if success:
-                    logger.info(f"✅ Deducted 1 token from user {user_id} for video generation. Remaining: {remaining_tokens}")
-                    
-                    # Log token deduction activity
-                    script_title = script_data.get('originalPrompt', '')[:50] + "..." if len(script_data.get('originalPrompt', '')) > 50 else script_data.get('originalPrompt', script_id)
-                    firebase_service.addTokenActivity(
-                        user_id, 
-                        firebase_service.ActivityType.TOKEN_DEDUCTED, 
-                        1, 
-                        remaining_tokens,
-                        script_id,
-                        script_title
-                    )
-                else:
-                    logger.warning(f"⚠️ Failed to deduct tokens from user {user_id}: {message}")
-                    # Still log the video completion even if token deduction fails
-                    firebase_service.addVideoActivity(
-                        user_id, 
-                        firebase_service.ActivityType.VIDEO_GENERATION_COMPLETED, 
-                        script_id, 
-                        script_data.get('originalPrompt', '')[:50] + "..." if len(script_data.get('originalPrompt', '')) > 50 else script_data.get('originalPrompt', script_id),
-                        final_video_path
-                    )
-            
-            logger.info(f"✅ Successfully completed video generation job: {job_id}")
-            
-        except Exception as e:
-            logger.error(f"💥 Job {job_id} failed: {str(e)}")
-            logger.error(f"💥 Traceback: {traceback.format_exc()}")
-            
-            # Mark job as failed
-            firebase_service.failVideoGenerationJob(job_id, f"Video generation failed: {str(e)}")
-            
-            # Update script with failure status
-            script_data = firebase_service.getScript(script_id)
-            if script_data:
-                script_data['videoJobStatus'] = 'failed'
-                script_data['videoJobErrorMessage'] = str(e)
-                script_data['videoJobCompletedAt'] = datetime.now().isoformat()
-                script_data['updatedAt'] = datetime.now().isoformat()
-                firebase_service.saveScript(script_id, script_data)
-                logger.info(f"✅ Updated script {script_id} with failure status")
-            
-            # Clean up any temporary files
-            try:
-                if 'combined_audio_path' in locals() and os.path.exists(combined_audio_path):
-                    os.remove(combined_audio_path)
-                    logger.info(f"🗑️ Cleaned up temporary audio file: {combined_audio_path}")
-            except Exception as cleanup_error:
-                logger.warning(f"⚠️ Could not clean up temporary files: {cleanup_error}")
-                
-        finally:
-            # Always remove from processing set
-            with self.queue_lock:
-                self.processing_jobs.discard(job_id)
-                self.current_job_id = None
+            if combined_audio_path and os.path.exists(combined_audio_path):
+                os.remove(combined_audio_path)
+                logger.info(f"🗑️ Cleaned up temporary audio file: {combined_audio_path}")
+        except Exception as cleanup_error:
+            logger.warning(f"⚠️ Could not clean up temporary files: {cleanup_error}")
+
+    
+    def _flush_progress(self, job_id: str):
+        """Write a job's pending progress now, before a terminal state is written"""
+        with self.queue_lock:
+            reporter = self.progress_reporters.get(job_id)
+        if reporter:
+            reporter.flush()
+    
+    def _update_job_progress(self, job_id: str, *args, **kwargs):
+        """Record step progress; coalesced through the job's reporter while this worker holds it"""
+        self._check_lease(job_id)
+        with self.queue_lock:
+            reporter = self.progress_reporters.get(job_id)
+        if reporter:
+            reporter.updateStep(*args, **kwargs)
+        else:
+            getFirebaseService().updateVideoGenerationJobProgress(job_id, *args, **kwargs)
     
     def _update_script_progress(self, script_id: str, status: str, progress: float, current_step: str = None):
         """Update script document with current video generation progress"""
+        with self.queue_lock:
+            if script_id in self.lost_jobs.values():
+                return  # Its job belongs to another worker now
+            reporter = next((r for r in self.progress_reporters.values() if r.scriptId == script_id), None)
+        if reporter:
+            reporter.updateScript(status, progress, current_step)
+            return
+        
         try:
             firebase_service = getFirebaseService()
-            script_data = firebase_service.getScript(script_id)
+            script_data = firebase_service.getScript(script_id, useCache=False)
             if script_data:
                 script_data['videoJobStatus'] = status
                 script_data['videoJobProgress'] = progress
@@ -287,7 +508,7 @@ class BackgroundVideoService:
         firebase_service = getFirebaseService()
         
         try:
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'audio_validation', 'in_progress', 0.0, 'Starting audio validation...'
             )
             self._update_script_progress(script_id, 'in_progress', 5.0, 'audio_validation')
@@ -304,7 +525,7 @@ class BackgroundVideoService:
             total_lines = len(dialogue_lines)
             existing_audio = 0
             
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'audio_validation', 'in_progress', 10.0, f'Checking {total_lines} dialogue lines...'
             )
             self._update_script_progress(script_id, 'in_progress', 10.0, 'audio_validation')
@@ -314,7 +535,7 @@ class BackgroundVideoService:
                 if audio_file and os.path.exists(audio_file):
                     existing_audio += 1
             
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'audio_validation', 'completed', 100.0, 
                 f'Found {existing_audio}/{total_lines} audio files', 
                 overallProgress=20.0, currentStep='audio_generation'
@@ -322,34 +543,34 @@ class BackgroundVideoService:
             self._update_script_progress(script_id, 'in_progress', 20.0, 'audio_generation')
             
         except Exception as e:
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'audio_validation', 'failed', 0.0, str(e)
             )
             self._update_script_progress(script_id, 'failed', 0.0)
             raise
     
     async def _step_audio_generation(self, job_id: str, script_id: str):
-        """Step 2: Generate missing audio files - SEQUENTIAL F5-TTS ACCESS"""
+        """Step 2: Generate missing audio files"""
         firebase_service = getFirebaseService()
         
         try:
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'audio_generation', 'in_progress', 10.0, 'Connecting to F5-TTS...'
             )
             self._update_script_progress(script_id, 'in_progress', 25.0, 'audio_generation')
             
             # Load required data
-            scripts_data = firebase_service.getAllScripts()
+            scripts_data = firebase_service.getScriptData(script_id)
             user_profiles = loadUserProfiles("apiData/userProfiles.json")
             
             # Log F5-TTS connection attempt
-            logger.info(f"🔌 Job {job_id}: Connecting to F5-TTS (EXCLUSIVE ACCESS)")
+            logger.info(f"🔌 Job {job_id}: Connecting to F5-TTS")
             
             # Define progress callback
             def audio_progress_callback(progress_percent: float, message: str):
                 # Map 0-100% audio progress to 10-90% within the audio generation step
                 mapped_progress = 10.0 + (progress_percent * 0.8)  # 10% to 90%
-                firebase_service.updateVideoGenerationJobProgress(
+                self._update_job_progress(
                     job_id, 'audio_generation', 'in_progress', mapped_progress, f"🎤 {message}"
                 )
                 # Overall progress: audio generation is 25-70%, so map accordingly for better granularity
@@ -370,7 +591,7 @@ class BackgroundVideoService:
             
             if result.status != "completed":
                 if result.status == "partial":
-                    firebase_service.updateVideoGenerationJobProgress(
+                    self._update_job_progress(
                         job_id, 'audio_generation', 'completed', 90.0, 
                         f"⚠️ Partial success: {result.completedLines}/{result.totalLines} lines"
                     )
@@ -378,7 +599,7 @@ class BackgroundVideoService:
                 else:
                     raise Exception(f"Audio generation failed: {result.message}")
             else:
-                firebase_service.updateVideoGenerationJobProgress(
+                self._update_job_progress(
                     job_id, 'audio_generation', 'completed', 100.0, 
                     f"✅ Generated audio for {result.completedLines} lines"
                 )
@@ -390,7 +611,7 @@ class BackgroundVideoService:
         except Exception as e:
             error_message = f"Audio generation failed: {str(e)}"
             logger.error(f"💥 Job {job_id}: {error_message}")
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'audio_generation', 'failed', 0.0, error_message
             )
             self._update_script_progress(script_id, 'failed', 0.0)
@@ -401,7 +622,7 @@ class BackgroundVideoService:
         firebase_service = getFirebaseService()
         
         try:
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'timeline_creation', 'in_progress', 20.0, 'Creating timeline...'
             )
             self._update_script_progress(script_id, 'in_progress', 72.0, 'timeline_creation')
@@ -409,23 +630,31 @@ class BackgroundVideoService:
             script_data = firebase_service.getScript(script_id)
             user_profiles = loadUserProfiles("apiData/userProfiles.json")
             
+            # Seeded image/background choices, recorded on the job so the render can be reproduced
+            selection_seed = computeSelectionSeed(script_id, script_data)
+            firebase_service.recordVideoGenerationJobSelection(job_id, RENDER_SELECTION, selection_seed)
+            
             video_generator = VideoGenerator()
-            timeline, total_duration = video_generator._createTimeline(script_data, user_profiles)
+            timeline, total_duration = video_generator._createTimeline(script_data, user_profiles, selection_seed)
             
             if not timeline:
                 raise Exception("Failed to create timeline - no valid segments")
             
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'timeline_creation', 'completed', 100.0, 
                 f'Created timeline with {len(timeline)} segments ({total_duration:.2f}s)',
                 overallProgress=80.0, currentStep='audio_concatenation'
             )
             self._update_script_progress(script_id, 'in_progress', 80.0, 'audio_concatenation')
             
-            return timeline, total_duration
+            # Kept on the job for the completion activity, so completing needs no script read
+            original_prompt = script_data.get('originalPrompt') or script_id
+            script_title = original_prompt[:50] + "..." if len(original_prompt) > 50 else original_prompt
+            
+            return timeline, total_duration, selection_seed, script_title
             
         except Exception as e:
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'timeline_creation', 'failed', 0.0, str(e)
             )
             self._update_script_progress(script_id, 'failed', 72.0)
@@ -433,26 +662,24 @@ class BackgroundVideoService:
     
     async def _step_audio_concatenation(self, job_id: str, script_id: str, timeline: List[Dict]):
         """Step 4: Concatenate audio files"""
-        firebase_service = getFirebaseService()
-        
         try:
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'audio_concatenation', 'in_progress', 20.0, 'Combining audio...'
             )
             self._update_script_progress(script_id, 'in_progress', 82.0, 'audio_concatenation')
             
             from app import VIDEO_OUTPUT_DIR
-            combined_audio_path = os.path.join(VIDEO_OUTPUT_DIR, f"{script_id}_combined_audio.wav")
             
+            # In direct mode this only writes a list of the line files, FFmpeg reads them itself
             video_generator = VideoGenerator()
-            success = video_generator._concatenateAudioFiles(timeline, combined_audio_path)
+            combined_audio_path = video_generator._prepareRenderAudio(timeline, VIDEO_OUTPUT_DIR, script_id)
             
-            if not success:
+            if not combined_audio_path:
                 raise Exception("Failed to concatenate audio files")
             
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'audio_concatenation', 'completed', 100.0, 
-                'Audio files combined successfully',
+                'Audio files combined successfully' if combined_audio_path.endswith('.wav') else 'Audio files listed for the render',
                 overallProgress=90.0, currentStep='video_generation'
             )
             self._update_script_progress(script_id, 'in_progress', 90.0, 'video_generation')
@@ -460,19 +687,18 @@ class BackgroundVideoService:
             return combined_audio_path
             
         except Exception as e:
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'audio_concatenation', 'failed', 0.0, str(e)
             )
             self._update_script_progress(script_id, 'failed', 82.0)
             raise
     
     async def _step_video_generation(self, job_id: str, script_id: str, timeline: List[Dict], 
-                                   total_duration: float, combined_audio_path: str, background_video: Optional[str]):
+                                   total_duration: float, combined_audio_path: str, background_video: Optional[str],
+                                   selection_seed: Optional[str] = None):
         """Step 5: Generate final video"""
-        firebase_service = getFirebaseService()
-        
         try:
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'video_generation', 'in_progress', 10.0, 'Starting video generation...'
             )
             self._update_script_progress(script_id, 'in_progress', 92.0, 'video_generation')
@@ -483,9 +709,11 @@ class BackgroundVideoService:
             
             # Get background video
             if not background_video:
-                background_video = video_generator._getRandomBackgroundVideo(BACKGROUND_DIR, DEFAULT_BACKGROUND_VIDEO)
+                background_video = (video_generator._getStoredBackground(script_id)
+                                    or video_generator._getRandomBackgroundVideo(BACKGROUND_DIR, DEFAULT_BACKGROUND_VIDEO,
+                                                                                 selectionRng(selection_seed)))
             
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'video_generation', 'in_progress', 30.0, 'Running FFmpeg...'
             )
             self._update_script_progress(script_id, 'in_progress', 95.0, 'video_generation')
@@ -493,15 +721,15 @@ class BackgroundVideoService:
             final_video_path = os.path.join(VIDEO_OUTPUT_DIR, f"{script_id}_final_video.mp4")
             
             # Generate video with FFmpeg
-            success, video_size = video_generator._generateVideoWithFfmpeg(
+            success, video_size = video_generator._renderVideo(
                 background_video, timeline, total_duration, combined_audio_path, 
-                final_video_path, script_id, FONT_PATH
+                final_video_path, script_id, FONT_PATH, seed=selection_seed
             )
             
             if not success:
                 raise Exception("FFmpeg video generation failed")
             
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'video_generation', 'completed', 100.0, 
                 f'Video generated successfully ({video_size} bytes)',
                 overallProgress=100.0
@@ -511,7 +739,7 @@ class BackgroundVideoService:
             return final_video_path, video_size
             
         except Exception as e:
-            firebase_service.updateVideoGenerationJobProgress(
+            self._update_job_progress(
                 job_id, 'video_generation', 'failed', 0.0, str(e)
             )
             self._update_script_progress(script_id, 'failed', 95.0)
@@ -538,32 +766,16 @@ def initialize_background_video_service():
         
     service = get_background_video_service()
     
-    # First, cleanup any incomplete jobs from previous backend instance
+    # First, pick up unfinished jobs from previous backend instances; they resume from their completed steps
     try:
-        firebase_service = getFirebaseService()
-        failed_jobs_count = firebase_service.cleanupIncompleteJobsOnStartup()
-        if failed_jobs_count > 0:
-            logger.info(f"🧹 Marked {failed_jobs_count} incomplete video jobs as failed on startup")
-        else:
-            logger.info("✅ No incomplete video jobs found during startup cleanup")
+        if service.recover_jobs() == 0:
+            logger.info("✅ No unfinished video jobs to resume on startup")
     except Exception as e:
-        logger.error(f"💥 Error during startup cleanup: {str(e)}")
+        logger.error(f"💥 Error recovering video jobs on startup: {str(e)}")
     
     # Only start if not already processing
     if not service.is_processing:
-        # Start background processor in a separate thread
-        def run_processor():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(service.start_background_processor())
-            except Exception as e:
-                logger.error(f"💥 Background processor error: {str(e)}")
-            finally:
-                loop.close()
-        
-        processor_thread = Thread(target=run_processor, daemon=True)
-        processor_thread.start()
+        service.start_background_processor()
         logger.info("🚀 Background video service initialized")
     else:
-        logger.info("⚠️ Background processor already running, skipping thread creation") 
\ No newline at end of file
+        logger.info("⚠️ Background processor already running, skipping thread creation")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Render-time benchmark for _generateVideoWithFfmpeg on synthetic scripts.
+
+--compare subtitles: one drawtext filter per segment against a single generated ASS
+track, across script lengths:
+
+    python benchmark_render.py --compare subtitles --lines 10,50,200
+
+--compare profiles: render speed against output size for each encoder profile
+(profiles this machine can't run are reported as unavailable):
+
+    python benchmark_render.py --compare profiles --lines 40
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from video_service import ENCODER_PROFILES, VideoGenerator, probeEncoders
+
+LINE_SECONDS = 3.0
+LINE_TEXT = "this is a synthetic benchmark line with exactly twelve words in it"
+
+
+def makeInputs(workDir: str, totalDuration: float):
+    backgroundPath = os.path.join(workDir, "background.mp4")
+    audioPath = os.path.join(workDir, "audio.wav")
+    subprocess.run([
+        'ffmpeg', '-y', '-v', 'error', '-f', 'lavfi', '-i', 'testsrc2=size=1080x1920:rate=30', '-t', '10',
+        '-c:v', 'libx264', '-preset', 'ultrafast', backgroundPath
+    ], check=True)
+    subprocess.run([
+        'ffmpeg', '-y', '-v', 'error', '-f', 'lavfi', '-i', f'sine=frequency=440:duration={totalDuration}', audioPath
+    ], check=True)
+    return backgroundPath, audioPath
+
+
+def makeTimeline(videoGenerator: VideoGenerator, lineCount: int):
+    timeline = []
+    for i in range(lineCount):
+        subtitleInfo = videoGenerator._generateSimpleSubtitles(LINE_TEXT, LINE_SECONDS)
+        timeline.append({
+            "lineIndex": i,
+            "speaker": "benchmark",
+            "text": LINE_TEXT,
+            "audioFile": "",
+            "imageFile": "",
+            "startTime": i * LINE_SECONDS,
+            "endTime": (i + 1) * LINE_SECONDS,
+            "duration": LINE_SECONDS,
+            "subtitleSegments": subtitleInfo["segments"]
+        })
+    return timeline
+
+
+def compareProfiles(videoGenerator: VideoGenerator, args):
+    available = probeEncoders()
+    print(f"{'lines':>6} {'video s':>8} {'profile':>8} {'render s':>9} {'x realtime':>11} {'size MB':>8}")
+
+    with tempfile.TemporaryDirectory() as workDir:
+        for lineCount in (int(n) for n in args.lines.split(",")):
+            timeline = makeTimeline(videoGenerator, lineCount)
+            totalDuration = lineCount * LINE_SECONDS
+            backgroundPath, audioPath = makeInputs(workDir, totalDuration)
+
+            for profileName in args.profiles.split(","):
+                prefix = f"{lineCount:>6} {totalDuration:>8.0f} {profileName:>8}"
+                if ENCODER_PROFILES[profileName]["encoder"] not in available:
+                    print(f"{prefix} {'unavailable':>9}")
+                    continue
+
+                outputPath = os.path.join(workDir, f"out_{profileName}.mp4")
+                start = time.perf_counter()
+                success, videoSize = videoGenerator._generateVideoWithFfmpeg(
+                    backgroundPath, timeline, totalDuration, audioPath, outputPath, "benchmark", args.font,
+                    encoderProfile=profileName
+                )
+                elapsed = time.perf_counter() - start
+                if not success:
+                    print(f"{prefix} {'failed':>9}")
+                    continue
+                print(f"{prefix} {elapsed:>9.2f} {totalDuration / elapsed:>11.2f} {videoSize / 1e6:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--compare", choices=["subtitles", "profiles"], default="subtitles")
+    parser.add_argument("--lines", default="10,50,200", help="comma separated script lengths (dialogue lines)")
+    parser.add_argument("--modes", default="drawtext,ass", help="subtitle modes to compare")
+    parser.add_argument("--profiles", default=",".join(ENCODER_PROFILES), help="encoder profiles to compare")
+    parser.add_argument("--font", default="", help="font file, Arial when missing")
+    args = parser.parse_args()
+
+    videoGenerator = VideoGenerator()
+    if args.compare == "profiles":
+        compareProfiles(videoGenerator, args)
+        return
+
+    modes = args.modes.split(",")
+    print(f"{'lines':>6} {'segments':>9} {'video s':>8} " + " ".join(f"{mode + ' s':>12}" for mode in modes))
+
+    with tempfile.TemporaryDirectory() as workDir:
+        for lineCount in (int(n) for n in args.lines.split(",")):
+            timeline = makeTimeline(videoGenerator, lineCount)
+            totalDuration = lineCount * LINE_SECONDS
+            backgroundPath, audioPath = makeInputs(workDir, totalDuration)
+            segmentCount = sum(len(item["subtitleSegments"]) for item in timeline)
+
+            timings = []
+            for mode in modes:
+                outputPath = os.path.join(workDir, f"out_{mode}.mp4")
+                start = time.perf_counter()
+                success, _ = videoGenerator._generateVideoWithFfmpeg(
+                    backgroundPath, timeline, totalDuration, audioPath, outputPath, "benchmark", args.font,
+                    subtitleMode=mode
+                )
+                timings.append(f"{time.perf_counter() - start:12.2f}" if success else f"{'failed':>12}")
+
+            print(f"{lineCount:>6} {segmentCount:>9} {totalDuration:>8.0f} " + " ".join(timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,17 @@
 
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
+from google.api_core.exceptions import NotFound
 import os
+import copy
+import time
+import inspect
 import logging
-from datetime import datetime
-from typing import Dict, Any, Optional, List
+import functools
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Optional, List, Tuple
 import jwt
 import requests
 import json
@@ -14,12 +21,194 @@ from dotenv import load_dotenv
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Fields read for list views; select() leaves out dialogue bodies and association arrays
+SCRIPT_SUMMARY_FIELDS = [
+    'selectedCharacters', 'originalPrompt', 'createdAt', 'updatedAt', 'createdBy',
+    'finalVideoPath', 'videoDuration', 'videoSize', 'currentVideoJobId', 'videoJobStatus', 'videoJobProgress',
+    'videoJobCurrentStep', 'videoJobStartedAt', 'videoJobCompletedAt', 'videoJobErrorMessage'
+]
+CHARACTER_LIST_FIELDS = [
+    'displayName', 'audioFile', 'config', 'images', 'outputPrefix', 'createdAt', 'updatedAt', 'createdBy', 'starred'
+]
+
+# Read-through cache of single documents (plus the whole user_profiles collection). Writes made
+# through FirebaseService invalidate it right away; the TTLs bound staleness from other writers
+FIRESTORE_CACHE_ENABLED = os.getenv("FIRESTORE_CACHE", "true").lower() == "true"
+FIRESTORE_CACHE_SIZE = int(os.getenv("FIRESTORE_CACHE_SIZE", "2048"))
+FIRESTORE_CACHE_LISTENERS = os.getenv("FIRESTORE_CACHE_LISTENERS", "false").lower() == "true"
+FIRESTORE_CACHE_TTLS = {
+    'users': float(os.getenv("FIRESTORE_CACHE_USERS_TTL", "30")),
+    'scripts': float(os.getenv("FIRESTORE_CACHE_SCRIPTS_TTL", "30")),
+    'user_profiles': float(os.getenv("FIRESTORE_CACHE_PROFILES_TTL", "300")),
+    'video_generation_jobs': float(os.getenv("FIRESTORE_CACHE_JOBS_TTL", "5")),
+}
+ALL_DOCUMENTS = '*'  # Cache key of an entry built from a whole collection
+
+class DocumentCache:
+    """LRU of (collection, document id) -> (expiresAt, value) with per-collection TTLs and hit counters"""
+
+    def __init__(self, maxEntries: int = FIRESTORE_CACHE_SIZE, ttls: Dict[str, float] = FIRESTORE_CACHE_TTLS):
+        self.maxEntries = maxEntries
+        self.ttls = ttls
+        self.entries = OrderedDict()
+        self.versions = {}  # collection -> bumped on every invalidation
+        self.counters = {}  # collection -> {"hits", "misses", "evictions", "invalidations"}
+        self.watches = []
+        self.lock = threading.Lock()
+
+    def _count(self, collection: str, name: str, amount: int = 1):
+        counters = self.counters.setdefault(collection, {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0})
+        counters[name] += amount
+
+    def get(self, collection: str, docId: str, load):
+        """Copy of the cached value, calling load() on a miss. None results and exceptions from
+        load() aren't cached, so missing or unreadable documents are read again next time"""
+        key = (collection, docId)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self._count(collection, 'hits')
+                return copy.deepcopy(entry[1])
+            self._count(collection, 'misses')
+            version = self.versions.get(collection, 0)
+
+        value = load()
+        if value is None:
+            return None
+
+        with self.lock:
+            # An invalidation that landed while loading may mean value is already stale
+            if self.versions.get(collection, 0) == version:
+                self.entries[key] = (time.monotonic() + self.ttls.get(collection, 30), copy.deepcopy(value))
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxEntries:
+                    (evictedCollection, _), _ = self.entries.popitem(last=False)
+                    self._count(evictedCollection, 'evictions')
+        return value
+
+    def invalidate(self, collection: str, docId: Optional[str] = None):
+        """Drop one document (and any whole-collection entry built from it), or all of a collection"""
+        with self.lock:
+            self.versions[collection] = self.versions.get(collection, 0) + 1
+            if docId is None:
+                keys = [key for key in self.entries if key[0] == collection]
+            else:
+                keys = [(collection, docId), (collection, ALL_DOCUMENTS)]
+            for key in keys:
+                if self.entries.pop(key, None) is not None:
+                    self._count(collection, 'invalidations')
+
+    def clear(self):
+        # Bump every known collection, so loads in flight for an empty one aren't stored afterwards
+        with self.lock:
+            for collection in set(self.ttls) | set(self.versions) | {key[0] for key in self.entries}:
+                self.versions[collection] = self.versions.get(collection, 0) + 1
+            self.entries.clear()
+
+    def listen(self, db, collections: List[str]):
+        """Invalidate on Firestore change notifications, for writes made by other processes.
+        Each listener streams its whole collection once on start, then only the changes"""
+        for collection in collections:
+            def onSnapshot(snapshots, changes, readTime, collection=collection):
+                for change in changes:
+                    self.invalidate(collection, change.document.id)
+            self.watches.append(db.collection(collection).on_snapshot(onSnapshot))
+        logger.info(f"👂 Cache listeners started for {', '.join(collections)}")
+
+    def stop(self):
+        for watch in self.watches:
+            watch.unsubscribe()
+        self.watches = []
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            collections = {}
+            for collection, counters in self.counters.items():
+                lookups = counters['hits'] + counters['misses']
+                collections[collection] = {**counters, 'hitRate': round(counters['hits'] / lookups, 4) if lookups else 0.0}
+            hits = sum(c['hits'] for c in self.counters.values())
+            lookups = hits + sum(c['misses'] for c in self.counters.values())
+            return {
+                'entries': len(self.entries),
+                'maxEntries': self.maxEntries,
+                'listeners': len(self.watches),
+                'hitRate': round(hits / lookups, 4) if lookups else 0.0,
+                'collections': collections
+            }
+
+class InvalidCursorError(ValueError):
+    """A page cursor naming a document that doesn't exist (deleted since, or never in the query)"""
+
+def _leaseTime(offsetSeconds: float = 0) -> str:
+    """Lease timestamps are UTC so workers on different hosts compare them correctly"""
+    return (datetime.now(timezone.utc) + timedelta(seconds=offsetSeconds)).isoformat()
+
+def _leaseExpired(leaseExpiresAt: Optional[str]) -> bool:
+    # Naive values were written by older workers in their local time
+    if not leaseExpiresAt:
+        return True
+    try:
+        expiresAt = datetime.fromisoformat(leaseExpiresAt)
+    except ValueError:
+        return True
+    return expiresAt.astimezone(timezone.utc) <= datetime.now(timezone.utc)
+
+def _invalidates(*targets):
+    """Invalidate what a write method touches once it returns (or raises). Each target is
+    (collection, name of the argument holding the document id or a list of ids), or (collection, None)
+    for all of it"""
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                if self.cache:
+                    arguments = signature.bind(self, *args, **kwargs).arguments
+                    for collection, argName in targets:
+                        docIds = arguments.get(argName) if argName else None
+                        if isinstance(docIds, (list, tuple, set)):
+                            for docId in docIds:
+                                self.cache.invalidate(collection, docId)
+                        else:
+                            self.cache.invalidate(collection, docIds)
+        return wrapper
+    return decorator
+
 class FirebaseService:
     def __init__(self, credentialsPath: str = "firebase.json"):
         self.credentialsPath = credentialsPath
         self.db = None
         self.app = None
+        self.cache = DocumentCache() if FIRESTORE_CACHE_ENABLED else None
         self.initializeFirebase()
+        if self.cache and FIRESTORE_CACHE_LISTENERS:
+            try:
+                self.cache.listen(self.db, list(FIRESTORE_CACHE_TTLS))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not start cache listeners, relying on TTLs: {str(e)}")
+    
+    def _cachedRead(self, collection: str, docId: str, load, useCache: bool = True):
+        if self.cache and useCache:
+            return self.cache.get(collection, docId, load)
+        return load()
+    
+    def getCacheStats(self) -> Dict[str, Any]:
+        if not self.cache:
+            return {'enabled': False}
+        return {'enabled': True, **self.cache.stats()}
+    
+    def invalidateCache(self, collection: Optional[str] = None, docId: Optional[str] = None):
+        """For writes that bypass this service (e.g. a direct db call); no collection clears everything"""
+        if not self.cache:
+            return
+        if collection is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(collection, docId)
     
     def initializeFirebase(self):
         try:
@@ -65,31 +254,30 @@ class FirebaseService:
     
     def getAllUserProfiles(self) -> Dict[str, Any]:
         try:
-            profilesRef = self.db.collection('user_profiles')
-            docs = profilesRef.stream()
-            
-            users = {}
-            defaultUser = None
-            
-            for doc in docs:
-                if doc.id == '_metadata':
-                    metadata = doc.to_dict()
-                    defaultUser = metadata.get('defaultUser')
-                else:
-                    users[doc.id] = doc.to_dict()
-            
-            result = {
-                "users": users,
-                "defaultUser": defaultUser
-            }
+            def load():
+                users = {}
+                defaultUser = None
+                
+                for doc in self.db.collection('user_profiles').stream():
+                    if doc.id == '_metadata':
+                        metadata = doc.to_dict()
+                        defaultUser = metadata.get('defaultUser')
+                    else:
+                        users[doc.id] = doc.to_dict()
+                
+                logger.info(f"📄 Retrieved {len(users)} user profiles")
+                return {
+                    "users": users,
+                    "defaultUser": defaultUser
+                }
             
-            logger.info(f"📄 Retrieved {len(users)} user profiles")
-            return result
+            return self._cachedRead('user_profiles', ALL_DOCUMENTS, load)
             
         except Exception as e:
             logger.error(f"💥 Error getting user profiles: {str(e)}")
             return {"users": {}, "defaultUser": None}
     
+    @_invalidates(('user_profiles', None))
     def saveUserProfiles(self, profilesData: Dict[str, Any]) -> bool:
         try:
             batch = self.db.batch()
@@ -116,20 +304,19 @@ class FirebaseService:
             logger.error(f"💥 Error saving user profiles: {str(e)}")
             return False
     
-    def getUserProfile(self, userId: str) -> Optional[Dict[str, Any]]:
+    def getUserProfile(self, userId: str, useCache: bool = True) -> Optional[Dict[str, Any]]:
         try:
-            userRef = self.db.collection('user_profiles').document(userId)
-            doc = userRef.get()
+            def load():
+                doc = self.db.collection('user_profiles').document(userId).get()
+                return doc.to_dict() if doc.exists else None
             
-            if doc.exists:
-                return doc.to_dict()
-            
-            return None
+            return self._cachedRead('user_profiles', userId, load, useCache)
             
         except Exception as e:
             logger.error(f"💥 Error getting user profile {userId}: {str(e)}")
             return None
     
+    @_invalidates(('user_profiles', 'userId'))
     def saveUserProfile(self, userId: str, userData: Dict[str, Any]) -> bool:
         try:
             userRef = self.db.collection('user_profiles').document(userId)
@@ -143,6 +330,7 @@ class FirebaseService:
             logger.error(f"💥 Error saving user profile {userId}: {str(e)}")
             return False
     
+    @_invalidates(('user_profiles', 'userId'))
     def deleteUserProfile(self, userId: str) -> bool:
         try:
             userRef = self.db.collection('user_profiles').document(userId)
@@ -177,6 +365,7 @@ class FirebaseService:
             logger.error(f"💥 Error getting scripts: {str(e)}")
             return {"scripts": {}}
     
+    @_invalidates(('scripts', None))
     def saveScripts(self, scriptsData: Dict[str, Any]) -> bool:
         try:
             batch = self.db.batch()
@@ -202,20 +391,25 @@ class FirebaseService:
             logger.error(f"💥 Error saving scripts: {str(e)}")
             return False
     
-    def getScript(self, scriptId: str) -> Optional[Dict[str, Any]]:
+    def getScript(self, scriptId: str, useCache: bool = True) -> Optional[Dict[str, Any]]:
         try:
-            scriptRef = self.db.collection('scripts').document(scriptId)
-            doc = scriptRef.get()
+            def load():
+                doc = self.db.collection('scripts').document(scriptId).get()
+                return doc.to_dict() if doc.exists else None
             
-            if doc.exists:
-                return doc.to_dict()
-            
-            return None
+            return self._cachedRead('scripts', scriptId, load, useCache)
             
         except Exception as e:
             logger.error(f"💥 Error getting script {scriptId}: {str(e)}")
             return None
     
+    def getScriptData(self, scriptId: str) -> Dict[str, Any]:
+        """One script in the {"scripts": {id: script}} shape of getAllScripts (e.g. for generateAudioForScript).
+        Read past the cache, as callers write the whole document back"""
+        script = self.getScript(scriptId, useCache=False)
+        return {"scripts": {scriptId: script} if script else {}}
+    
+    @_invalidates(('scripts', 'scriptId'))
     def saveScript(self, scriptId: str, scriptData: Dict[str, Any]) -> bool:
         try:
             scriptRef = self.db.collection('scripts').document(scriptId)
@@ -229,6 +423,22 @@ class FirebaseService:
             logger.error(f"💥 Error saving script {scriptId}: {str(e)}")
             return False
     
+    @_invalidates(('scripts', 'scriptId'))
+    def updateScriptFields(self, scriptId: str, fields: Dict[str, Any]) -> bool:
+        """Update only the given fields (dotted paths allowed) without reading the script"""
+        try:
+            scriptRef = self.db.collection('scripts').document(scriptId)
+            scriptRef.update({**fields, 'updatedAt': datetime.now().isoformat()})
+            return True
+            
+        except NotFound:
+            logger.info(f"🗑️ Script {scriptId} no longer exists, update skipped")
+            return False
+        except Exception as e:
+            logger.error(f"💥 Error updating script {scriptId}: {str(e)}")
+            return False
+    
+    @_invalidates(('scripts', 'scriptId'))
     def deleteScript(self, scriptId: str) -> bool:
         try:
             scriptRef = self.db.collection('scripts').document(scriptId)
@@ -356,17 +566,17 @@ class FirebaseService:
             logger.error(f"💥 Error verifying user {email}: {str(e)}")
             return False, f"Authentication failed: {str(e)}", None
     
-    def getUserById(self, userId: str) -> Optional[Dict[str, Any]]:
+    def getUserById(self, userId: str, useCache: bool = True) -> Optional[Dict[str, Any]]:
         try:
-            userRef = self.db.collection('users').document(userId)
-            doc = userRef.get()
-            
-            if doc.exists:
+            def load():
+                doc = self.db.collection('users').document(userId).get()
+                if not doc.exists:
+                    return None
                 userData = doc.to_dict()
                 userData['id'] = userId
                 return userData
             
-            return None
+            return self._cachedRead('users', userId, load, useCache)
             
         except Exception as e:
             logger.error(f"💥 Error getting user {userId}: {str(e)}")
@@ -404,6 +614,24 @@ class FirebaseService:
             logger.error(f"💥 Error getting user name for {userId}: {str(e)}")
             return None
     
+    def getUserNamesByIds(self, userIds: List[str]) -> Dict[str, str]:
+        """Names of many users in one batched get_all; ids of missing users are left out"""
+        try:
+            userRefs = [self.db.collection('users').document(userId) for userId in set(userIds) if userId]
+            if not userRefs:
+                return {}
+            
+            names = {}
+            for doc in self.db.get_all(userRefs, field_paths=['name']):
+                if doc.exists:
+                    names[doc.id] = doc.to_dict().get('name', 'Unknown User')
+            return names
+            
+        except Exception as e:
+            logger.error(f"💥 Error getting user names: {str(e)}")
+            return {}
+    
+    @_invalidates(('users', 'userId'))
     def updateUser(self, userId: str, userData: Dict[str, Any]) -> bool:
         try:
             userRef = self.db.collection('users').document(userId)
@@ -417,6 +645,7 @@ class FirebaseService:
             logger.error(f"💥 Error updating user {userId}: {str(e)}")
             return False
     
+    @_invalidates(('users', 'userId'))
     def deleteUser(self, userId: str) -> bool:
         try:
             auth.delete_user(userId)
@@ -447,13 +676,14 @@ class FirebaseService:
             logger.error(f"💥 Error checking token balance for user {userId}: {str(e)}")
             return None
     
+    @_invalidates(('users', 'userId'))
     def deductTokens(self, userId: str, amount: int = 1) -> tuple[bool, str, int]:
         """
         Deduct tokens from a user's account
         Returns: (success, message, remaining_tokens)
         """
         try:
-            user_data = self.getUserById(userId)
+            user_data = self.getUserById(userId, useCache=False)
             if not user_data:
                 logger.warning(f"⚠️ User {userId} not found for token deduction")
                 return False, "User not found", 0
@@ -480,6 +710,7 @@ class FirebaseService:
             logger.error(f"💥 Error deducting tokens from user {userId}: {str(e)}")
             return False, f"Token deduction failed: {str(e)}", 0
     
+    @_invalidates(('user_profiles', 'characterId'), ('users', 'ownerUserId'))
     def createCharacterWithOwner(self, characterId: str, characterData: Dict[str, Any], ownerUserId: str) -> bool:
         try:
             characterData['createdBy'] = ownerUserId
@@ -513,6 +744,7 @@ class FirebaseService:
             logger.error(f"💥 Error creating character with owner: {str(e)}")
             return False
     
+    @_invalidates(('user_profiles', 'characterId'), ('users', None))
     def deleteCharacterWithOwnerCleanup(self, characterId: str) -> bool:
         try:
             characterData = self.getUserProfile(characterId)
@@ -554,6 +786,22 @@ class FirebaseService:
             logger.error(f"💥 Error deleting character: {str(e)}")
             return False
     
+    def getCharactersPage(self, limit: int, cursor: Optional[str] = None,
+                          fields: Optional[List[str]] = CHARACTER_LIST_FIELDS) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """A page of characters ordered by id, projected to the list fields, see _readPage"""
+        try:
+            query = self.db.collection('user_profiles').order_by('__name__')
+            characters, nextCursor = self._readPage('user_profiles', query, limit, cursor, fields)
+            
+            logger.info(f"📄 Retrieved {len(characters)} characters")
+            return characters, nextCursor
+            
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"💥 Error getting characters page: {str(e)}")
+            return [], None
+    
     def getUserCharacters(self, userId: str) -> List[Dict[str, Any]]:
         try:
             charactersRef = self.db.collection('user_profiles')
@@ -573,6 +821,7 @@ class FirebaseService:
             logger.error(f"💥 Error getting user characters: {str(e)}")
             return []
     
+    @_invalidates(('user_profiles', 'characterId'), ('users', None))
     def updateCharacterWithOwnerCheck(self, characterId: str, characterData: Dict[str, Any], requestingUserId: str) -> bool:
         try:
             existingCharacter = self.getUserProfile(characterId)
@@ -618,6 +867,7 @@ class FirebaseService:
             logger.error(f"💥 Error updating character: {str(e)}")
             return False
 
+    @_invalidates(('user_profiles', 'characterId'), ('users', 'userId'))
     def starCharacter(self, characterId: str, userId: str) -> tuple[bool, str, int]:
         try:
             batch = self.db.batch()
@@ -672,6 +922,7 @@ class FirebaseService:
             logger.error(f"💥 Error starring character: {str(e)}")
             return False, f"Failed to star character: {str(e)}", 0
 
+    @_invalidates(('user_profiles', 'characterId'), ('users', 'userId'))
     def unstarCharacter(self, characterId: str, userId: str) -> tuple[bool, str, int]:
         try:
             batch = self.db.batch()
@@ -743,25 +994,41 @@ class FirebaseService:
             logger.error(f"💥 Error checking if character is starred: {str(e)}")
             return False
 
-    def getUserFavoriteCharacters(self, userId: str) -> List[Dict[str, Any]]:
+    def getFavoriteCharacterIds(self, userId: str) -> List[str]:
+        """Ids of the user's starred characters in starring order, from one read of favCharacters"""
         try:
-            userRef = self.db.collection('users').document(userId)
-            userDoc = userRef.get()
-            
+            userDoc = self.db.collection('users').document(userId).get(field_paths=['favCharacters'])
             if not userDoc.exists:
                 return []
             
-            userData = userDoc.to_dict()
-            favCharacters = userData.get('favCharacters', [])
+            favCharacters = userDoc.to_dict().get('favCharacters', [])
+            return [fav.get('charId') for fav in favCharacters if fav.get('charId')]
             
-            favoriteCharsData = []
-            for fav in favCharacters:
-                charId = fav.get('charId')
-                if charId:
-                    charData = self.getUserProfile(charId)
-                    if charData:
-                        charData['id'] = charId
-                        favoriteCharsData.append(charData)
+        except Exception as e:
+            logger.error(f"💥 Error getting favorite character ids: {str(e)}")
+            return []
+
+    def getCharactersByIds(self, characterIds: List[str]) -> List[Dict[str, Any]]:
+        """Characters (with 'id') in the given order from one batched get_all, missing ones skipped"""
+        try:
+            characterIds = list(dict.fromkeys(characterIds))
+            if not characterIds:
+                return []
+            
+            characterRefs = [self.db.collection('user_profiles').document(charId) for charId in characterIds]
+            found = {}
+            for doc in self.db.get_all(characterRefs):
+                if doc.exists:
+                    found[doc.id] = {**doc.to_dict(), 'id': doc.id}
+            return [found[charId] for charId in characterIds if charId in found]
+            
+        except Exception as e:
+            logger.error(f"💥 Error getting characters by ids: {str(e)}")
+            return []
+
+    def getUserFavoriteCharacters(self, userId: str) -> List[Dict[str, Any]]:
+        try:
+            favoriteCharsData = self.getCharactersByIds(self.getFavoriteCharacterIds(userId))
             
             logger.info(f"📄 Retrieved {len(favoriteCharsData)} favorite characters for user {userId}")
             return favoriteCharsData
@@ -770,6 +1037,7 @@ class FirebaseService:
             logger.error(f"💥 Error getting user favorite characters: {str(e)}")
             return []
 
+    @_invalidates(('scripts', 'scriptId'), ('users', 'ownerUserId'), ('user_profiles', None))
     def createScriptWithAssociations(self, scriptId: str, scriptData: Dict[str, Any], ownerUserId: str) -> bool:
         """Create a script and update user's generatedScripts array and characters' scripts arrays"""
         try:
@@ -825,6 +1093,7 @@ class FirebaseService:
             logger.error(f"💥 Error creating script with associations: {str(e)}")
             return False
 
+    @_invalidates(('scripts', 'scriptId'), ('users', None), ('user_profiles', None))
     def deleteScriptWithAssociations(self, scriptId: str) -> bool:
         """Delete a script and clean up all associations"""
         try:
@@ -914,6 +1183,78 @@ class FirebaseService:
             logger.error(f"💥 Error getting user scripts: {str(e)}")
             return []
 
+    def _readPage(self, collectionName: str, query, limit: Optional[int], cursor: Optional[str] = None,
+                  fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Run one page of an ordered query: resume after the cursor document (the id of the last
+        document of the previous page) and optionally project to fields. limit=None reads everything.
+        Returns (documents with 'id', next cursor or None); '_metadata' documents are skipped.
+        Raises InvalidCursorError for an unknown cursor rather than starting over at the first page"""
+        if cursor:
+            cursorDoc = self.db.collection(collectionName).document(cursor).get()
+            if not cursorDoc.exists:
+                raise InvalidCursorError(f"Unknown cursor '{cursor}', restart from the first page")
+            query = query.start_after(cursorDoc)
+        if fields:
+            query = query.select(fields)
+        
+        # One extra document tells whether another page exists
+        docs = list((query.limit(limit + 1) if limit else query).stream())
+        nextCursor = docs[limit - 1].id if limit and len(docs) > limit else None
+        
+        items = []
+        for doc in docs[:limit]:
+            if doc.id == '_metadata':
+                continue
+            itemData = doc.to_dict()
+            itemData['id'] = doc.id
+            items.append(itemData)
+        return items, nextCursor
+    
+    def getOtherUsersScripts(self, userId: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                             fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Scripts created by anyone but userId, see _readPage. Without limit, every such script in
+        document id order. Paginated reads need the scripts (createdBy, createdAt) index from
+        firestore.indexes.json, and Firestore leaves documents without createdBy or createdAt out
+        of them, so such scripts are only listed unpaginated"""
+        try:
+            if limit:
+                # A != filter must be the first ordering, so pages are ordered by creator, then creation time
+                query = self.db.collection('scripts').where('createdBy', '!=', userId).order_by('createdBy').order_by('createdAt')
+                scripts, nextCursor = self._readPage('scripts', query, limit, cursor, fields)
+            else:
+                query = self.db.collection('scripts').order_by('__name__')
+                scripts, nextCursor = self._readPage('scripts', query, None, cursor, fields)
+                scripts = [script for script in scripts if script.get('createdBy') != userId]
+            
+            logger.info(f"📄 Retrieved {len(scripts)} scripts not created by {userId}")
+            return scripts, nextCursor
+            
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"💥 Error getting other users' scripts: {str(e)}")
+            return [], None
+    
+    def getUserScriptsPage(self, userId: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+                           fields: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Scripts created by userId, newest first when paginated (needs the scripts
+        (createdBy, createdAt desc) index), see _readPage. Paginated reads leave out scripts
+        without createdAt, as Firestore does for any ordered field"""
+        try:
+            query = self.db.collection('scripts').where('createdBy', '==', userId)
+            if limit:
+                query = query.order_by('createdAt', direction=firestore.Query.DESCENDING)
+            scripts, nextCursor = self._readPage('scripts', query, limit, cursor, fields)
+            
+            logger.info(f"📄 Retrieved {len(scripts)} scripts for user {userId}")
+            return scripts, nextCursor
+            
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            logger.error(f"💥 Error getting user scripts: {str(e)}")
+            return [], None
+
     def getCharacterScripts(self, characterId: str) -> List[Dict[str, Any]]:
         """Get all scripts that use a specific character"""
         try:
@@ -934,11 +1275,12 @@ class FirebaseService:
             logger.error(f"💥 Error getting character scripts: {str(e)}")
             return []
 
+    @_invalidates(('scripts', 'scriptId'), ('users', None))
     def updateScriptWithCharacterAssociations(self, scriptId: str, newScriptData: Dict[str, Any]) -> bool:
         """Update script and maintain character associations"""
         try:
             # Get current script to see what characters were previously associated
-            currentScript = self.getScript(scriptId)
+            currentScript = self.getScript(scriptId, useCache=False)
             if not currentScript:
                 logger.error(f"💥 Script {scriptId} not found for character association update")
                 return False
@@ -1010,6 +1352,7 @@ class FirebaseService:
         TOKEN_DEDUCTED = "token_deducted"
         TOKEN_CREDITED = "token_credited"
 
+    @_invalidates(('users', 'userId'))
     def addUserActivity(self, userId: str, activityType: str, message: str, additionalData: Dict[str, Any] = None) -> bool:
         """Add an activity to the user's activity log"""
         try:
@@ -1313,6 +1656,7 @@ class FirebaseService:
 
     # Video Generation Job Management
 
+    @_invalidates(('video_generation_jobs', 'jobId'))
     def createVideoGenerationJob(self, jobId: str, scriptId: str, userId: str, totalSteps: int, steps: List[Dict[str, Any]]) -> bool:
         """Create a new video generation job with progress tracking"""
         try:
@@ -1345,21 +1689,20 @@ class FirebaseService:
             logger.error(f"💥 Error creating video generation job: {str(e)}")
             return False
 
-    def getVideoGenerationJob(self, jobId: str) -> Optional[Dict[str, Any]]:
+    def getVideoGenerationJob(self, jobId: str, useCache: bool = True) -> Optional[Dict[str, Any]]:
         """Get video generation job by ID"""
         try:
-            jobRef = self.db.collection('video_generation_jobs').document(jobId)
-            doc = jobRef.get()
+            def load():
+                doc = self.db.collection('video_generation_jobs').document(jobId).get()
+                return doc.to_dict() if doc.exists else None
             
-            if doc.exists:
-                return doc.to_dict()
-            
-            return None
+            return self._cachedRead('video_generation_jobs', jobId, load, useCache)
             
         except Exception as e:
             logger.error(f"💥 Error getting video generation job {jobId}: {str(e)}")
             return None
 
+    @_invalidates(('video_generation_jobs', 'jobId'))
     def updateVideoGenerationJobProgress(self, jobId: str, stepName: str, stepStatus: str, stepProgress: float, stepMessage: str = "", overallProgress: float = None, currentStep: str = None) -> bool:
         """Update progress for a specific step in video generation job"""
         try:
@@ -1418,6 +1761,7 @@ class FirebaseService:
             logger.error(f"💥 Error updating video job progress: {str(e)}")
             return False
 
+    @_invalidates(('video_generation_jobs', 'jobId'))
     def completeVideoGenerationJob(self, jobId: str, finalVideoPath: str, videoDuration: float, videoSize: int) -> bool:
         """Mark video generation job as completed"""
         try:
@@ -1428,6 +1772,8 @@ class FirebaseService:
                 'finalVideoPath': finalVideoPath,
                 'videoDuration': videoDuration,
                 'videoSize': videoSize,
+                'leaseOwner': None,
+                'leaseExpiresAt': None,
                 'updatedAt': datetime.now().isoformat()
             }
             
@@ -1441,6 +1787,41 @@ class FirebaseService:
             logger.error(f"💥 Error completing video generation job: {str(e)}")
             return False
 
+    @_invalidates(('video_generation_jobs', 'jobId'), ('scripts', 'scriptId'))
+    def applyVideoJobProgress(self, jobId: str, jobFields: Dict[str, Any],
+                              scriptId: str = None, scriptFields: Dict[str, Any] = None) -> bool:
+        """Write coalesced progress fields of a job and its script in one batch, no reads"""
+        try:
+            now = datetime.now().isoformat()
+            batch = self.db.batch()
+            if jobFields:
+                batch.update(self.db.collection('video_generation_jobs').document(jobId), {**jobFields, 'updatedAt': now})
+            if scriptId and scriptFields:
+                batch.update(self.db.collection('scripts').document(scriptId), {**scriptFields, 'updatedAt': now})
+            batch.commit()
+            return True
+            
+        except Exception as e:
+            logger.error(f"💥 Error writing progress of video job {jobId}: {str(e)}")
+            return False
+
+    @_invalidates(('video_generation_jobs', 'jobId'))
+    def recordVideoGenerationJobSelection(self, jobId: str, selectionMode: str, selectionSeed: Optional[str]) -> bool:
+        """Store how the job picked its images/background, so a render can be reproduced"""
+        try:
+            jobRef = self.db.collection('video_generation_jobs').document(jobId)
+            jobRef.update({
+                'selectionMode': selectionMode,
+                'selectionSeed': selectionSeed,
+                'updatedAt': datetime.now().isoformat()
+            })
+            return True
+            
+        except Exception as e:
+            logger.error(f"💥 Error recording selection seed of video job {jobId}: {str(e)}")
+            return False
+
+    @_invalidates(('video_generation_jobs', 'jobId'))
     def failVideoGenerationJob(self, jobId: str, errorMessage: str) -> bool:
         """Mark video generation job as failed"""
         try:
@@ -1448,6 +1829,8 @@ class FirebaseService:
                 'status': 'failed',
                 'completedAt': datetime.now().isoformat(),
                 'errorMessage': errorMessage,
+                'leaseOwner': None,
+                'leaseExpiresAt': None,
                 'updatedAt': datetime.now().isoformat()
             }
             
@@ -1501,75 +1884,99 @@ class FirebaseService:
             logger.error(f"💥 Error getting active video generation jobs: {str(e)}")
             return []
 
-    def cleanupIncompleteJobsOnStartup(self) -> int:
-        """Mark all incomplete (queued/in_progress) video generation jobs as failed on backend startup"""
+    # Video job leases: a worker owns a job while its lease is fresh, expired leases can be resumed by anyone
+
+    @_invalidates(('video_generation_jobs', 'jobId'))
+    def claimVideoGenerationJob(self, jobId: str, workerId: str, leaseSeconds: int) -> Optional[Dict[str, Any]]:
+        """Take the lease on a queued or in-progress job, returns the job or None if it is finished or leased elsewhere"""
         try:
-            logger.info("🧹 Starting cleanup of incomplete video generation jobs...")
-            
-            # Get all incomplete jobs
-            incompleteJobs = self.getActiveVideoGenerationJobs()
-            
-            if not incompleteJobs:
-                logger.info("✅ No incomplete video generation jobs found")
-                return 0
-            
-            failed_count = 0
-            startup_time = datetime.now().isoformat()
-            
-            for job in incompleteJobs:
-                job_id = job.get('jobId')
-                script_id = job.get('scriptId')
-                user_id = job.get('userId')
-                old_status = job.get('status')
-                
-                logger.info(f"🔄 Marking job {job_id} as failed (was: {old_status})")
-                
-                try:
-                    # Mark job as failed in Firebase
-                    success = self.failVideoGenerationJob(
-                        job_id, 
-                        f"Backend restarted while job was {old_status}. Please retry video generation."
-                    )
-                    
-                    if success:
-                        failed_count += 1
-                        
-                        # Also update the associated script to reflect the failure
-                        if script_id:
-                            script = self.getScript(script_id)
-                            if script and script.get('currentVideoJobId') == job_id:
-                                script.update({
-                                    'videoJobStatus': 'failed',
-                                    'videoJobErrorMessage': f'Backend restarted while job was {old_status}',
-                                    'videoJobCompletedAt': startup_time,
-                                    'updatedAt': startup_time
-                                })
-                                self.saveScript(script_id, script)
-                                logger.info(f"✅ Updated script {script_id} with failure status")
-                        
-                        # Log activity for user
-                        if user_id:
-                            self.addVideoActivity(
-                                user_id,
-                                self.ActivityType.VIDEO_GENERATION_FAILED,
-                                script_id,
-                                f"Job failed due to backend restart (was {old_status})"
-                            )
-                        
-                        logger.info(f"✅ Successfully marked job {job_id} as failed")
-                    else:
-                        logger.error(f"❌ Failed to mark job {job_id} as failed")
-                        
-                except Exception as job_error:
-                    logger.error(f"💥 Error processing job {job_id}: {str(job_error)}")
-                    continue
-            
-            logger.info(f"🧹 Cleanup completed: {failed_count}/{len(incompleteJobs)} jobs marked as failed")
-            return failed_count
-            
+            jobRef = self.db.collection('video_generation_jobs').document(jobId)
+
+            @firestore.transactional
+            def claim(transaction):
+                doc = jobRef.get(transaction=transaction)
+                if not doc.exists:
+                    return None
+
+                jobData = doc.to_dict()
+                if jobData.get('status') not in ['queued', 'in_progress']:
+                    return None
+
+                leaseOwner = jobData.get('leaseOwner')
+                if leaseOwner and leaseOwner != workerId and not _leaseExpired(jobData.get('leaseExpiresAt')):
+                    return None
+
+                leaseData = {
+                    'leaseOwner': workerId,
+                    'leaseExpiresAt': _leaseTime(leaseSeconds),
+                    'heartbeatAt': _leaseTime(),
+                    'attempts': jobData.get('attempts', 0) + 1
+                }
+                transaction.update(jobRef, leaseData)
+                return {**jobData, **leaseData}
+
+            jobData = claim(self.db.transaction())
+            if jobData:
+                logger.info(f"🔒 Claimed video job {jobId} (attempt {jobData['attempts']})")
+            return jobData
+
+        except Exception as e:
+            logger.error(f"💥 Error claiming video generation job {jobId}: {str(e)}")
+            return None
+
+    @_invalidates(('video_generation_jobs', 'jobIds'))
+    def renewVideoGenerationJobLeases(self, jobIds: List[str], workerId: str, leaseSeconds: int) -> List[str]:
+        """Heartbeat: extend the leases this worker still owns, returns the ids of jobs whose lease
+        was lost (taken by another worker, or the job is gone). Jobs that fail to renew for other
+        reasons are retried on the next heartbeat and not reported"""
+        lostJobIds = []
+        for jobId in jobIds:
+            try:
+                jobRef = self.db.collection('video_generation_jobs').document(jobId)
+
+                # Check and extend in one transaction so a claim made in between isn't overwritten
+                @firestore.transactional
+                def renew(transaction):
+                    doc = jobRef.get(transaction=transaction)
+                    if not doc.exists or doc.to_dict().get('leaseOwner') != workerId:
+                        return False
+                    transaction.update(jobRef, {
+                        'leaseExpiresAt': _leaseTime(leaseSeconds),
+                        'heartbeatAt': _leaseTime()
+                    })
+                    return True
+
+                if not renew(self.db.transaction()):
+                    logger.warning(f"⚠️ Lost lease on video job {jobId}")
+                    lostJobIds.append(jobId)
+
+            except Exception as e:
+                logger.error(f"💥 Error renewing lease on video job {jobId}: {str(e)}")
+        return lostJobIds
+
+    @_invalidates(('video_generation_jobs', 'jobId'))
+    def releaseVideoGenerationJobLease(self, jobId: str, workerId: str) -> bool:
+        """Give up the lease without changing the job status so it can be resumed right away"""
+        try:
+            jobRef = self.db.collection('video_generation_jobs').document(jobId)
+            doc = jobRef.get()
+            if not doc.exists or doc.to_dict().get('leaseOwner') != workerId:
+                return False
+
+            jobRef.update({'leaseOwner': None, 'leaseExpiresAt': None})
+            logger.info(f"🔓 Released lease on video job {jobId}")
+            return True
+
         except Exception as e:
-            logger.error(f"💥 Error during startup cleanup: {str(e)}")
-            return 0
+            logger.error(f"💥 Error releasing lease on video job {jobId}: {str(e)}")
+            return False
+
+    def getResumableVideoGenerationJobs(self) -> List[Dict[str, Any]]:
+        """Get active jobs that nobody holds a live lease on, oldest first"""
+        return [
+            job for job in self.getActiveVideoGenerationJobs()
+            if not job.get('leaseOwner') or _leaseExpired(job.get('leaseExpiresAt'))
+        ]
 
 firebaseService = None
 
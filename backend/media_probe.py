@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import os
+import wave
+import logging
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+# Durations keyed by (path, size, mtime) so a rewritten file is probed again
+MEDIA_DURATION_CACHE_SIZE = 4096
+
+_durationCache = OrderedDict()
+_durationCacheLock = threading.Lock()
+
+def _fileKey(path: str) -> Optional[Tuple[str, int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+def _memoized(path: str, probe) -> Optional[float]:
+    key = _fileKey(path)
+    if key is None:
+        return None
+
+    with _durationCacheLock:
+        if key in _durationCache:
+            _durationCache.move_to_end(key)
+            return _durationCache[key]
+
+    duration = probe(path)
+    if duration is not None:
+        with _durationCacheLock:
+            _durationCache[key] = duration
+            while len(_durationCache) > MEDIA_DURATION_CACHE_SIZE:
+                _durationCache.popitem(last=False)
+    return duration
+
+def _probeWithFfprobe(path: str) -> Optional[float]:
+    try:
+        result = subprocess.run([
+            'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1', path
+        ], capture_output=True, text=True, timeout=10)
+        if result.returncode == 0:
+            return float(result.stdout.strip())
+    except Exception as e:
+        logger.warning(f"⚠️ ffprobe failed for {path}: {str(e)}")
+    return None
+
+def _probeAudioHeader(path: str) -> Optional[float]:
+    # soundfile and wave only read the header; ffprobe covers everything else (mp3, m4a, ...)
+    try:
+        info = sf.info(path)
+        if info.samplerate > 0:
+            return info.frames / info.samplerate
+    except Exception:
+        pass
+
+    try:
+        with wave.open(path, 'rb') as wav:
+            return wav.getnframes() / wav.getframerate()
+    except Exception:
+        pass
+
+    return _probeWithFfprobe(path)
+
+def getAudioDuration(path: str) -> Optional[float]:
+    """Duration in seconds of an audio file without decoding it, None if it can't be read"""
+    return _memoized(path, _probeAudioHeader)
+
+def getMediaDuration(path: str) -> Optional[float]:
+    """Container duration in seconds via ffprobe (videos), memoized per file version"""
+    return _memoized(path, _probeWithFfprobe)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 from email_validator import validate_email, EmailNotValidError
 
 
@@ -49,17 +49,16 @@ class DialogueLine(BaseModel):
     speaker: str
     text: str
     audioFile: Optional[str] = None
+    audioDuration: Optional[float] = None  # Seconds, stored with audioFile when audio is generated
 
 
-class ScriptResponse(BaseModel):
+class ScriptSummary(BaseModel):
+    """Script list entry without the dialogue, built from a projected Firestore read"""
     id: str
     selectedCharacters: List[str]
     originalPrompt: str
-    dialogue: List[DialogueLine]
     createdAt: str
     updatedAt: str
-    hasAudio: bool = False
-    audioCount: int = 0
     finalVideoPath: Optional[str] = None
     videoDuration: Optional[float] = None
     videoSize: Optional[int] = None
@@ -73,6 +72,12 @@ class ScriptResponse(BaseModel):
     videoJobErrorMessage: Optional[str] = None
 
 
+class ScriptResponse(ScriptSummary):
+    dialogue: List[DialogueLine]
+    hasAudio: bool = False
+    audioCount: int = 0
+
+
 class ScriptUpdate(BaseModel):
     dialogue: List[DialogueLine]
 
@@ -227,9 +232,15 @@ class ActivityStats(BaseModel):
     lastActivityAt: Optional[str] = None
 
 
+class ScriptsPageResponse(BaseModel):
+    scripts: List[Union[ScriptResponse, ScriptSummary]]
+    nextCursor: Optional[str] = None  # Cursor of the next page, None on the last one
+
+
 class MyScriptsResponse(BaseModel):
-    scripts: List[ScriptResponse]
+    scripts: List[Union[ScriptResponse, ScriptSummary]]
     userTokens: int
+    nextCursor: Optional[str] = None  # Set when the list was requested with a limit and more scripts follow
 
 
 # User Feedback Models
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+
+import os
+import copy
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any
+
+from firebase_service import getFirebaseService
+
+logger = logging.getLogger(__name__)
+
+# Progress updates inside this window are merged into one Firestore write; status changes
+# (a step starting, completing or failing) are written right away
+VIDEO_PROGRESS_FLUSH_SECONDS = float(os.getenv("VIDEO_PROGRESS_FLUSH_SECONDS", "3"))
+
+class JobProgressReporter:
+    """In-memory progress of one video job and its script. Updates only touch local state;
+    changed fields are written in one batch per flush, without reading the documents back"""
+
+    def __init__(self, jobId: str, scriptId: str, jobData: Dict[str, Any],
+                 flushSeconds: float = VIDEO_PROGRESS_FLUSH_SECONDS):
+        self.jobId = jobId
+        self.scriptId = scriptId
+        self.flushSeconds = flushSeconds
+        self.lock = threading.Lock()
+        self.flushLock = threading.Lock()  # One flush at a time, so an older batch never lands last
+        self.steps = copy.deepcopy(jobData.get('steps', []))
+        self.jobStatus = jobData.get('status', 'queued')
+        self.stepsDirty = False
+        self.pendingJob = {}     # job field path -> value, not written yet
+        self.pendingScript = {}  # script field path -> value, not written yet
+        self.written = {}        # (document, field path) -> last written value
+        self.lastFlush = 0.0
+        self.timer = None
+        self.writes = 0
+        self.discarded = False  # Set by discard(), nothing is written afterwards
+
+    def _set(self, pending: Dict[str, Any], document: str, field: str, value: Any):
+        if self.written.get((document, field)) != value or field in pending:
+            pending[field] = value
+
+    def updateStep(self, stepName: str, stepStatus: str, stepProgress: float, stepMessage: str = "",
+                   overallProgress: float = None, currentStep: str = None):
+        """Same arguments as FirebaseService.updateVideoGenerationJobProgress"""
+        now = datetime.now().isoformat()
+        with self.lock:
+            statusChanged = False
+            for step in self.steps:
+                if step['stepName'] != stepName:
+                    continue
+                statusChanged = step.get('status') != stepStatus
+                step['status'] = stepStatus
+                step['progress'] = stepProgress
+                step['message'] = stepMessage
+                if stepStatus == 'in_progress' and not step.get('startedAt'):
+                    step['startedAt'] = now
+                elif stepStatus in ['completed', 'failed']:
+                    step['completedAt'] = now
+                    if stepStatus == 'failed':
+                        step['errorMessage'] = stepMessage
+                self.stepsDirty = True
+                break
+
+            # Firestore can't address array elements by path, so the steps array is the one
+            # field that is rewritten whole, and only once per flush
+            self._set(self.pendingJob, 'job', 'completedSteps',
+                      len([s for s in self.steps if s.get('status') == 'completed']))
+            if overallProgress is not None:
+                self._set(self.pendingJob, 'job', 'overallProgress', overallProgress)
+            if currentStep is not None:
+                self._set(self.pendingJob, 'job', 'currentStep', currentStep)
+            if stepStatus == 'in_progress' and self.jobStatus == 'queued':
+                self.jobStatus = 'in_progress'
+                self._set(self.pendingJob, 'job', 'status', 'in_progress')
+                self._set(self.pendingJob, 'job', 'startedAt', now)
+
+        self._schedule(force=statusChanged)
+
+    def updateScript(self, status: str, progress: float, currentStep: str = None):
+        with self.lock:
+            statusChanged = self.written.get(('script', 'videoJobStatus')) != status
+            self._set(self.pendingScript, 'script', 'videoJobStatus', status)
+            self._set(self.pendingScript, 'script', 'videoJobProgress', progress)
+            if currentStep:
+                self._set(self.pendingScript, 'script', 'videoJobCurrentStep', currentStep)
+
+        self._schedule(force=statusChanged or status == 'failed')
+
+    def _schedule(self, force: bool = False):
+        """Flush now when forced or the window has passed, else make sure a timer will"""
+        with self.lock:
+            if self.discarded:
+                return
+            wait = self.flushSeconds - (time.monotonic() - self.lastFlush)
+            if not force and wait > 0:
+                if self.timer is None:
+                    self.timer = threading.Timer(wait, self.flush)
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+        self.flush()
+
+    def flush(self) -> bool:
+        """Write every pending change in one batch; always call before a terminal job write"""
+        with self.flushLock:
+            return self._flush()
+
+    def _flush(self) -> bool:
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.discarded:
+                return False
+            self.lastFlush = time.monotonic()
+
+            jobFields = dict(self.pendingJob)
+            if self.stepsDirty:
+                jobFields['steps'] = copy.deepcopy(self.steps)
+            scriptFields = dict(self.pendingScript)
+            if not jobFields and not scriptFields:
+                return True
+            self.pendingJob, self.pendingScript, self.stepsDirty = {}, {}, False
+
+        success = getFirebaseService().applyVideoJobProgress(self.jobId, jobFields, self.scriptId, scriptFields)
+        with self.lock:
+            if self.discarded:
+                return False
+            if success:
+                self.writes += 1
+                self.written.update({('job', field): value for field, value in jobFields.items() if field != 'steps'})
+                self.written.update({('script', field): value for field, value in scriptFields.items()})
+            else:
+                # Keep the changes for the next flush, newer values win
+                self.pendingJob = {**{k: v for k, v in jobFields.items() if k != 'steps'}, **self.pendingJob}
+                self.pendingScript = {**scriptFields, **self.pendingScript}
+                self.stepsDirty = self.stepsDirty or 'steps' in jobFields
+        return success
+
+    def discard(self):
+        """Stop without writing what is pending, e.g. once another worker owns the job. Waits for
+        a flush already inside its Firestore write, so nothing is written once this returns"""
+        with self.lock:
+            self.discarded = True
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.pendingJob, self.pendingScript, self.stepsDirty = {}, {}, False
+        with self.flushLock:
+            pass
+
+    def close(self):
+        """Flush what is left and stop the timer"""
+        self.flush()
+        logger.info(f"📝 Job {self.jobId}: progress written in {self.writes} batched Firestore writes")
@@ -1,28 +1,176 @@
 import os
+import json
 import random
+import hashlib
+import uuid
+import shutil
 import subprocess
 import traceback
 import logging
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException
 from pydub import AudioSegment
+import numpy as np
+import soundfile as sf
+from PIL import Image, ImageFont
 import re
 from models import VideoGenerationResponse
+from background_library import BACKGROUND_LIBRARY_ENABLED, getBackgroundLibrary
+from media_probe import getAudioDuration, getMediaDuration
 
 logger = logging.getLogger(__name__)
 
+# Character images pre-scaled to the overlay height, keyed by source hash
+OVERLAY_CACHE_DIR = os.getenv("OVERLAY_CACHE_DIR", "apiData/overlay_cache")
+
+# Segment-parallel rendering: split long scripts at line boundaries into this many FFmpeg jobs
+# (1 disables it); segments are never shorter than RENDER_MIN_SEGMENT_SECONDS
+RENDER_SEGMENTS = int(os.getenv("RENDER_SEGMENTS", "1"))
+RENDER_SEGMENT_WORKERS = int(os.getenv("RENDER_SEGMENT_WORKERS", "0"))  # 0 = one process per segment
+RENDER_MIN_SEGMENT_SECONDS = float(os.getenv("RENDER_MIN_SEGMENT_SECONDS", "20"))
+
+# Incremental rendering (opt-in): every dialogue line is kept as its own video-only segment, keyed
+# by a hash of its inputs, so re-rendering an edited script only encodes the lines that changed
+RENDER_INCREMENTAL = os.getenv("RENDER_INCREMENTAL", "false").lower() == "true"
+RENDER_SEGMENT_CACHE_DIR = os.getenv("RENDER_SEGMENT_CACHE_DIR", "apiData/segment_cache")
+RENDER_SEGMENT_VERSION = 2  # bump when the per-line render output changes, invalidates every cached segment
+
+# "seeded" picks character images and backgrounds from a seed of the script id plus a hash of its
+# dialogue, so identical inputs render identically and an unchanged video is reused; "random" as before
+RENDER_SELECTION = os.getenv("RENDER_SELECTION", "seeded").lower()
+
+# "direct" hands the per-line WAVs to FFmpeg as a concat list; "combined" writes one WAV first
+RENDER_AUDIO_MODE = os.getenv("RENDER_AUDIO_MODE", "direct").lower()
+
+# Encoder profiles; "auto" uses NVENC when the startup probe finds a working one, else libx264
+RENDER_PROFILE = os.getenv("RENDER_PROFILE", "auto").lower()
+RENDER_X264_PRESET = os.getenv("RENDER_X264_PRESET", "fast")
+RENDER_X264_CRF = os.getenv("RENDER_X264_CRF", "23")
+RENDER_THREADS = int(os.getenv("RENDER_THREADS", "0"))  # libx264 threads per FFmpeg process, 0 = FFmpeg default
+
+ENCODER_PROFILES = {
+    "nvenc": {
+        "encoder": "h264_nvenc",
+        "inputArgs": ['-hwaccel', 'cuda'],
+        "encodeArgs": ['-c:v', 'h264_nvenc', '-preset', 'fast'],
+    },
+    "x264": {
+        "encoder": "libx264",
+        "inputArgs": [],
+        "encodeArgs": ['-c:v', 'libx264', '-preset', RENDER_X264_PRESET, '-crf', RENDER_X264_CRF],
+    },
+    # Low-latency drafts: half resolution, fastest preset, lower quality
+    "preview": {
+        "encoder": "libx264",
+        "inputArgs": [],
+        "encodeArgs": ['-c:v', 'libx264', '-preset', 'ultrafast', '-tune', 'fastdecode', '-crf', '30'],
+        "outputScale": 0.5,
+    },
+}
+
+_availableEncoders = None
+
+def probeEncoders() -> set:
+    """Encoders that can actually open a session here (NVENC may be listed without a usable GPU), probed once"""
+    global _availableEncoders
+    if _availableEncoders is None:
+        available = set()
+        for encoder in sorted({profile["encoder"] for profile in ENCODER_PROFILES.values()}):
+            try:
+                result = subprocess.run([
+                    'ffmpeg', '-hide_banner', '-v', 'error', '-f', 'lavfi', '-i', 'color=size=256x256:rate=25:duration=0.2',
+                    '-c:v', encoder, '-f', 'null', '-'
+                ], capture_output=True, text=True, timeout=30)
+                if result.returncode == 0:
+                    available.add(encoder)
+            except Exception:
+                pass
+        logger.info(f"🎞️ Available video encoders: {', '.join(sorted(available)) or 'none'}")
+        _availableEncoders = available
+    return _availableEncoders
+
+def resolveEncoderProfile(profileName: Optional[str] = None) -> str:
+    """Map a requested profile (default RENDER_PROFILE) to one this machine can run"""
+    name = (profileName or RENDER_PROFILE).lower()
+    available = probeEncoders()
+    
+    if name == "auto":
+        name = "nvenc" if "h264_nvenc" in available else "x264"
+    elif name not in ENCODER_PROFILES:
+        logger.warning(f"⚠️ Unknown encoder profile '{name}', using x264")
+        name = "x264"
+    
+    if name == "nvenc" and "h264_nvenc" not in available:
+        logger.warning("⚠️ NVENC is not available, falling back to libx264")
+        name = "x264"
+    return name
+
+# Subtitle style, shared by the ASS track and the drawtext fallback
+SUBTITLE_FONT_SIZE = 64
+SUBTITLE_BORDER_WIDTH = 3
+SUBTITLE_BOTTOM_MARGIN = 150
+
+_ffmpegFilters = None
+
+def ffmpegHasFilter(filterName: str) -> bool:
+    """Whether the installed FFmpeg build provides a filter (e.g. 'subtitles' needs libass)"""
+    global _ffmpegFilters
+    if _ffmpegFilters is None:
+        try:
+            result = subprocess.run(['ffmpeg', '-hide_banner', '-filters'], capture_output=True, text=True, timeout=10)
+            _ffmpegFilters = {parts[1] for parts in (line.split() for line in result.stdout.splitlines()) if len(parts) > 2}
+        except Exception:
+            _ffmpegFilters = set()
+    return filterName in _ffmpegFilters
+
+def fontFamily(fontPath: str) -> Optional[Tuple[str, str]]:
+    """(family, style) from a font file's name table, which is what libass matches on; None if unreadable"""
+    try:
+        family, style = ImageFont.truetype(fontPath, SUBTITLE_FONT_SIZE).getname()
+        return (family, style or "") if family else None
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read the font family of {fontPath}: {str(e)}")
+        return None
+
+def escapeFilterPath(path: str) -> str:
+    """Quote a file path for use as an FFmpeg filter option value"""
+    return path.replace('\\', '/').replace(':', '\\:').replace("'", "\\'")
+
+def computeSelectionSeed(scriptId: str, scriptData: Dict) -> Optional[str]:
+    """Seed for the image/background choices of a render, None in random selection mode"""
+    if RENDER_SELECTION != "seeded":
+        return None
+    content = [
+        [line.get("speaker", ""), line.get("text", ""), line.get("audioFile", "")]
+        for line in scriptData.get("dialogue", [])
+    ]
+    return f"{scriptId}:{hashlib.sha256(json.dumps(content).encode()).hexdigest()[:16]}"
+
+def selectionRng(seed: Optional[str]):
+    return random.Random(seed) if seed else random
+
+def clearRenderCache(scriptId: str, finalVideoPath: Optional[str] = None):
+    """Drop the cached per-line segments and render key of a script (e.g. when it is deleted)"""
+    shutil.rmtree(os.path.join(RENDER_SEGMENT_CACHE_DIR, scriptId), ignore_errors=True)
+    if finalVideoPath:
+        renderKeyPath = os.path.splitext(finalVideoPath)[0] + ".render.json"
+        if os.path.exists(renderKeyPath):
+            os.remove(renderKeyPath)
+
 class VideoGenerator:
     def __init__(self):
         print("🎬 VideoGenerator initialized")
         
-    def _getRandomBackgroundVideo(self, backgroundDir: str, defaultBackgroundVideo: str) -> str:
+    def _getRandomBackgroundVideo(self, backgroundDir: str, defaultBackgroundVideo: str, rng=random) -> str:
+        """rng is a seeded random.Random for reproducible picks (see computeSelectionSeed)"""
         try:
             if os.path.exists(backgroundDir):
-                backgroundFiles = [f for f in os.listdir(backgroundDir) 
-                                 if f.startswith('background') and f.endswith('.mp4')]
+                backgroundFiles = sorted(f for f in os.listdir(backgroundDir) 
+                                         if f.startswith('background') and f.endswith('.mp4'))
                 if backgroundFiles:
-                    randomBackground = random.choice(backgroundFiles)
+                    randomBackground = rng.choice(backgroundFiles)
                     backgroundVideo = os.path.join(backgroundDir, randomBackground)
                     print(f"🎲 Selected background: {randomBackground}")
                     return backgroundVideo
@@ -37,7 +185,10 @@ class VideoGenerator:
             logger.error(f"❌ Background video error: {str(e)}")
             raise Exception(f"Background video error: {str(e)}")
     
-    def _generateSubtitleForAudio(self, audioFile: str, dialogueText: str) -> Optional[Dict]:
+    def _generateSubtitleForAudio(self, audioFile: str, dialogueText: str,
+                                  audioDuration: Optional[float] = None) -> Optional[Dict]:
+        """audioDuration is the duration stored on the dialogue line at generation time;
+        without it only the file header is read"""
         try:
             if not audioFile or not dialogueText:
                 return None
@@ -45,22 +196,15 @@ class VideoGenerator:
             if not os.path.exists(audioFile):
                 return None
             
-            try:
-                audio = AudioSegment.from_file(audioFile)
-                audioDuration = len(audio) / 1000.0
-            except Exception as e:
+            if not audioDuration or audioDuration <= 0:
+                audioDuration = getAudioDuration(audioFile)
+            if not audioDuration:
                 return None
             
             return self._generateSimpleSubtitles(dialogueText, audioDuration)
             
         except Exception as e:
-            try:
-                if 'audioDuration' not in locals():
-                    audio = AudioSegment.from_file(audioFile)
-                    audioDuration = len(audio) / 1000.0
-            except:
-                audioDuration = 3.0
-            return self._generateSimpleSubtitles(dialogueText, audioDuration)
+            return None
 
     def _generateSimpleSubtitles(self, dialogueText: str, audioDuration: float) -> Dict:
         try:
@@ -97,7 +241,9 @@ class VideoGenerator:
         except Exception as e:
             return {"segments": [], "duration": audioDuration}
     
-    def _createTimeline(self, scriptData: Dict, userProfiles: Dict) -> Tuple[List[Dict], float]:
+    def _createTimeline(self, scriptData: Dict, userProfiles: Dict,
+                        seed: Optional[str] = None) -> Tuple[List[Dict], float]:
+        """seed makes each line's character image choice reproducible, None picks at random"""
         try:
             dialogueLines = scriptData.get("dialogue", [])
             if not dialogueLines:
@@ -123,12 +269,13 @@ class VideoGenerator:
                         skippedCount += 1
                         continue
                     
-                    subtitleInfo = self._generateSubtitleForAudio(audioFile, text)
+                    subtitleInfo = self._generateSubtitleForAudio(audioFile, text, dialogueLine.get("audioDuration"))
                     if not subtitleInfo:
                         skippedCount += 1
                         continue
                     
-                    characterImage = self._getCharacterImage(speaker, userProfiles)
+                    lineRng = random.Random(f"{seed}:{i}") if seed else random
+                    characterImage = self._getCharacterImage(speaker, userProfiles, lineRng)
                     
                     timelineItem = {
                         "lineIndex": i,
@@ -158,7 +305,7 @@ class VideoGenerator:
         except Exception as e:
             return [], 0
     
-    def _getCharacterImage(self, speaker: str, userProfiles: Dict) -> str:
+    def _getCharacterImage(self, speaker: str, userProfiles: Dict, rng=random) -> str:
         try:
             users = userProfiles.get("users", {})
             if speaker not in users:
@@ -170,8 +317,8 @@ class VideoGenerator:
             if not images:
                 return ""
             
-            imagePaths = list(images.values())
-            randomImage = random.choice(imagePaths)
+            imagePaths = sorted(images.values())
+            randomImage = rng.choice(imagePaths)
             
             if os.path.exists(randomImage):
                 return randomImage
@@ -181,44 +328,140 @@ class VideoGenerator:
         except Exception as e:
             return ""
     
+    def _readAudioFile(self, audioFile: str, sampleRate: int, channels: int) -> Optional[np.ndarray]:
+        """Decode one line as float32 frames at the output rate/channel count, converting only when needed"""
+        try:
+            audio, fileRate = sf.read(audioFile, dtype='float32', always_2d=True)
+        except Exception:
+            # Formats libsndfile can't read (e.g. mp3) go through pydub
+            segment = AudioSegment.from_file(audioFile)
+            fileRate = segment.frame_rate
+            audio = np.array(segment.get_array_of_samples(), dtype=np.float32) / segment.max_possible_amplitude
+            audio = audio.reshape(-1, segment.channels)
+        
+        if len(audio) == 0:
+            return None
+        
+        if audio.shape[1] != channels:
+            mono = audio.mean(axis=1, keepdims=True)
+            audio = np.repeat(mono, channels, axis=1)
+        
+        if fileRate != sampleRate:
+            # Linear resampling, lines are short speech clips
+            targetLength = int(round(len(audio) * sampleRate / fileRate))
+            sourcePositions = np.arange(targetLength) * (fileRate / sampleRate)
+            audio = np.stack(
+                [np.interp(sourcePositions, np.arange(len(audio)), audio[:, c]) for c in range(channels)], axis=1
+            ).astype(np.float32)
+        
+        return audio
+    
+    def _writeAudioConcatList(self, timeline: List[Dict], listPath: str) -> bool:
+        """Write an ffconcat list of the per-line WAVs so FFmpeg reads them directly,
+        False when the lines don't share one format (the concat demuxer can't mix them)"""
+        entries = []
+        formats = set()
+        for item in timeline:
+            audioFile = item.get("audioFile", "")
+            if not audioFile or not os.path.exists(audioFile):
+                continue
+            try:
+                info = sf.info(audioFile)
+            except Exception:
+                return False
+            formats.add((info.format, info.subtype, info.samplerate, info.channels))
+            entries.append((audioFile, item["duration"]))
+        
+        if not entries or len(formats) != 1:
+            return False
+        
+        lines = ["ffconcat version 1.0"]
+        for audioFile, duration in entries:
+            lines.append("file '{}'".format(os.path.abspath(audioFile).replace("'", "'\\''")))
+            lines.append(f"duration {duration:.6f}")
+        with open(listPath, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return True
+    
+    def _prepareRenderAudio(self, timeline: List[Dict], outputDir: str, scriptId: str) -> Optional[str]:
+        """Audio input for the render: a concat list of the line WAVs (RENDER_AUDIO_MODE=direct, no
+        full-length intermediate file) or a combined WAV; None on failure"""
+        os.makedirs(outputDir, exist_ok=True)
+        if RENDER_AUDIO_MODE == "direct":
+            listPath = os.path.join(outputDir, f"{scriptId}_audio.ffconcat")
+            if self._writeAudioConcatList(timeline, listPath):
+                print(f"🎵 Feeding {len(timeline)} line audio files straight to FFmpeg")
+                return listPath
+            print("⚠️ Line audio files differ in format, writing a combined track instead")
+        
+        combinedAudioPath = os.path.join(outputDir, f"{scriptId}_combined_audio.wav")
+        return combinedAudioPath if self._concatenateAudioFiles(timeline, combinedAudioPath) else None
+    
+    def _audioInputArgs(self, audioPath: str) -> List[str]:
+        if audioPath.endswith('.ffconcat'):
+            return ['-f', 'concat', '-safe', '0', '-i', audioPath]
+        return ['-i', audioPath]
+    
     def _concatenateAudioFiles(self, timeline: List[Dict], outputPath: str) -> bool:
+        """Stream every line into one WAV: each file is decoded once and written straight to disk,
+        padded or trimmed to the duration the timeline was built with so subtitles stay in sync"""
         try:
             if not timeline:
                 return False
             
             print(f"🎵 Concatenating {len(timeline)} audio files...")
             
-            combinedAudio = AudioSegment.empty()
-            processedCount = 0
+            audioFiles = [item.get("audioFile", "") for item in timeline]
+            audioFiles = [audioFile for audioFile in audioFiles if audioFile and os.path.exists(audioFile)]
+            if not audioFiles:
+                return False
             
-            for i, item in enumerate(timeline):
+            # Output format follows the first line that has a readable header
+            sampleRate, channels = None, None
+            for audioFile in audioFiles:
                 try:
-                    audioFile = item.get("audioFile", "")
-                    if not audioFile or not os.path.exists(audioFile):
-                        continue
-                    
-                    audio = AudioSegment.from_file(audioFile)
-                    
-                    if len(audio) == 0:
-                        continue
-                    
-                    combinedAudio += audio
-                    processedCount += 1
-                    
+                    info = sf.info(audioFile)
+                    sampleRate, channels = info.samplerate, info.channels
+                    break
                 except Exception:
                     continue
+            if sampleRate is None:
+                segment = AudioSegment.from_file(audioFiles[0])
+                sampleRate, channels = segment.frame_rate, segment.channels
             
-            if processedCount == 0:
-                return False
+            processedCount = 0
+            totalFrames = 0
             
             try:
                 os.makedirs(os.path.dirname(outputPath), exist_ok=True)
-                combinedAudio.export(outputPath, format="wav")
+                with sf.SoundFile(outputPath, 'w', samplerate=sampleRate, channels=channels, subtype='PCM_16') as output:
+                    for item in timeline:
+                        try:
+                            audioFile = item.get("audioFile", "")
+                            if not audioFile or not os.path.exists(audioFile):
+                                continue
+                            
+                            audio = self._readAudioFile(audioFile, sampleRate, channels)
+                            if audio is None:
+                                continue
+                            
+                            expectedFrames = int(round(item.get("duration", 0) * sampleRate))
+                            if expectedFrames > len(audio):
+                                audio = np.concatenate([audio, np.zeros((expectedFrames - len(audio), channels), dtype=np.float32)])
+                            elif 0 < expectedFrames < len(audio):
+                                audio = audio[:expectedFrames]
+                            
+                            output.write(audio)
+                            totalFrames += len(audio)
+                            processedCount += 1
+                            
+                        except Exception:
+                            continue
                 
-                if not os.path.exists(outputPath) or os.path.getsize(outputPath) == 0:
+                if processedCount == 0 or not os.path.exists(outputPath) or os.path.getsize(outputPath) == 0:
                     return False
                 
-                print(f"✅ Audio concatenation successful: {processedCount} files, duration: {len(combinedAudio)/1000:.2f}s")
+                print(f"✅ Audio concatenation successful: {processedCount} files, duration: {totalFrames / sampleRate:.2f}s")
                 return True
                 
             except Exception:
@@ -227,19 +470,97 @@ class VideoGenerator:
         except Exception:
             return False
     
-    def _getVideoDuration(self, videoPath: str) -> float:
+    def _getScaledOverlay(self, imageFile: str, height: int) -> Tuple[str, bool]:
+        """Return (path, preScaled): a cached copy of the image scaled to the overlay height,
+        keyed by the source content, or the original file if it can't be produced"""
         try:
-            result = subprocess.run([
-                'ffprobe', '-v', 'quiet', '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1', videoPath
-            ], capture_output=True, text=True, timeout=10)
-            return float(result.stdout.strip()) if result.returncode == 0 else 3.0
-        except Exception:
-            return 3.0
+            with open(imageFile, 'rb') as f:
+                sourceHash = hashlib.md5(f.read()).hexdigest()
+            
+            cachedPath = os.path.join(OVERLAY_CACHE_DIR, f"{sourceHash}_{height}.png")
+            if os.path.exists(cachedPath):
+                return cachedPath, True
+            
+            os.makedirs(OVERLAY_CACHE_DIR, exist_ok=True)
+            with Image.open(imageFile) as image:
+                width = max(1, round(image.width * height / image.height))
+                scaled = image.convert('RGBA').resize((width, height), Image.LANCZOS)
+            
+            # Write to a temporary name first so concurrent renders never read a partial file
+            tempPath = f"{cachedPath}.{uuid.uuid4().hex}.tmp"
+            scaled.save(tempPath, format='PNG')
+            os.replace(tempPath, cachedPath)
+            print(f"🖼️ Cached {height}px overlay for {os.path.basename(imageFile)}")
+            return cachedPath, True
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Could not pre-scale overlay {imageFile}: {str(e)}")
+            return imageFile, False
+    
+    def _formatAssTime(self, seconds: float) -> str:
+        centiseconds = int(round(max(seconds, 0) * 100))
+        hours, centiseconds = divmod(centiseconds, 360000)
+        minutes, centiseconds = divmod(centiseconds, 6000)
+        return f"{hours}:{minutes:02d}:{centiseconds // 100:02d}.{centiseconds % 100:02d}"
+    
+    def _writeAssSubtitles(self, timeline: List[Dict], assPath: str, fontStyle: Tuple[str, str],
+                           videoWidth: int, videoHeight: int) -> int:
+        """Write every subtitle segment of the timeline into one ASS track, returns the event count.
+        fontStyle is the (family, style) pair of fontFamily"""
+        fontName, styleName = fontStyle
+        # -1 is "on" in ASS; without it libass would look for the regular face of the family
+        bold = -1 if "bold" in styleName.lower() else 0
+        italic = -1 if "italic" in styleName.lower() or "oblique" in styleName.lower() else 0
+        events = []
+        for item in timeline:
+            for segment in item.get("subtitleSegments") or []:
+                text = segment.get("text", "").strip()
+                if not text:
+                    continue
+                
+                # Braces start override blocks and backslashes escapes in ASS
+                text = text.replace("\\", "/").replace("{", "(").replace("}", ")").replace("\n", " ")
+                start = self._formatAssTime(item["startTime"] + segment["start"])
+                end = self._formatAssTime(item["startTime"] + segment["end"])
+                events.append(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}")
+        
+        # Bottom-centered white text with a black outline, same look as the drawtext version
+        header = [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            f"PlayResX: {videoWidth}",
+            f"PlayResY: {videoHeight}",
+            "WrapStyle: 2",
+            "ScaledBorderAndShadow: yes",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+            "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+            "Alignment, MarginL, MarginR, MarginV, Encoding",
+            f"Style: Default,{fontName},{SUBTITLE_FONT_SIZE},&H00FFFFFF,&H00FFFFFF,&H00000000,&H00000000,"
+            f"{bold},{italic},0,0,100,100,0,0,1,{SUBTITLE_BORDER_WIDTH},0,2,0,0,{SUBTITLE_BOTTOM_MARGIN},1",
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+        ]
+        
+        with open(assPath, "w", encoding="utf-8") as f:
+            f.write("\n".join(header + events) + "\n")
+        return len(events)
+    
+    def _getVideoDuration(self, videoPath: str) -> float:
+        return getMediaDuration(videoPath) or 3.0
     
     def _generateVideoWithFfmpeg(self, backgroundVideo: str, timeline: List[Dict],
                                 totalDuration: float, combinedAudio: str, 
-                                outputVideo: str, scriptId: str, fontPath: str) -> Tuple[bool, Optional[int]]:
+                                outputVideo: str, scriptId: str, fontPath: str,
+                                subtitleMode: str = "ass", backgroundOffset: float = 0.0,
+                                encoderProfile: Optional[str] = None) -> Tuple[bool, Optional[int]]:
+        """subtitleMode "ass" burns one generated ASS track with a single subtitles filter,
+        "drawtext" chains one drawtext filter per segment (used when FFmpeg lacks libass).
+        combinedAudio=None renders video only; backgroundOffset starts the background later.
+        encoderProfile is a key of ENCODER_PROFILES or "auto" (default RENDER_PROFILE)"""
+        assPath = os.path.splitext(outputVideo)[0] + ".ass"
         try:
             print(f"🎬 Generating video with FFmpeg")
             print(f"📹 Background: {backgroundVideo}")
@@ -249,27 +570,41 @@ class VideoGenerator:
             
             os.makedirs(os.path.dirname(outputVideo), exist_ok=True)
             
+            if subtitleMode == "ass" and not ffmpegHasFilter("subtitles"):
+                print("⚠️ FFmpeg has no subtitles filter (libass), falling back to drawtext")
+                subtitleMode = "drawtext"
+            
+            # ASS styles reference fonts by family name; fontsdir lets libass find the file itself
+            fontsDir = None
+            fontStyle = ('Arial', '')
             if not os.path.exists(fontPath):
                 fontPath = 'arial'
             else:
+                fontsDir = os.path.dirname(os.path.abspath(fontPath))
+                fontStyle = fontFamily(fontPath)
+                if fontStyle is None and subtitleMode == "ass":
+                    print("⚠️ Font family unknown, libass would substitute another font; using drawtext")
+                    subtitleMode = "drawtext"
                 fontPath = fontPath.replace(':', '\\:')
             
             filterParts = []
-            inputParts = ['-hwaccel', 'cuda', '-stream_loop', '-1', '-i', backgroundVideo, '-i', combinedAudio]
+            profileName = resolveEncoderProfile(encoderProfile)
+            profile = ENCODER_PROFILES[profileName]
+            print(f"🎞️ Encoder profile: {profileName}")
             
-            imageInputs = {}
-            validImages = 0
-            inputIndex = 2
-            
-            for item in timeline:
-                imageFile = item.get("imageFile", "")
-                if imageFile and os.path.exists(imageFile):
-                    inputParts.extend(['-i', imageFile])
-                    imageInputs[item["lineIndex"]] = inputIndex
-                    inputIndex += 1
-                    validImages += 1
-            
-            print(f"🖼️ Added {validImages}/{len(timeline)} images")
+            # An .ffconcat background is a window into the pre-scaled library. inpoint can only start at
+            # a keyframe, so the window may carry frames from before it and is still trimmed to length
+            libraryWindow = backgroundVideo.endswith('.ffconcat')
+            if libraryWindow:
+                inputParts = [*profile["inputArgs"], '-f', 'concat', '-safe', '0', '-i', backgroundVideo]
+            else:
+                inputParts = [*profile["inputArgs"], '-stream_loop', '-1']
+                if backgroundOffset > 0:
+                    inputParts.extend(['-ss', f"{backgroundOffset:.3f}"])
+                inputParts.extend(['-i', backgroundVideo])
+            if combinedAudio:
+                inputParts.extend(self._audioInputArgs(combinedAudio))
+            firstImageInput = 2 if combinedAudio else 1
             
             try:
                 # Video dimensions
@@ -283,7 +618,28 @@ class VideoGenerator:
                 left_x_position = 0  # Touch left edge completely
                 right_x_position = video_width  # Touch right edge (will subtract image width)
                 
-                filterParts.append(f"[0:v]scale={video_width}:{video_height}:force_original_aspect_ratio=disable,setsar=1,trim=duration={totalDuration},setpts=PTS-STARTPTS[bg]")
+                # Open every distinct image once, already scaled to the overlay height when possible
+                imageUses = {}
+                for item in timeline:
+                    imageFile = item.get("imageFile", "")
+                    if imageFile and os.path.exists(imageFile):
+                        imageUses[imageFile] = imageUses.get(imageFile, 0) + 1
+                
+                imageLabels = {}  # imageFile -> overlay input labels, one per line that shows it
+                for inputIndex, (imageFile, uses) in enumerate(imageUses.items(), start=firstImageInput):
+                    overlayFile, preScaled = self._getScaledOverlay(imageFile, target_image_height)
+                    inputParts.extend(['-i', overlayFile])
+                    
+                    imageLabels[imageFile] = [f"[img{inputIndex}_{n}]" for n in range(uses)]
+                    scaleFilter = "" if preScaled else f"scale=-1:{target_image_height},"
+                    filterParts.append(f"[{inputIndex}:v]{scaleFilter}split={uses}{''.join(imageLabels[imageFile])}")
+                
+                print(f"🖼️ Added {len(imageUses)} distinct images for {sum(imageUses.values())}/{len(timeline)} lines")
+                
+                if libraryWindow:
+                    filterParts.append(f"[0:v]setpts=PTS-STARTPTS,trim=duration={totalDuration}[bg]")
+                else:
+                    filterParts.append(f"[0:v]scale={video_width}:{video_height}:force_original_aspect_ratio=disable,setsar=1,trim=duration={totalDuration},setpts=PTS-STARTPTS[bg]")
                 currentBase = "[bg]"
                 
                 overlayCount = 0
@@ -294,8 +650,8 @@ class VideoGenerator:
                 for item in timeline:
                     lineIndex = item.get("lineIndex", 0)
                     
-                    if lineIndex in imageInputs:
-                        imgInput = imageInputs[lineIndex]
+                    if imageLabels.get(item.get("imageFile", "")):
+                        scaledImage = imageLabels[item["imageFile"]].pop(0)
                         
                         # Determine if this should be left or right positioned (alternating)
                         # First dialogue should be LEFT, second should be RIGHT
@@ -303,20 +659,14 @@ class VideoGenerator:
                         print(f"🔍 Debug: lineIndex={lineIndex}, is_left_position={is_left_position}")
                         
                         if is_left_position:
-                            # Left positioning: scale image and place touching left edge
+                            # Left positioning: place the scaled image touching left edge
                             filterParts.append(
-                                f"[{imgInput}:v]scale=-1:{target_image_height}[scaled_img_{overlayCount}]"
-                            )
-                            filterParts.append(
-                                f"{currentBase}[scaled_img_{overlayCount}]overlay={left_x_position}:{y_position}:enable='between(t,{item['startTime']},{item['endTime']})'[overlay{overlayCount}]"
+                                f"{currentBase}{scaledImage}overlay={left_x_position}:{y_position}:enable='between(t,{item['startTime']},{item['endTime']})'[overlay{overlayCount}]"
                             )
                         else:
-                            # Right positioning: scale image and place touching right edge
+                            # Right positioning: place the scaled image touching right edge
                             filterParts.append(
-                                f"[{imgInput}:v]scale=-1:{target_image_height}[scaled_img_{overlayCount}]"
-                            )
-                            filterParts.append(
-                                f"{currentBase}[scaled_img_{overlayCount}]overlay=main_w-overlay_w:{y_position}:enable='between(t,{item['startTime']},{item['endTime']})'[overlay{overlayCount}]"
+                                f"{currentBase}{scaledImage}overlay=main_w-overlay_w:{y_position}:enable='between(t,{item['startTime']},{item['endTime']})'[overlay{overlayCount}]"
                             )
                         
                         currentBase = f"[overlay{overlayCount}]"
@@ -325,7 +675,7 @@ class VideoGenerator:
                         position_side = "left" if is_left_position else "right"
                         print(f"🎭 Line {lineIndex}: Positioned {position_side} (touching edge), bottom at {image_bottom_position}px (1/7 from bottom), top at {y_position}px")
                     
-                    if "subtitleSegments" in item and item["subtitleSegments"]:
+                    if subtitleMode == "drawtext" and item.get("subtitleSegments"):
                         for segment in item["subtitleSegments"]:
                             start = item["startTime"] + segment["start"]
                             end = item["startTime"] + segment["end"]
@@ -337,15 +687,31 @@ class VideoGenerator:
                             text = text.replace("'", "\\'").replace('"', '\\"').replace(':', '\\:')
                             
                             filterParts.append(
-                                f"{currentBase}drawtext=text='{text}':fontfile='{fontPath}':fontsize=64:borderw=3:bordercolor=black:fontcolor=white:x=(w-text_w)/2:y=h-th-150:enable='between(t,{start:.3f},{end:.3f})'[sub{subtitleCount}]"
+                                f"{currentBase}drawtext=text='{text}':fontfile='{fontPath}':fontsize={SUBTITLE_FONT_SIZE}:borderw={SUBTITLE_BORDER_WIDTH}:bordercolor=black:fontcolor=white:x=(w-text_w)/2:y=h-th-{SUBTITLE_BOTTOM_MARGIN}:enable='between(t,{start:.3f},{end:.3f})'[sub{subtitleCount}]"
                             )
                             currentBase = f"[sub{subtitleCount}]"
                             subtitleCount += 1
                 
-                print(f"🎭 Added {overlayCount} positioned overlays (alternating left/right), {subtitleCount} subtitles")
+                if subtitleMode == "ass":
+                    subtitleCount = self._writeAssSubtitles(timeline, assPath, fontStyle, video_width, video_height)
+                    subtitleFilter = f"subtitles=filename='{escapeFilterPath(assPath)}'"
+                    if fontsDir:
+                        subtitleFilter += f":fontsdir='{escapeFilterPath(fontsDir)}'"
+                    filterParts.append(f"{currentBase}{subtitleFilter}[subs]")
+                    currentBase = "[subs]"
+                
+                print(f"🎭 Added {overlayCount} positioned overlays (alternating left/right), {subtitleCount} subtitles ({subtitleMode})")
                 
+                outputScale = profile.get("outputScale")
+                if outputScale:
+                    filterParts.append(
+                        f"{currentBase}scale={int(video_width * outputScale) // 2 * 2}:{int(video_height * outputScale) // 2 * 2}[scaled_output]"
+                    )
+                    currentBase = "[scaled_output]"
                 filterParts.append(f"{currentBase}setpts=PTS-STARTPTS[final_video]")
-                outputMapping = ['-map', '[final_video]', '-map', '1:a']
+                outputMapping = ['-map', '[final_video]']
+                if combinedAudio:
+                    outputMapping.extend(['-map', '1:a', '-c:a', 'aac', '-shortest'])
                 
             except Exception:
                 return (False, None)
@@ -358,10 +724,8 @@ class VideoGenerator:
                     *inputParts,
                     '-filter_complex', filterComplex,
                     *outputMapping,
-                    '-c:v', 'h264_nvenc',
-                    '-preset', 'fast',
-                    '-c:a', 'aac',
-                    '-shortest',
+                    *profile["encodeArgs"],
+                    *(['-threads', str(RENDER_THREADS)] if RENDER_THREADS > 0 and profile["encoder"] == "libx264" else []),
                     outputVideo
                 ]
                 
@@ -397,6 +761,416 @@ class VideoGenerator:
                 
         except Exception:
             return (False, None)
+        finally:
+            if os.path.exists(assPath):
+                os.remove(assPath)
+    
+    def _splitTimeline(self, timeline: List[Dict], segmentCount: int) -> List[Tuple[float, float, List[Dict]]]:
+        """Split the timeline at dialogue-line boundaries into about segmentCount parts of similar
+        duration; returns (startTime, duration, items shifted to start at 0) per part"""
+        totalDuration = sum(item["duration"] for item in timeline)
+        targetDuration = totalDuration / max(segmentCount, 1)
+        
+        groups = [[]]
+        groupDuration = 0.0
+        for item in timeline:
+            if groups[-1] and groupDuration >= targetDuration and len(groups) < segmentCount:
+                groups.append([])
+                groupDuration = 0.0
+            groups[-1].append(item)
+            groupDuration += item["duration"]
+        
+        segments = []
+        for group in groups:
+            startTime = group[0]["startTime"]
+            shifted = [
+                {**item, "startTime": item["startTime"] - startTime, "endTime": item["endTime"] - startTime}
+                for item in group
+            ]
+            segments.append((startTime, sum(item["duration"] for item in group), shifted))
+        return segments
+    
+    def _renderKeyPath(self, outputVideo: str) -> str:
+        return os.path.splitext(outputVideo)[0] + ".render.json"
+    
+    def _getCachedRender(self, outputVideo: str, renderKey: str) -> Optional[int]:
+        """Size of the existing output when it was rendered from identical inputs, else None"""
+        try:
+            with open(self._renderKeyPath(outputVideo), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except Exception:
+            return None
+        if stored.get("renderKey") != renderKey or stored.get("output") != self._fileSignature(outputVideo):
+            return None
+        print(f"♻️ Inputs unchanged since the last render, reusing {os.path.basename(outputVideo)}")
+        return os.path.getsize(outputVideo)
+    
+    def _storeRenderKey(self, outputVideo: str, renderKey: str):
+        with open(self._renderKeyPath(outputVideo), "w", encoding="utf-8") as f:
+            json.dump({"renderKey": renderKey, "output": self._fileSignature(outputVideo)}, f)
+    
+    def _renderVideo(self, backgroundVideo: str, timeline: List[Dict], totalDuration: float,
+                     combinedAudio: str, outputVideo: str, scriptId: str, fontPath: str,
+                     segmentCount: Optional[int] = None,
+                     encoderProfile: Optional[str] = None,
+                     seed: Optional[str] = None) -> Tuple[bool, Optional[int]]:
+        """Render the final video, in parallel segments when RENDER_SEGMENTS allows it.
+        seed (see computeSelectionSeed) makes the background window reproducible; an output
+        rendered earlier from identical inputs is returned without running FFmpeg"""
+        # Resolve once so all segments share one encoder and can be stream-copied together
+        encoderProfile = resolveEncoderProfile(encoderProfile)
+        rng = selectionRng(seed)
+        if RENDER_INCREMENTAL:
+            return self._generateVideoIncremental(
+                backgroundVideo, timeline, combinedAudio, outputVideo, scriptId, fontPath, encoderProfile, seed
+            )
+        
+        if segmentCount is None:
+            segmentCount = RENDER_SEGMENTS
+        segmentCount = min(segmentCount, len(timeline), int(totalDuration // RENDER_MIN_SEGMENT_SECONDS))
+        
+        # Seek into the pre-scaled background library when this background has been prepared
+        library = getBackgroundLibrary()
+        backgroundStart = library.pickWindowStart(backgroundVideo, totalDuration, rng) if BACKGROUND_LIBRARY_ENABLED else None
+        
+        renderKey = self._hashInputs({
+            "segments": max(segmentCount, 1),
+            "lines": [self._lineSignature(item) for item in timeline],
+            "background": self._fileSignature(backgroundVideo),
+            "backgroundStart": round(backgroundStart, 3) if backgroundStart is not None else None,
+            "font": self._fileSignature(fontPath),
+            "profile": encoderProfile,
+        })
+        cachedSize = self._getCachedRender(outputVideo, renderKey)
+        if cachedSize:
+            return (True, cachedSize)
+        
+        success, videoSize = self._dispatchRender(
+            backgroundVideo, timeline, totalDuration, combinedAudio, outputVideo, scriptId, fontPath,
+            segmentCount, encoderProfile, backgroundStart
+        )
+        if success:
+            self._storeRenderKey(outputVideo, renderKey)
+        return (success, videoSize)
+    
+    def _dispatchRender(self, backgroundVideo: str, timeline: List[Dict], totalDuration: float,
+                        combinedAudio: str, outputVideo: str, scriptId: str, fontPath: str,
+                        segmentCount: int, encoderProfile: str,
+                        backgroundStart: Optional[float]) -> Tuple[bool, Optional[int]]:
+        """One FFmpeg pass, or parallel segments joined with -c copy"""
+        library = getBackgroundLibrary()
+        if segmentCount <= 1:
+            windowPath = None
+            if backgroundStart is not None:
+                windowPath = library.writeWindow(
+                    backgroundVideo, backgroundStart, totalDuration,
+                    os.path.splitext(outputVideo)[0] + "_background.ffconcat"
+                )
+            try:
+                return self._generateVideoWithFfmpeg(
+                    windowPath or backgroundVideo, timeline, totalDuration, combinedAudio, outputVideo, scriptId,
+                    fontPath, encoderProfile=encoderProfile
+                )
+            finally:
+                if windowPath and os.path.exists(windowPath):
+                    os.remove(windowPath)
+        
+        return self._generateVideoSegmented(
+            backgroundVideo, timeline, combinedAudio, outputVideo, scriptId, fontPath, segmentCount,
+            encoderProfile=encoderProfile, backgroundStart=backgroundStart
+        )
+    
+    def _generateVideoSegmented(self, backgroundVideo: str, timeline: List[Dict], combinedAudio: str,
+                                outputVideo: str, scriptId: str, fontPath: str,
+                                segmentCount: int, encoderProfile: Optional[str] = None,
+                                backgroundStart: Optional[float] = None) -> Tuple[bool, Optional[int]]:
+        """Render video-only segments concurrently, then join them with the concat demuxer (-c copy)
+        and mux the combined audio once, so segment boundaries never cut the audio stream.
+        backgroundStart is the library window start, None to loop the source background"""
+        segments = self._splitTimeline(timeline, segmentCount)
+        segmentDir = os.path.join(os.path.dirname(outputVideo), f"{scriptId}_segments")
+        os.makedirs(segmentDir, exist_ok=True)
+        
+        try:
+            # Each segment continues the background where the previous one stopped
+            segmentBackgrounds = []
+            if backgroundStart is not None:
+                library = getBackgroundLibrary()
+                for i, (startTime, duration, _) in enumerate(segments):
+                    windowPath = os.path.join(segmentDir, f"background_{i:03d}.ffconcat")
+                    segmentBackgrounds.append((
+                        library.writeWindow(backgroundVideo, backgroundStart + startTime, duration, windowPath) or backgroundVideo, 0.0
+                    ))
+            else:
+                backgroundDuration = self._getVideoDuration(backgroundVideo)
+                for startTime, _, _ in segments:
+                    offset = startTime % backgroundDuration if backgroundDuration > 0 else 0.0
+                    segmentBackgrounds.append((backgroundVideo, offset))
+            
+            workers = RENDER_SEGMENT_WORKERS or len(segments)
+            print(f"🧩 Rendering {len(segments)} segments with {workers} parallel FFmpeg processes")
+            
+            segmentPaths = [os.path.join(segmentDir, f"segment_{i:03d}.mp4") for i in range(len(segments))]
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(
+                        self._generateVideoWithFfmpeg,
+                        segmentBackground, items, duration, None, segmentPath, f"{scriptId}_{i}", fontPath,
+                        backgroundOffset=backgroundOffset, encoderProfile=encoderProfile
+                    )
+                    for i, ((_, duration, items), segmentPath, (segmentBackground, backgroundOffset))
+                    in enumerate(zip(segments, segmentPaths, segmentBackgrounds))
+                ]
+                results = [future.result() for future in futures]
+            
+            failed = [i for i, (success, _) in enumerate(results) if not success]
+            if failed:
+                logger.error(f"FFmpeg failed for segments {failed} of {scriptId}")
+                return (False, None)
+            
+            # Every segment is a separate encode, so each one starts on a keyframe and can be stream-copied
+            concatListPath = os.path.join(segmentDir, "segments.txt")
+            with open(concatListPath, "w", encoding="utf-8") as f:
+                for segmentPath in segmentPaths:
+                    f.write(f"file '{os.path.abspath(segmentPath)}'\n")
+            
+            cmd = [
+                'ffmpeg', '-y',
+                '-f', 'concat', '-safe', '0', '-i', concatListPath,
+                *self._audioInputArgs(combinedAudio),
+                '-map', '0:v', '-map', '1:a',
+                '-c:v', 'copy',
+                '-c:a', 'aac',
+                '-shortest',
+                outputVideo
+            ]
+            
+            print("⚡ Joining segments...")
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            if result.returncode != 0:
+                logger.error(f"FFmpeg concat failed with return code {result.returncode}: {result.stderr}")
+                return (False, None)
+            
+            if not os.path.exists(outputVideo) or os.path.getsize(outputVideo) == 0:
+                return (False, None)
+            
+            fileSize = os.path.getsize(outputVideo)
+            print(f"✅ Segmented video generation successful! ({len(segments)} segments, {fileSize} bytes)")
+            return (True, fileSize)
+            
+        except Exception as e:
+            logger.error(f"❌ Segmented render failed: {str(e)}")
+            return (False, None)
+        finally:
+            shutil.rmtree(segmentDir, ignore_errors=True)
+    
+    def _segmentManifestPath(self, scriptId: str) -> str:
+        return os.path.join(RENDER_SEGMENT_CACHE_DIR, scriptId, "manifest.json")
+    
+    def _loadSegmentManifest(self, scriptId: str) -> Dict[str, Any]:
+        try:
+            with open(self._segmentManifestPath(scriptId), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+    
+    def _saveSegmentManifest(self, scriptId: str, manifest: Dict[str, Any]):
+        manifestPath = self._segmentManifestPath(scriptId)
+        tempPath = f"{manifestPath}.tmp"
+        with open(tempPath, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tempPath, manifestPath)
+    
+    def _getStoredBackground(self, scriptId: str) -> Optional[str]:
+        """Background of the previous incremental render, so its cached line segments stay valid.
+        Random selection only; seeded renders take everything from the seed"""
+        if not RENDER_INCREMENTAL or RENDER_SELECTION == "seeded":
+            return None
+        backgroundVideo = self._loadSegmentManifest(scriptId).get("background")
+        if backgroundVideo and os.path.exists(backgroundVideo):
+            print(f"♻️ Reusing background of the previous render: {os.path.basename(backgroundVideo)}")
+            return backgroundVideo
+        return None
+    
+    def _fileSignature(self, path: str) -> Optional[List]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+    
+    def _hashInputs(self, inputs: Dict[str, Any]) -> str:
+        return hashlib.md5(json.dumps({"version": RENDER_SEGMENT_VERSION, **inputs}, sort_keys=True).encode()).hexdigest()
+    
+    def _lineSignature(self, item: Dict) -> Dict[str, Any]:
+        """Everything of one timeline item that ends up in the rendered video"""
+        return {
+            "text": item["text"],
+            "subtitles": item["subtitleSegments"],
+            "duration": round(item["duration"], 3),
+            "audio": self._fileSignature(item["audioFile"]),
+            "image": self._fileSignature(item["imageFile"]) if item["imageFile"] else None,
+            "left": item["lineIndex"] % 2 == 0,
+        }
+    
+    def _segmentKey(self, item: Dict, backgroundVideo: str, backgroundStart: float,
+                    fontPath: str, encoderProfile: str) -> str:
+        """Hash of everything that ends up in one line's video segment"""
+        return self._hashInputs({
+            "line": self._lineSignature(item),
+            "background": self._fileSignature(backgroundVideo),
+            "backgroundStart": round(backgroundStart, 3),
+            "font": self._fileSignature(fontPath),
+            "profile": encoderProfile,
+        })
+    
+    def _generateVideoIncremental(self, backgroundVideo: str, timeline: List[Dict], combinedAudio: str,
+                                  outputVideo: str, scriptId: str, fontPath: str,
+                                  encoderProfile: str, seed: Optional[str] = None) -> Tuple[bool, Optional[int]]:
+        """Render one cached video-only segment per dialogue line, re-encoding only the lines whose
+        inputs changed since the last render, then join them with -c copy and mux the audio once.
+        Each line's background window is anchored on its own, so an edit that changes one line's
+        duration doesn't shift (and re-render) the lines after it.
+        With a seed the background windows and images (already in the timeline) follow from it, one
+        window per line, so the seed recorded on the job reproduces the render. Without one a fresh
+        render plays one continuous window and the manifest keeps each line's start (and image) for
+        later renders, since fresh random picks would invalidate every cached line"""
+        cacheDir = os.path.join(RENDER_SEGMENT_CACHE_DIR, scriptId)
+        os.makedirs(cacheDir, exist_ok=True)
+        manifest = {} if seed else self._loadSegmentManifest(scriptId)
+        
+        if not seed and (manifest.get("background") != backgroundVideo or "backgroundBase" not in manifest):
+            library = getBackgroundLibrary()
+            backgroundBase = library.pickWindowStart(backgroundVideo, 0) if BACKGROUND_LIBRARY_ENABLED else None
+            if backgroundBase is None:
+                backgroundBase = random.uniform(0, max(self._getVideoDuration(backgroundVideo), 0))
+            manifest = {"background": backgroundVideo, "backgroundBase": backgroundBase, "images": {}, "backgroundStarts": {}}
+        storedStarts = manifest.get("backgroundStarts", {})
+        backgroundStarts = {}
+        
+        # Random selection: keep each line's chosen character image while the same speaker says it
+        storedImages = manifest.get("images", {})
+        images = {}
+        items = []
+        for item in timeline:
+            stored = storedImages.get(str(item["lineIndex"]))
+            if stored and stored["speaker"] == item["speaker"] and os.path.exists(stored["imageFile"]):
+                item = {**item, "imageFile": stored["imageFile"]}
+            images[str(item["lineIndex"])] = {"speaker": item["speaker"], "imageFile": item["imageFile"]}
+            items.append(item)
+        
+        try:
+            library = getBackgroundLibrary()
+            libraryEntry = library.getEntry(backgroundVideo) if BACKGROUND_LIBRARY_ENABLED else None
+            backgroundDuration = None if libraryEntry else self._getVideoDuration(backgroundVideo)
+            sourceDuration = libraryEntry["duration"] if libraryEntry else (backgroundDuration or 0.0)
+            
+            segments = []  # (segmentPath, duration)
+            pending = []   # (segmentPath, shifted item, backgroundStart)
+            for item in items:
+                lineKey = str(item["lineIndex"])
+                if seed:
+                    backgroundStart = selectionRng(f"{seed}:{lineKey}").uniform(0, max(sourceDuration, 0))
+                else:
+                    backgroundStart = storedStarts.get(lineKey, manifest["backgroundBase"] + item["startTime"])
+                    backgroundStarts[lineKey] = backgroundStart
+                key = self._segmentKey(item, backgroundVideo, backgroundStart, fontPath, encoderProfile)
+                segmentPath = os.path.join(cacheDir, f"{key}.mp4")
+                segments.append((segmentPath, item["duration"]))
+                if not os.path.exists(segmentPath):
+                    shifted = {**item, "startTime": 0.0, "endTime": item["duration"]}
+                    pending.append((segmentPath, shifted, backgroundStart))
+            
+            # Every line's key covers its audio too, so together they identify the whole video
+            renderKey = self._hashInputs({"incremental": [os.path.basename(path) for path, _ in segments]})
+            cachedSize = self._getCachedRender(outputVideo, renderKey)
+            if cachedSize:
+                return (True, cachedSize)
+            
+            print(f"♻️ Incremental render: {len(segments) - len(pending)} cached, {len(pending)} to render")
+            
+            def renderLine(segmentPath: str, item: Dict, backgroundStart: float) -> bool:
+                partialPath = segmentPath[:-len(".mp4")] + ".partial.mp4"
+                windowPath = None
+                backgroundOffset = 0.0
+                if libraryEntry:
+                    windowPath = library.writeWindow(
+                        backgroundVideo, backgroundStart, item["duration"], segmentPath[:-len(".mp4")] + ".ffconcat"
+                    )
+                elif backgroundDuration and backgroundDuration > 0:
+                    backgroundOffset = backgroundStart % backgroundDuration
+                try:
+                    success, _ = self._generateVideoWithFfmpeg(
+                        windowPath or backgroundVideo, [item], item["duration"], None, partialPath,
+                        f"{scriptId}_{item['lineIndex']}", fontPath,
+                        backgroundOffset=backgroundOffset, encoderProfile=encoderProfile
+                    )
+                    if success:
+                        os.replace(partialPath, segmentPath)
+                    return success
+                finally:
+                    for leftover in (windowPath, partialPath):
+                        if leftover and os.path.exists(leftover):
+                            os.remove(leftover)
+            
+            if pending:
+                # Same process limit as segmented rendering (NVENC caps concurrent sessions)
+                workers = max(1, min(len(pending), RENDER_SEGMENT_WORKERS or RENDER_SEGMENTS))
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(renderLine, *args) for args in pending]
+                    results = [future.result() for future in futures]
+                failed = [item["lineIndex"] for (_, item, _), success in zip(pending, results) if not success]
+                if failed:
+                    logger.error(f"FFmpeg failed for lines {failed} of {scriptId}")
+                    return (False, None)
+            
+            # duration directives place every segment at its exact audio start, so frame rounding
+            # at the end of each line never accumulates into audio/video drift
+            concatListPath = os.path.join(cacheDir, "segments.ffconcat")
+            with open(concatListPath, "w", encoding="utf-8") as f:
+                f.write("ffconcat version 1.0\n")
+                for segmentPath, duration in segments:
+                    f.write(f"file '{os.path.abspath(segmentPath)}'\nduration {duration:.3f}\n")
+            
+            cmd = [
+                'ffmpeg', '-y',
+                '-f', 'concat', '-safe', '0', '-i', concatListPath,
+                *self._audioInputArgs(combinedAudio),
+                '-map', '0:v', '-map', '1:a',
+                '-c:v', 'copy',
+                '-c:a', 'aac',
+                '-shortest',
+                outputVideo
+            ]
+            
+            print("⚡ Joining line segments...")
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+            os.remove(concatListPath)
+            if result.returncode != 0:
+                logger.error(f"FFmpeg concat failed with return code {result.returncode}: {result.stderr}")
+                return (False, None)
+            
+            if not os.path.exists(outputVideo) or os.path.getsize(outputVideo) == 0:
+                return (False, None)
+            
+            # Forget segments of lines that no longer exist in this form
+            keep = {os.path.basename(segmentPath) for segmentPath, _ in segments}
+            for name in os.listdir(cacheDir):
+                if name.endswith(".mp4") and name not in keep:
+                    os.remove(os.path.join(cacheDir, name))
+            if not seed:
+                manifest["images"] = images
+                manifest["backgroundStarts"] = backgroundStarts
+                self._saveSegmentManifest(scriptId, manifest)
+            self._storeRenderKey(outputVideo, renderKey)
+            
+            fileSize = os.path.getsize(outputVideo)
+            print(f"✅ Incremental video generation successful! ({len(pending)}/{len(segments)} lines rendered, {fileSize} bytes)")
+            return (True, fileSize)
+            
+        except Exception as e:
+            logger.error(f"❌ Incremental render failed: {str(e)}")
+            return (False, None)
     
     async def generateVideo(self, scriptId: str, scriptsData: Dict, userProfiles: Dict,
                            videoOutputDir: str, backgroundDir: str, defaultBackgroundVideo: str,
@@ -427,31 +1201,38 @@ class VideoGenerator:
                     detail=f"Audio files missing for dialogue lines: {missingAudio}. Generate audio first."
                 )
             
+            seed = computeSelectionSeed(scriptId, scriptData)
+            if seed:
+                print(f"🎲 Selection seed: {seed}")
+            
             if not backgroundVideo:
-                backgroundVideo = self._getRandomBackgroundVideo(backgroundDir, defaultBackgroundVideo)
+                backgroundVideo = (self._getStoredBackground(scriptId)
+                                   or self._getRandomBackgroundVideo(backgroundDir, defaultBackgroundVideo,
+                                                                     selectionRng(seed)))
             
             if not os.path.exists(backgroundVideo):
                 raise HTTPException(status_code=400, detail=f"Background video not found: {backgroundVideo}")
             
             print("🎬 Creating timeline...")
-            timeline, totalDuration = self._createTimeline(scriptData, userProfiles)
+            timeline, totalDuration = self._createTimeline(scriptData, userProfiles, seed)
             
             if not timeline:
                 raise HTTPException(status_code=500, detail="Failed to create timeline - no valid segments")
             
             print(f"Created timeline with {len(timeline)} segments, total duration: {totalDuration:.2f}s")
             
-            print("🎵 Concatenating audio files...")
-            combinedAudioPath = os.path.join(videoOutputDir, f"{scriptId}_combined_audio.wav")
+            print("🎵 Preparing audio...")
+            combinedAudioPath = self._prepareRenderAudio(timeline, videoOutputDir, scriptId)
             
-            if not self._concatenateAudioFiles(timeline, combinedAudioPath):
+            if not combinedAudioPath:
                 raise HTTPException(status_code=500, detail="Failed to concatenate audio files")
             
             print("🎬 Generating final video...")
             finalVideoPath = os.path.join(videoOutputDir, f"{scriptId}_final_video.mp4")
             
-            success, videoSize = self._generateVideoWithFfmpeg(
-                backgroundVideo, timeline, totalDuration, combinedAudioPath, finalVideoPath, scriptId, fontPath
+            success, videoSize = self._renderVideo(
+                backgroundVideo, timeline, totalDuration, combinedAudioPath, finalVideoPath, scriptId, fontPath,
+                seed=seed
             )
             
             if not success: